@@ -5,9 +5,11 @@ from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from server_python.database import get_db
+from server_python.database import get_async_db
 from server_python.models import User
 
 SECRET_KEY = os.getenv("SESSION_SECRET", "dev-secret-key-change-in-production")
@@ -55,6 +57,11 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
 
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
+
 def create_user(db: Session, email: str, password: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> User:
     hashed_password = get_password_hash(password)
     user = User(
@@ -78,7 +85,7 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
-async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -91,14 +98,14 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Se
     if user_id is None:
         raise credentials_exception
     
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id_async(db, user_id)
     if user is None:
         raise credentials_exception
     
     return user
 
 
-async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Optional[User]:
     if token is None:
         return None
     
@@ -106,4 +113,4 @@ async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme
     if user_id is None:
         return None
     
-    return get_user_by_id(db, user_id)
+    return await get_user_by_id_async(db, user_id)
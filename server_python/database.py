@@ -1,7 +1,16 @@
 import os
-from sqlalchemy import create_engine
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,14 +20,327 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(DATABASE_URL)
+# Optional replica for GET endpoints; unset (or equal to DATABASE_URL) keeps all traffic on the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+# After a write, that client's reads stay on the primary this long, so it sees its own changes.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_COOKIE = "db_primary_until"
+# The same deadline for clients that do not keep cookies: sent on writes, echoed back on reads.
+PRIMARY_HEADER = "X-DB-Primary-Until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open-ended.
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class PoolMetrics:
+    """Checkout counters and a wait-time histogram for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_counts = [0] * (len(POOL_WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, wait_ms: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.wait_counts[bisect.bisect_left(POOL_WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def record_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_mean_ms": self.wait_total_ms / observed if observed else 0.0,
+                "wait_max_ms": self.wait_max_ms,
+                "wait_histogram": [
+                    {"le_ms": bound, "count": count}
+                    for bound, count in zip(POOL_WAIT_BUCKETS_MS + (None,), self.wait_counts)
+                ],
+            }
+
+
+class _TimedCheckout:
+    """Pool mixin that times every checkout, including waits on an exhausted pool."""
+
+    def __init__(self, *args, metrics: Optional[PoolMetrics] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_database_url(url: str) -> str:
+    """
+    DATABASE_URL rewritten for the async driver of the same backend.
+
+    libpq-only query parameters are translated or dropped, since asyncpg
+    rejects them (serverless Postgres URLs usually carry sslmode).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None or parsed.get_driver_name() == driver:
+        return url
+
+    query = dict(parsed.query)
+    if backend == "postgresql":
+        sslmode = query.pop("sslmode", None)
+        if sslmode and sslmode != "disable":
+            query["ssl"] = sslmode
+        query.pop("channel_binding", None)
+    return parsed.set(drivername=f"{backend}+{driver}", query=query).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, env: Mapping[str, str] = os.environ, read_only: bool = False) -> Dict:
+    """
+    create_engine keyword arguments from DB_POOL_* settings.
+
+    SQLite keeps SQLAlchemy's default pooling; sizing only applies to
+    server databases. ``read_only`` makes Postgres sessions refuse writes.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    is_async = parsed.get_driver_name() == ASYNC_DRIVERS.get(backend)
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": int(env.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(env.get("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(env.get("DB_POOL_TIMEOUT", "30")),
+        # Serverless Postgres closes idle connections; recycle well before that.
+        "pool_recycle": int(env.get("DB_POOL_RECYCLE", "300")),
+        "pool_pre_ping": _env_bool(env.get("DB_POOL_PRE_PING", "true")),
+    }
+    settings = {}
+    statement_timeout = env.get("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout:
+        settings["statement_timeout"] = str(int(statement_timeout))
+    if read_only:
+        settings["default_transaction_read_only"] = "on"
+    if settings and backend == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": settings}
+        else:
+            options["connect_args"] = {"options": " ".join(f"-c {name}={value}" for name, value in settings.items())}
+    return options
+
+
+def _sqlite_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+def _listen_for_metrics(built: Engine):
+    metrics = getattr(built.pool, "metrics", None)
+    if metrics is not None:
+        event.listen(built.pool, "connect", metrics.record_connect)
+        event.listen(built.pool, "invalidate", metrics.record_invalidation)
+
+
+def build_engine(url: str, env: Mapping[str, str] = os.environ, read_only: bool = False, **overrides) -> Engine:
+    built = create_engine(url, **{**engine_options(url, env, read_only), **overrides})
+    _listen_for_metrics(built)
+    if read_only and built.url.get_backend_name() == "sqlite":
+        event.listen(built, "connect", _sqlite_query_only)
+    return built
+
+
+def build_async_engine(url: str, env: Mapping[str, str] = os.environ, read_only: bool = False, **overrides) -> AsyncEngine:
+    built = create_async_engine(url, **{**engine_options(url, env, read_only), **overrides})
+    _listen_for_metrics(built.sync_engine)
+    if read_only and built.url.get_backend_name() == "sqlite":
+        event.listen(built.sync_engine, "connect", _sqlite_query_only)
+    return built
+
+
+def pool_status(name: str, target: Engine) -> Dict:
+    """Live pool occupancy plus checkout metrics, where the pool supports them."""
+    pool = target.pool
+    status = {
+        "name": name,
+        "backend": target.url.get_backend_name(),
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_out": None,
+        "checked_in": None,
+        "overflow": None,
+        "max_overflow": None,
+        "timeout": None,
+        "recycle": pool._recycle,
+        "pre_ping": pool._pre_ping,
+    }
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    status["metrics"] = metrics.snapshot() if metrics is not None else None
+    return status
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Separate pool for async endpoints. A sqlite :memory: URL gives every async
+# connection its own empty database, so local async use needs a file URL.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+async_engine = build_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if DATABASE_READ_URL and DATABASE_READ_URL != DATABASE_URL:
+    read_engine = build_engine(DATABASE_READ_URL, read_only=True)
+    async_read_engine = build_async_engine(async_database_url(DATABASE_READ_URL), read_only=True)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    read_engine, async_read_engine = engine, async_engine
+    ReadSessionLocal, AsyncReadSessionLocal = SessionLocal, AsyncSessionLocal
+
 Base = declarative_base()
 
+
+class ReadRouter:
+    """
+    Sends reads to the replica, except for clients that wrote recently.
+
+    A successful write sets a short-lived cookie holding the time until
+    which that client's reads go to the primary, so stickiness needs no
+    server-side state and holds across workers. The deadline is also sent
+    as an X-DB-Primary-Until header; API clients without a cookie jar get
+    the same guarantee by sending it back on their reads.
+    """
+
+    def __init__(self, primary, replica, async_primary, async_replica, window_seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.primary = primary
+        self.replica = replica
+        self.async_primary = async_primary
+        self.async_replica = async_replica
+        self.window_seconds = window_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not self.primary
+
+    def use_primary(self, request: Request) -> bool:
+        now = time.time()
+        for deadline in (request.cookies.get(PRIMARY_COOKIE), request.headers.get(PRIMARY_HEADER)):
+            try:
+                if deadline and float(deadline) > now:
+                    return True
+            except ValueError:
+                pass
+        return False
+
+    def mark_write(self, response: Response):
+        if self.enabled and self.window_seconds > 0:
+            deadline = f"{time.time() + self.window_seconds:.3f}"
+            response.set_cookie(
+                PRIMARY_COOKIE, deadline,
+                max_age=math.ceil(self.window_seconds), httponly=True, samesite="lax"
+            )
+            response.headers[PRIMARY_HEADER] = deadline
+
+    def session_factory(self, request: Request):
+        return self.primary if self.use_primary(request) else self.replica
+
+    def async_session_factory(self, request: Request):
+        return self.async_primary if self.use_primary(request) else self.async_replica
+
+
+read_router = ReadRouter(SessionLocal, ReadSessionLocal, AsyncSessionLocal, AsyncReadSessionLocal)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints: the replica unless the client just wrote."""
+    db = read_router.session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    async with read_router.async_session_factory(request)() as db:
+        yield db
+
+
+def mark_write(request: Request, response: Response):
+    """Pin the client to the primary after a successful write."""
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        read_router.mark_write(response)
+
+
+def all_pool_status() -> List[Dict]:
+    status = [pool_status("sync", engine), pool_status("async", async_engine.sync_engine)]
+    if read_engine is not engine:
+        status += [pool_status("read", read_engine), pool_status("async-read", async_read_engine.sync_engine)]
+    return status
@@ -0,0 +1,89 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import schemas
+
+
+MAX_PAGE_SIZE = 1000
+# Selectable with fields=; id and priority are always returned so a page can continue.
+EPIC_FIELDS = {name: getattr(models.Epic, name) for name in schemas.Epic.model_fields}
+ALWAYS_SELECTED = ("id", "priority")
+
+
+@dataclass
+class EpicListParams:
+    limit: Optional[int] = None
+    after: Optional[Tuple[int, int]] = None
+    statuses: Optional[List[str]] = None
+    sources: Optional[List[str]] = None
+    sizes: Optional[List[str]] = None
+    fields: Optional[List[str]] = None
+
+
+def encode_cursor(priority: int, epic_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{priority}:{epic_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """(priority, id) of the last epic on the previous page; ValueError when malformed."""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        priority, epic_id = decoded.split(":")
+        return int(priority), int(epic_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - EPIC_FIELDS.keys())
+    if unknown:
+        raise ValueError(f"Unknown epic fields: {', '.join(unknown)}")
+    return list(dict.fromkeys([*ALWAYS_SELECTED, *requested]))
+
+
+def _filtered(query, team_id: int, params: EpicListParams):
+    query = query.where(models.Epic.team_id == team_id)
+    if params.statuses:
+        query = query.where(models.Epic.status.in_(params.statuses))
+    if params.sources:
+        query = query.where(models.Epic.source.in_(params.sources))
+    if params.sizes:
+        query = query.where(models.Epic.current_size.in_(params.sizes))
+    if params.after:
+        query = query.where(tuple_(models.Epic.priority, models.Epic.id) > params.after)
+    query = query.order_by(models.Epic.priority, models.Epic.id)
+    if params.limit:
+        # One extra row tells whether another page follows.
+        query = query.limit(params.limit + 1)
+    return query
+
+
+def list_epics(db: Session, team_id: int, params: EpicListParams) -> Tuple[list, Optional[str]]:
+    """
+    One page of a team's epics in (priority, id) order, plus the cursor for the next page.
+
+    With ``fields`` set, only those columns are selected and rows come back as
+    plain dicts from a Core select, so no ORM objects are built and unselected
+    columns such as description are never read.
+    """
+    if params.fields:
+        query = select(*(EPIC_FIELDS[name] for name in params.fields))
+        rows = [dict(row) for row in db.execute(_filtered(query, team_id, params)).mappings()]
+    else:
+        rows = list(db.scalars(_filtered(select(models.Epic), team_id, params)))
+
+    if not params.limit or len(rows) <= params.limit:
+        return rows, None
+    rows = rows[:params.limit]
+    last = rows[-1]
+    if params.fields:
+        return rows, encode_cursor(last["priority"], last["id"])
+    return rows, encode_cursor(last.priority, last.id)
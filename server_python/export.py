@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from server_python import forecast
+from server_python import models
+
+
+EPIC_COLUMNS = (
+    "id", "team_id", "external_id", "title", "description", "original_size", "current_size",
+    "status", "source", "priority", "created_at", "updated_at",
+)
+FORECAST_COLUMNS = ("points", "window_index", "starts_at", "ends_at", "beyond_capacity")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatError(ValueError):
+    pass
+
+
+def columns(include_forecast: bool) -> List[str]:
+    return [*EPIC_COLUMNS, *(FORECAST_COLUMNS if include_forecast else ())]
+
+
+class _TeamForecast:
+    """Running window allocation for one team while its epics stream past."""
+
+    def __init__(self, team: models.Team, size_points: Dict[str, int], window_count: int):
+        self.capacity = forecast.team_capacity(team)
+        self.size_points = size_points
+        self.window_count = window_count
+        self.total_capacity = self.capacity * window_count
+        self.allocated = 0
+
+    def assign(self, rows: List[dict]):
+        allocation = forecast.allocate_windows(
+            forecast.build_points_vector((row["current_size"] for row in rows), self.size_points),
+            self.capacity, self.window_count, offset=self.allocated
+        )
+        for row, points, window_index, starts_at, ends_at in zip(
+            rows,
+            allocation.points.tolist(),
+            allocation.window_index.tolist(),
+            allocation.starts_at.tolist(),
+            allocation.ends_at.tolist(),
+        ):
+            row.update(
+                points=points, window_index=window_index, starts_at=starts_at, ends_at=ends_at,
+                beyond_capacity=ends_at > self.total_capacity
+            )
+        if rows:
+            self.allocated = int(allocation.ends_at[-1])
+
+
+def _team_forecasts(db: Session, team_ids: Optional[Sequence[int]], window_count: int) -> Dict[int, _TeamForecast]:
+    team_query = select(models.Team)
+    mapping_query = select(models.SizeMapping.team_id, models.SizeMapping.size, models.SizeMapping.points)
+    if team_ids:
+        team_query = team_query.where(models.Team.id.in_(team_ids))
+        mapping_query = mapping_query.where(models.SizeMapping.team_id.in_(team_ids))
+    mappings: Dict[int, list] = {}
+    for row in db.execute(mapping_query):
+        mappings.setdefault(row.team_id, []).append(row)
+    return {
+        team.id: _TeamForecast(team, forecast.size_points_lookup(mappings.get(team.id, [])), window_count)
+        for team in db.scalars(team_query)
+    }
+
+
+def export_chunks(
+    db: Session,
+    team_ids: Optional[Sequence[int]] = None,
+    include_forecast: bool = False,
+    window_count: int = forecast.DEFAULT_WINDOW_COUNT,
+    chunk_size: Optional[int] = None
+) -> Iterator[List[dict]]:
+    """
+    Epics as lists of row dicts, ordered by team then priority.
+
+    Rows are fetched with ``yield_per``, which streams from a server-side
+    cursor on Postgres, so only one chunk is held at a time. With
+    ``include_forecast`` each row also gets its window assignment, allocated
+    per team in the same order as the forecast endpoints.
+    """
+    forecasts = _team_forecasts(db, team_ids, window_count) if include_forecast else {}
+    query = select(*(getattr(models.Epic, name) for name in EPIC_COLUMNS))
+    if team_ids:
+        query = query.where(models.Epic.team_id.in_(team_ids))
+    result = db.execute(
+        query.order_by(models.Epic.team_id, models.Epic.priority, models.Epic.id)
+        .execution_options(yield_per=chunk_size or forecast.STREAM_CHUNK_SIZE)
+    )
+    for partition in result.mappings().partitions():
+        rows = [dict(row) for row in partition]
+        if include_forecast:
+            start = 0
+            for i in range(1, len(rows) + 1):
+                if i == len(rows) or rows[i]["team_id"] != rows[start]["team_id"]:
+                    forecasts[rows[start]["team_id"]].assign(rows[start:i])
+                    start = i
+        yield rows
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_stream(chunks: Iterator[List[dict]], names: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=names, extrasaction="ignore")
+    writer.writeheader()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_stream(chunks: Iterator[List[dict]], names: List[str]) -> Iterator[str]:
+    for rows in chunks:
+        yield "".join(
+            json.dumps({name: _json_value(row[name]) for name in names}) + "\n" for row in rows
+        )
+
+
+class _Drain:
+    """Write-only file that hands back what was written since the last drain, keeping offsets intact."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _parquet_schema(names: List[str]):
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(), "team_id": pa.int64(), "priority": pa.int64(),
+        "created_at": pa.timestamp("us", tz="UTC"), "updated_at": pa.timestamp("us", tz="UTC"),
+        "points": pa.int64(), "window_index": pa.int64(), "starts_at": pa.int64(), "ends_at": pa.int64(),
+        "beyond_capacity": pa.bool_(),
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in names])
+
+
+def parquet_stream(chunks: Iterator[List[dict]], names: List[str]) -> Iterator[bytes]:
+    """One row group per chunk, sent as soon as it is written; the footer comes last."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(names)
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMS = {"csv": csv_stream, "ndjson": ndjson_stream, "parquet": parquet_stream}
+
+
+def check_format(export_format: str):
+    if export_format not in STREAMS:
+        raise ExportFormatError(f"Unknown export format '{export_format}'; use csv, ndjson or parquet")
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportFormatError("Parquet export needs the optional pyarrow package")
+
+
+def export_stream(
+    db: Session,
+    export_format: str,
+    team_ids: Optional[Sequence[int]] = None,
+    include_forecast: bool = False,
+    window_count: int = forecast.DEFAULT_WINDOW_COUNT
+):
+    names = columns(include_forecast)
+    chunks = export_chunks(db, team_ids, include_forecast, window_count)
+    return STREAMS[export_format](chunks, names)
@@ -0,0 +1,213 @@
+import csv
+import math
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import versions
+from server_python.imports import IMPORT_BATCH_SIZE
+from server_python.ranking import RANK_GAP, append_rank
+from server_python.size_lookup import DEFAULT_SIZE, SizeLookup
+
+
+# The error report keeps this many rows; error_count still covers every failure.
+MAX_REPORTED_ERRORS = 1000
+SIZE_ALIASES = {"2XS": "2-XS", "XXS": "2-XS", "2XL": "2-XL", "XXL": "2-XL", "3XL": "3-XL", "XXXL": "3-XL"}
+# Header keywords, matched the way the browser importer matched them.
+TITLE_HEADERS = ("title", "summary", "name")
+DESCRIPTION_HEADERS = ("description", "desc")
+SIZE_HEADERS = ("size",)
+POINTS_HEADERS = ("points", "estimate")
+
+
+class FileFormatError(ValueError):
+    pass
+
+
+@dataclass
+class RowError:
+    row: int
+    error: str
+
+
+@dataclass
+class FileImportResult:
+    imported_count: int = 0
+    error_count: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def add_error(self, row: int, error: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row, error))
+
+
+def file_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return "xlsx"
+    if name.endswith((".csv", ".txt")) or content_type in ("text/csv", "text/plain"):
+        return "csv"
+    raise FileFormatError("Upload a .csv or .xlsx file")
+
+
+def _decoded_lines(upload: BinaryIO) -> Iterator[str]:
+    # Decoding line by line pins an encoding error to its row.
+    encoding = "utf-8-sig"
+    for line in upload:
+        yield line.decode(encoding)
+        encoding = "utf-8"
+
+
+def csv_rows(upload: BinaryIO) -> Iterator[Tuple[int, List[str]]]:
+    """Rows with the file line each ends on; a quoted field can span several lines."""
+    reader = csv.reader(_decoded_lines(upload))
+    for values in reader:
+        yield reader.line_num, values
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def xlsx_rows(upload: BinaryIO) -> Iterator[Tuple[int, List[str]]]:
+    """Numbered rows of the first sheet; read-only mode loads one row at a time."""
+    import openpyxl
+
+    try:
+        workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, KeyError, OSError):
+        raise FileFormatError("Not a readable .xlsx workbook")
+    try:
+        for number, row in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+            yield number, [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(
+    upload: BinaryIO, filename: Optional[str], content_type: Optional[str]
+) -> Iterator[Tuple[int, List[str]]]:
+    if file_format(filename, content_type) == "xlsx":
+        return xlsx_rows(upload)
+    return csv_rows(upload)
+
+
+def _column(headers: List[str], keywords: Iterable[str]) -> Optional[int]:
+    return next((i for i, h in enumerate(headers) if any(k in h for k in keywords)), None)
+
+
+def _points_size(value: str, lookup: SizeLookup) -> str:
+    try:
+        points = float(value)
+    except ValueError:
+        raise ValueError(f"Unknown size '{value}'; expected one of {', '.join(models.T_SHIRT_SIZES)} or story points")
+    if not math.isfinite(points):
+        raise ValueError(f"Story points must be a finite number, got '{value}'")
+    if points < 0:
+        raise ValueError("Story points cannot be negative")
+    if not lookup:
+        raise ValueError("Team has no size mappings to convert story points")
+    return lookup.closest(round(points))[0]
+
+
+def parse_size(value: str, lookup: SizeLookup) -> str:
+    """T-shirt size from a size label or a story-point count; blank means the default size."""
+    size = value.strip().upper().replace(" ", "")
+    if not size:
+        return DEFAULT_SIZE
+    size = SIZE_ALIASES.get(size, size)
+    if size in models.T_SHIRT_SIZES:
+        return size
+    return _points_size(size, lookup)
+
+
+class _Importer:
+    def __init__(self, db: Session, team_id: int):
+        self.db = db
+        self.team_id = team_id
+        self.next_priority = append_rank(db, team_id)
+        self.batch: List[dict] = []
+        self.inserted = 0
+
+    def add(self, title: str, description: str, size: str):
+        self.batch.append({
+            "team_id": self.team_id,
+            "title": title,
+            "description": description,
+            "original_size": size,
+            "current_size": size,
+            "status": "backlog",
+            "source": "Template",
+            "is_template": False,
+            "priority": self.next_priority,
+        })
+        self.next_priority += RANK_GAP
+        if len(self.batch) >= IMPORT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Insert and commit the pending rows as one transaction."""
+        if self.batch:
+            self.db.execute(insert(models.Epic), self.batch)
+            self.db.execute(versions.bump(self.team_id))
+            self.db.commit()
+            self.inserted += len(self.batch)
+            self.batch = []
+
+
+def import_rows(
+    db: Session, team_id: int, rows: Iterable[Tuple[int, List[str]]], lookup: SizeLookup
+) -> FileImportResult:
+    """
+    Create one backlog epic per valid row, committing every IMPORT_BATCH_SIZE rows.
+
+    Rows come numbered by read_rows and the first is the header. Invalid rows
+    are reported by the file line they end on (the sheet row for .xlsx) and
+    skipped; rows before a parse failure stay imported.
+    """
+    rows = iter(rows)
+    try:
+        line, headers = next(rows, (1, []))
+        headers = [h.strip().lower() for h in headers]
+    except (UnicodeDecodeError, csv.Error):
+        raise FileFormatError("Could not read the header row; CSV files must be UTF-8")
+    title_column = _column(headers, TITLE_HEADERS)
+    if title_column is None:
+        raise FileFormatError("File must have a 'title', 'summary' or 'name' column")
+    description_column = _column(headers, DESCRIPTION_HEADERS)
+    size_column = _column(headers, SIZE_HEADERS)
+    points_column = _column(headers, POINTS_HEADERS)
+
+    def value(values: List[str], column: Optional[int]) -> str:
+        return values[column].strip() if column is not None and column < len(values) else ""
+
+    result = FileImportResult()
+    importer = _Importer(db, team_id)
+    try:
+        for line, values in rows:
+            if not any(v.strip() for v in values):
+                continue
+            title = value(values, title_column)
+            if not title:
+                result.add_error(line, "Missing title")
+                continue
+            try:
+                points = value(values, points_column)
+                size = _points_size(points, lookup) if points else parse_size(value(values, size_column), lookup)
+            except ValueError as e:
+                result.add_error(line, str(e))
+                continue
+            importer.add(title, value(values, description_column), size)
+    except (UnicodeDecodeError, csv.Error) as e:
+        result.add_error(line + 1, f"Unreadable row, import stopped: {e}")
+    importer.flush()
+    result.imported_count = importer.inserted
+    return result
@@ -0,0 +1,335 @@
+import json
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import schemas
+
+
+DEFAULT_WINDOW_COUNT = 3
+MAX_SWEEP_SCENARIOS = 10_000
+# Epics fetched per round trip when streaming; memory stays bounded by this.
+STREAM_CHUNK_SIZE = 5_000
+
+
+@dataclass
+class WindowAllocation:
+    """Per-epic allocation arrays (priority order) plus per-window load."""
+    points: np.ndarray
+    starts_at: np.ndarray
+    ends_at: np.ndarray
+    window_index: np.ndarray
+    straddles_line: np.ndarray
+    points_in_window: np.ndarray
+    rollover_points: np.ndarray
+    used_points: np.ndarray
+    cut_line_index: int
+
+
+def team_capacity(
+    team: models.Team,
+    engineer_count: Optional[int] = None,
+    avg_points_per_engineer: Optional[int] = None,
+    sprints_in_increment: Optional[int] = None
+) -> int:
+    """Points per planning window, with optional scenario overrides."""
+    engineers = team.engineer_count if engineer_count is None else engineer_count
+    points_per_engineer = team.avg_points_per_engineer if avg_points_per_engineer is None else avg_points_per_engineer
+    sprints = team.sprints_in_increment if sprints_in_increment is None else sprints_in_increment
+    return (engineers or 0) * (points_per_engineer or 0) * (sprints or 0)
+
+
+def size_points_lookup(size_mappings: Iterable) -> Dict[str, int]:
+    """Points per size; a size mapped more than once takes its largest points, as the portfolio query does."""
+    size_points: Dict[str, int] = {}
+    for m in size_mappings:
+        size_points[m.size] = max(m.points, size_points.get(m.size, m.points))
+    return size_points
+
+
+def build_points_vector(sizes: Iterable[str], size_points: Dict[str, int]) -> np.ndarray:
+    """Points per epic in priority order; sizes without a mapping count as zero."""
+    return np.fromiter((size_points.get(s, 0) for s in sizes), dtype=np.int64)
+
+
+def allocate_windows(points: np.ndarray, capacity: int, window_count: int, offset: int = 0) -> WindowAllocation:
+    """
+    Vectorized equivalent of the ForecastPlanner allocation loop.
+
+    Each epic lands in the window its cumulative start point falls into;
+    epics past the last window pile into it. An epic crossing a window
+    boundary keeps the part that fits and rolls the rest into the next window.
+    ``offset`` is the points already allocated ahead of ``points``, so a
+    backlog can be allocated a chunk at a time.
+    """
+    points = np.asarray(points, dtype=np.int64)
+    ends_at = np.cumsum(points) + offset
+    starts_at = ends_at - points
+    last_window = window_count - 1
+
+    if capacity > 0:
+        boundaries = np.arange(1, window_count, dtype=np.int64) * capacity
+        window_index = np.searchsorted(boundaries, starts_at, side="right")
+    else:
+        window_index = np.full(points.shape, last_window, dtype=np.int64)
+
+    window_end = (window_index + 1) * capacity
+    straddles_line = (starts_at < window_end) & (ends_at > window_end) & (window_index < last_window)
+    points_in_window = np.where(straddles_line, window_end - starts_at, points)
+    rollover_points = np.where(straddles_line, ends_at - window_end, 0)
+
+    used_points = np.bincount(window_index, weights=points_in_window, minlength=window_count)
+    used_points += np.bincount(
+        window_index[straddles_line] + 1,
+        weights=rollover_points[straddles_line],
+        minlength=window_count
+    )
+
+    total_capacity = capacity * window_count
+    cut_line_index = int(np.searchsorted(ends_at, total_capacity, side="right")) - 1
+
+    return WindowAllocation(
+        points=points,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        window_index=window_index,
+        straddles_line=straddles_line,
+        points_in_window=points_in_window,
+        rollover_points=rollover_points,
+        used_points=used_points.astype(np.int64),
+        cut_line_index=cut_line_index,
+    )
+
+
+def sweep_capacities(ends_at: np.ndarray, capacities: np.ndarray, window_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Windows needed and cut line for many capacities against one backlog.
+
+    Returns ``windows_needed`` (-1 where capacity is zero and work remains)
+    and ``cut_line_index`` (-1 where nothing fits), both aligned with
+    ``capacities``.
+    """
+    total = int(ends_at[-1]) if len(ends_at) else 0
+    capacities = np.asarray(capacities, dtype=np.int64)
+    positive = capacities > 0
+
+    windows_needed = np.full(capacities.shape, -1 if total else 0, dtype=np.int64)
+    windows_needed[positive] = -(-total // capacities[positive])
+
+    cut_line_index = np.searchsorted(ends_at, capacities * window_count, side="right") - 1
+    return windows_needed, cut_line_index
+
+
+def sweep_values(sweep_range: Optional[schemas.SweepRange], current: int) -> np.ndarray:
+    if sweep_range is None:
+        return np.array([current or 0], dtype=np.int64)
+    return np.arange(sweep_range.start, sweep_range.stop + 1, sweep_range.step, dtype=np.int64)
+
+
+def load_team_backlog(
+    db: Session,
+    team_id: int,
+    size_mappings: Optional[Iterable] = None
+) -> Tuple[List[int], List[str], np.ndarray]:
+    """Epic ids, sizes and points vector for a team, in priority order."""
+    if size_mappings is None:
+        size_mappings = db.query(models.SizeMapping.size, models.SizeMapping.points).filter(
+            models.SizeMapping.team_id == team_id
+        )
+    size_points = size_points_lookup(size_mappings)
+    rows = db.query(models.Epic.id, models.Epic.current_size).filter(
+        models.Epic.team_id == team_id
+    ).order_by(models.Epic.priority, models.Epic.id).all()
+
+    epic_ids = [row.id for row in rows]
+    sizes = [row.current_size for row in rows]
+    return epic_ids, sizes, build_points_vector(sizes, size_points)
+
+
+def build_forecast(
+    team_id: int,
+    epic_ids: List[int],
+    allocation: WindowAllocation,
+    capacity: int,
+    window_count: int
+) -> schemas.Forecast:
+    windows = [
+        schemas.ForecastWindow(index=i, capacity=capacity, used_points=used, epics=[])
+        for i, used in enumerate(allocation.used_points.tolist())
+    ]
+    for epic_id, points, window_index, points_in_window, rollover, starts_at, ends_at, straddles in zip(
+        epic_ids,
+        allocation.points.tolist(),
+        allocation.window_index.tolist(),
+        allocation.points_in_window.tolist(),
+        allocation.rollover_points.tolist(),
+        allocation.starts_at.tolist(),
+        allocation.ends_at.tolist(),
+        allocation.straddles_line.tolist(),
+    ):
+        windows[window_index].epics.append(schemas.EpicAllocation(
+            epic_id=epic_id,
+            points=points,
+            window_index=window_index,
+            points_in_window=points_in_window,
+            rollover_points=rollover,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            straddles_line=straddles,
+        ))
+
+    total_points = int(allocation.ends_at[-1]) if len(epic_ids) else 0
+    total_capacity = capacity * window_count
+    cut_line_index = allocation.cut_line_index
+
+    return schemas.Forecast(
+        team_id=team_id,
+        capacity=capacity,
+        window_count=window_count,
+        total_points=total_points,
+        total_capacity=total_capacity,
+        beyond_capacity=total_points > total_capacity,
+        cut_line_index=cut_line_index,
+        cut_line_epic_id=epic_ids[cut_line_index] if cut_line_index >= 0 else None,
+        windows=windows,
+    )
+
+
+def forecast_team(
+    db: Session,
+    team: models.Team,
+    window_count: int = DEFAULT_WINDOW_COUNT,
+    engineer_count: Optional[int] = None,
+    avg_points_per_engineer: Optional[int] = None,
+    sprints_in_increment: Optional[int] = None
+) -> schemas.Forecast:
+    """Allocate a team's backlog across planning windows."""
+    capacity = team_capacity(team, engineer_count, avg_points_per_engineer, sprints_in_increment)
+    epic_ids, _, points = load_team_backlog(db, team.id)
+    allocation = allocate_windows(points, capacity, window_count)
+    return build_forecast(team.id, epic_ids, allocation, capacity, window_count)
+
+
+def sweep_team(db: Session, team: models.Team, request: schemas.ForecastSweepRequest) -> schemas.ForecastSweep:
+    """Evaluate every combination of the requested capacity ranges at once."""
+    engineers = sweep_values(request.engineer_count, team.engineer_count)
+    points_per_engineer = sweep_values(request.avg_points_per_engineer, team.avg_points_per_engineer)
+    sprints = sweep_values(request.sprints_in_increment, team.sprints_in_increment)
+
+    grid = np.stack(np.meshgrid(engineers, points_per_engineer, sprints, indexing="ij"), axis=-1).reshape(-1, 3)
+    capacities = grid.prod(axis=1)
+
+    epic_ids, _, points = load_team_backlog(db, team.id)
+    ends_at = np.cumsum(points)
+    windows_needed, cut_line_index = sweep_capacities(ends_at, capacities, request.window_count)
+
+    return schemas.ForecastSweep(
+        team_id=team.id,
+        window_count=request.window_count,
+        total_points=int(ends_at[-1]) if len(ends_at) else 0,
+        scenarios=[
+            schemas.SweepScenario(
+                engineer_count=e,
+                avg_points_per_engineer=p,
+                sprints_in_increment=s,
+                capacity=capacity,
+                windows_needed=needed if needed >= 0 else None,
+                cut_line_index=cut,
+                cut_line_epic_id=epic_ids[cut] if cut >= 0 else None,
+            )
+            for (e, p, s), capacity, needed, cut in zip(
+                grid.tolist(), capacities.tolist(), windows_needed.tolist(), cut_line_index.tolist()
+            )
+        ],
+    )
+
+
+def stream_team_forecast(
+    db: Session,
+    team: models.Team,
+    window_count: int = DEFAULT_WINDOW_COUNT,
+    engineer_count: Optional[int] = None,
+    avg_points_per_engineer: Optional[int] = None,
+    sprints_in_increment: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[str]:
+    """
+    The same allocation as ``forecast_team`` as NDJSON lines.
+
+    A ``forecast`` header comes first, then each window's ``window`` line
+    followed by the ``epic`` lines allocated to it, and a ``summary`` with the
+    per-window load and cut line last. Epics are read with ``yield_per`` and
+    allocated one chunk at a time, carrying the running total between chunks.
+    """
+    capacity = team_capacity(team, engineer_count, avg_points_per_engineer, sprints_in_increment)
+    total_capacity = capacity * window_count
+    size_points = size_points_lookup(
+        db.query(models.SizeMapping.size, models.SizeMapping.points)
+        .filter(models.SizeMapping.team_id == team.id)
+    )
+    yield json.dumps({
+        "type": "forecast", "team_id": team.id, "capacity": capacity,
+        "window_count": window_count, "total_capacity": total_capacity
+    }) + "\n"
+
+    result = db.execute(
+        select(models.Epic.id, models.Epic.current_size)
+        .where(models.Epic.team_id == team.id)
+        .order_by(models.Epic.priority, models.Epic.id)
+        .execution_options(yield_per=chunk_size or STREAM_CHUNK_SIZE)
+    )
+    used_points = np.zeros(window_count, dtype=np.int64)
+    total_points = 0
+    epic_count = 0
+    cut_line_index = -1
+    cut_line_epic_id = None
+    current_window = -1
+
+    for rows in result.partitions():
+        epic_ids = [row.id for row in rows]
+        allocation = allocate_windows(
+            build_points_vector((row.current_size for row in rows), size_points),
+            capacity, window_count, offset=total_points
+        )
+        used_points += allocation.used_points
+        if allocation.cut_line_index >= 0:
+            cut_line_index = epic_count + allocation.cut_line_index
+            cut_line_epic_id = epic_ids[allocation.cut_line_index]
+
+        lines = []
+        for epic_id, points, window_index, points_in_window, rollover, starts_at, ends_at, straddles in zip(
+            epic_ids,
+            allocation.points.tolist(),
+            allocation.window_index.tolist(),
+            allocation.points_in_window.tolist(),
+            allocation.rollover_points.tolist(),
+            allocation.starts_at.tolist(),
+            allocation.ends_at.tolist(),
+            allocation.straddles_line.tolist(),
+        ):
+            while current_window < window_index:
+                current_window += 1
+                lines.append(json.dumps({"type": "window", "index": current_window, "capacity": capacity}))
+            lines.append(json.dumps({
+                "type": "epic", "epic_id": epic_id, "points": points, "window_index": window_index,
+                "points_in_window": points_in_window, "rollover_points": rollover,
+                "starts_at": starts_at, "ends_at": ends_at, "straddles_line": straddles
+            }))
+        yield "\n".join(lines) + "\n"
+
+        total_points = int(allocation.ends_at[-1])
+        epic_count += len(epic_ids)
+
+    lines = []
+    while current_window < window_count - 1:
+        current_window += 1
+        lines.append(json.dumps({"type": "window", "index": current_window, "capacity": capacity}))
+    lines.append(json.dumps({
+        "type": "summary", "epic_count": epic_count, "total_points": total_points,
+        "beyond_capacity": total_points > total_capacity, "used_points": used_points.tolist(),
+        "cut_line_index": cut_line_index, "cut_line_epic_id": cut_line_epic_id
+    }))
+    yield "\n".join(lines) + "\n"
@@ -0,0 +1,90 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+from server_python import schemas
+
+
+FORECAST_CACHE_MAX_BYTES = int(os.getenv("FORECAST_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Measured footprint of one cached EpicAllocation; the rest of a Forecast is negligible.
+EPIC_ALLOCATION_BYTES = 1200
+FORECAST_BASE_BYTES = 2048
+
+T = TypeVar("T")
+
+
+def forecast_size(result: schemas.Forecast) -> int:
+    return FORECAST_BASE_BYTES + EPIC_ALLOCATION_BYTES * sum(len(w.epics) for w in result.windows)
+
+
+class ForecastCache:
+    """
+    LRU cache of computed forecasts, keyed by team data version.
+
+    Write endpoints call ``bump(team_id)`` after committing, which moves the
+    team to a new version and drops its entries. A result computed against
+    an older version is never stored, so a read racing a write cannot
+    repopulate the cache with stale data.
+    """
+
+    def __init__(self, max_bytes: int = FORECAST_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._versions: Dict[int, int] = {}
+        self._entries: "OrderedDict[Tuple[int, Tuple[int, int], Hashable], Tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version(self, team_id: int) -> Tuple[int, int]:
+        return self._generation, self._versions.get(team_id, 0)
+
+    def get_or_compute(
+        self,
+        team_id: int,
+        params: Hashable,
+        compute: Callable[[], T],
+        size: Callable[[T], int] = forecast_size
+    ) -> T:
+        with self._lock:
+            key = (team_id, self._version(team_id), params)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        value_size = size(value)
+        if value_size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if self._version(team_id) != key[1] or key in self._entries:
+                return value
+            self._entries[key] = (value, value_size)
+            self.size_bytes += value_size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+        return value
+
+    def bump(self, team_id: int):
+        """Invalidate everything cached for a team after its epics, size mappings or capacity change."""
+        with self._lock:
+            self._versions[team_id] = self._versions.get(team_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == team_id]:
+                _, entry_size = self._entries.pop(key)
+                self.size_bytes -= entry_size
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.size_bytes = 0
+
+
+forecast_cache = ForecastCache()
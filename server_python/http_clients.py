@@ -0,0 +1,176 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Set
+import httpx
+
+from server_python.logger import get_logger
+
+logger = get_logger("http")
+
+# Upper bounds (ms) of the upstream latency histogram; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def client_options(env: Mapping[str, str] = os.environ) -> Dict:
+    """httpx.AsyncClient keyword arguments from UPSTREAM_* settings."""
+    http2 = _env_bool(env.get("UPSTREAM_HTTP2", "true"))
+    if http2 and not _http2_available():
+        logger.warning("UPSTREAM_HTTP2 is on but the h2 package is missing; using HTTP/1.1")
+        http2 = False
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=int(env.get("UPSTREAM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(env.get("UPSTREAM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(env.get("UPSTREAM_KEEPALIVE_EXPIRY", "30")),
+        ),
+        "timeout": httpx.Timeout(
+            float(env.get("UPSTREAM_TIMEOUT", "30")),
+            connect=float(env.get("UPSTREAM_CONNECT_TIMEOUT", "5")),
+        ),
+    }
+
+
+class LatencyMetrics:
+    """Call counts and a latency histogram per upstream endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+
+    def observe(self, endpoint: str, elapsed_ms: float, status_code: Optional[int]):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "counts": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            })
+            stats["calls"] += 1
+            if status_code is None or status_code >= 400:
+                stats["errors"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["counts"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "latency_mean_ms": stats["total_ms"] / stats["calls"],
+                    "latency_max_ms": stats["max_ms"],
+                    "latency_histogram": [
+                        {"le_ms": bound, "count": count}
+                        for bound, count in zip(LATENCY_BUCKETS_MS + (None,), stats["counts"])
+                    ],
+                }
+                for endpoint, stats in sorted(self._endpoints.items())
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+upstream_metrics = LatencyMetrics()
+
+
+class SharedClient:
+    """
+    One keep-alive httpx.AsyncClient per upstream service.
+
+    The client is created on first use and closed with the app lifespan.
+    A client belongs to the event loop that created it, so a call from a
+    different loop (a test, a script) gets a fresh one, and the old one is
+    closed on its own loop if that still runs, or else on this one.
+    """
+
+    def __init__(self, name: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.name = name
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_transport: Optional[httpx.AsyncBaseTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if (self._client is None or self._client.is_closed or self._loop is not loop
+                or self._client_transport is not self.transport):
+            if self._client is not None and not self._client.is_closed:
+                self._retire(self._client, self._loop)
+            options = client_options()
+            if self.transport is not None:
+                options["transport"] = self.transport
+            self._client = httpx.AsyncClient(**options)
+            self._client_transport = self.transport
+            self._loop = loop
+        return self._client
+
+    def _retire(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._close_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_quietly(self, client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Connections opened on a loop that has since closed cannot be shut down cleanly.
+            logger.debug(f"{self.name}: closing a client from a finished event loop failed: {e}")
+
+    async def get(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared client, timing it under ``<service> <endpoint>``."""
+        start = time.perf_counter()
+        status_code = None
+        try:
+            response = await self.client.get(url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            upstream_metrics.observe(f"{self.name} {endpoint}", (time.perf_counter() - start) * 1000, status_code)
+
+    async def aclose(self):
+        client, loop = self._client, self._loop
+        self._client = self._loop = self._client_transport = None
+        if client is None or client.is_closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        else:
+            self._retire(client, loop)
+
+
+_clients: Dict[str, SharedClient] = {}
+
+
+def shared_client(name: str) -> SharedClient:
+    """The one SharedClient for a service; every service instance built in the process shares it."""
+    if name not in _clients:
+        _clients[name] = SharedClient(name)
+    return _clients[name]
+
+
+async def close_all():
+    for client in _clients.values():
+        await client.aclose()
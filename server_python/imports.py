@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python.ranking import RANK_GAP, append_rank
+
+
+# Rows per INSERT statement; 500 rows x 10 columns stays under SQLite's bind limit.
+IMPORT_BATCH_SIZE = 500
+# Fields a re-import refreshes from the source. Size, status and priority are
+# planning decisions made in the app and are left alone.
+REFRESHED_FIELDS = ("title", "description", "original_size")
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@dataclass
+class ImportedItem:
+    external_id: str
+    title: str
+    description: str
+    size: str
+
+
+def _upsert_statement(dialect: str, rows: List[dict], track_size: bool = False):
+    insert = _INSERTS[dialect]
+    statement = insert(models.Epic).values(rows)
+    refreshed = {field: statement.excluded[field] for field in REFRESHED_FIELDS}
+    if track_size:
+        # An epic still at its source size follows the source; one resized in the app keeps its size.
+        epics = models.Epic.__table__.c
+        refreshed["current_size"] = case(
+            (epics.current_size == epics.original_size, statement.excluded.original_size),
+            else_=epics.current_size
+        )
+    return statement.on_conflict_do_update(
+        index_elements=[models.Epic.team_id, models.Epic.source, models.Epic.external_id],
+        set_={**refreshed, "updated_at": func.now()}
+    ).returning(models.Epic)
+
+
+def upsert_epics(
+    db: Session, team_id: int, source: str, items: List[ImportedItem], track_size: bool = False
+) -> Tuple[List[models.Epic], int]:
+    """
+    Insert or refresh one epic per (team, source, external id) in batched statements.
+
+    New epics are appended after the team's lowest-priority epic, in import
+    order. With ``track_size``, current sizes not changed in the app follow
+    a changed source size. Nothing is committed. Returns the epics in import
+    order and how many were created.
+    """
+    first_seen = {}
+    for item in items:
+        first_seen.setdefault(item.external_id, item)
+    unique = list(first_seen.values())
+    keys = [item.external_id for item in unique]
+    existing = set()
+    for start in range(0, len(keys), IMPORT_BATCH_SIZE):
+        existing.update(db.scalars(
+            select(models.Epic.external_id).where(
+                models.Epic.team_id == team_id,
+                models.Epic.source == source,
+                models.Epic.external_id.in_(keys[start:start + IMPORT_BATCH_SIZE])
+            )
+        ))
+
+    next_priority = append_rank(db, team_id)
+    rows = []
+    for item in unique:
+        priority = 0
+        if item.external_id not in existing:
+            priority, next_priority = next_priority, next_priority + RANK_GAP
+        rows.append({
+            "team_id": team_id,
+            "source": source,
+            "external_id": item.external_id,
+            "title": item.title,
+            "description": item.description,
+            "original_size": item.size,
+            "current_size": item.size,
+            "status": "backlog",
+            "is_template": False,
+            "priority": priority,
+        })
+
+    dialect = db.get_bind().dialect.name
+    by_key = {}
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        statement = _upsert_statement(dialect, rows[start:start + IMPORT_BATCH_SIZE], track_size)
+        for epic in db.scalars(statement, execution_options={"populate_existing": True}):
+            by_key[epic.external_id] = epic
+    return [by_key[key] for key in keys], len(keys) - len(existing)
+
+
+def delete_missing(
+    db: Session,
+    team_id: int,
+    source: str,
+    keep: Set[str],
+    prefix: Optional[str] = None,
+    among: Optional[Set[str]] = None
+) -> int:
+    """
+    Delete the team's epics from ``source`` whose external id is not in ``keep``.
+
+    With ``prefix`` (a Jira project's ``KEY-``) only ids starting with it,
+    and with ``among`` only those ids, are considered, so epics imported
+    from other projects or boards are left alone. Nothing is committed.
+    """
+    query = select(models.Epic.id, models.Epic.external_id).where(
+        models.Epic.team_id == team_id,
+        models.Epic.source == source,
+        models.Epic.external_id.is_not(None)
+    )
+    if prefix is not None:
+        query = query.where(models.Epic.external_id.startswith(prefix, autoescape=True))
+    stale = [
+        epic_id for epic_id, external_id in db.execute(query)
+        if external_id not in keep and (among is None or external_id in among)
+    ]
+    for start in range(0, len(stale), IMPORT_BATCH_SIZE):
+        db.execute(delete(models.Epic).where(models.Epic.id.in_(stale[start:start + IMPORT_BATCH_SIZE])))
+    return len(stale)
@@ -0,0 +1,351 @@
+import itertools
+import threading
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import schemas
+from server_python.forecast import team_capacity, size_points_lookup
+from server_python.ranking import RANK_GAP
+
+
+MAX_TRACKED_FORECASTS = 256
+CHANGELOG_LENGTH = 100
+
+_versions = itertools.count(1)
+
+
+def _sorted_position(priorities: np.ndarray, epic_ids: np.ndarray, priority: int, epic_id: int) -> int:
+    """Index at which (priority, epic_id) belongs in a backlog ordered by priority, then id."""
+    lo = int(np.searchsorted(priorities, priority, side="left"))
+    hi = int(np.searchsorted(priorities, priority, side="right"))
+    return lo + int(np.searchsorted(epic_ids[lo:hi], epic_id))
+
+
+class IncrementalForecast:
+    """
+    Window allocation for one team and window count, kept up to date in place.
+
+    Epics are held in priority order with a prefix-sum array of their points.
+    An edit only shifts the prefix sums from the first affected position, and
+    window assignments are recomputed for that range alone (a move only
+    touches the epics between its old and new position). ``data_version`` is
+    the team's data version the state reflects.
+    """
+
+    def __init__(
+        self,
+        window_count: int,
+        capacity: int,
+        size_points: Dict[str, int],
+        epic_ids: np.ndarray,
+        priorities: np.ndarray,
+        sizes: List[str],
+        data_version: int = 0
+    ):
+        self.window_count = window_count
+        self.data_version = data_version
+        self.capacity = capacity
+        self.size_points = size_points
+        self.epic_ids = np.asarray(epic_ids, dtype=np.int64)
+        self.priorities = np.asarray(priorities, dtype=np.int64)
+        self.sizes = list(sizes)
+        self.points = np.fromiter((size_points.get(s, 0) for s in self.sizes), dtype=np.int64, count=len(self.sizes))
+        self.ends_at = np.cumsum(self.points)
+
+        n = len(self.epic_ids)
+        self.window_index = np.full(n, -1, dtype=np.int64)
+        self.points_in_window = np.zeros(n, dtype=np.int64)
+        self.straddles_line = np.zeros(n, dtype=bool)
+        self._recompute(0, n)
+
+        self.base_version = next(_versions)
+        self.version = self.base_version
+        # Every change after oldest_version is still in the changelog.
+        self.oldest_version = self.base_version
+        self.changelog = deque()
+
+    def _index_of(self, epic_id: int) -> Optional[int]:
+        found = np.flatnonzero(self.epic_ids == epic_id)
+        return int(found[0]) if len(found) else None
+
+    def _recompute(self, start: int, stop: int) -> np.ndarray:
+        """Re-allocate epics in [start, stop) and return indices whose allocation changed."""
+        points = self.points[start:stop]
+        ends_at = self.ends_at[start:stop]
+        starts_at = ends_at - points
+        last_window = self.window_count - 1
+
+        if self.capacity > 0:
+            boundaries = np.arange(1, self.window_count, dtype=np.int64) * self.capacity
+            window_index = np.searchsorted(boundaries, starts_at, side="right")
+        else:
+            window_index = np.full(points.shape, last_window, dtype=np.int64)
+
+        window_end = (window_index + 1) * self.capacity
+        straddles_line = (starts_at < window_end) & (ends_at > window_end) & (window_index < last_window)
+        points_in_window = np.where(straddles_line, window_end - starts_at, points)
+
+        changed = (
+            (window_index != self.window_index[start:stop])
+            | (straddles_line != self.straddles_line[start:stop])
+            | (points_in_window != self.points_in_window[start:stop])
+        )
+        self.window_index[start:stop] = window_index
+        self.straddles_line[start:stop] = straddles_line
+        self.points_in_window[start:stop] = points_in_window
+        return np.flatnonzero(changed) + start
+
+    def _record(self, changed: np.ndarray, removed: Iterable[int] = ()) -> None:
+        self.version = next(_versions)
+        self.changelog.append((
+            self.version,
+            {int(self.epic_ids[i]): self.allocation(int(i)) for i in changed},
+            set(removed),
+        ))
+        if len(self.changelog) > CHANGELOG_LENGTH:
+            self.oldest_version = self.changelog.popleft()[0]
+
+    def allocation(self, i: int) -> schemas.EpicAllocation:
+        points = int(self.points[i])
+        ends_at = int(self.ends_at[i])
+        points_in_window = int(self.points_in_window[i])
+        return schemas.EpicAllocation(
+            epic_id=int(self.epic_ids[i]),
+            points=points,
+            window_index=int(self.window_index[i]),
+            points_in_window=points_in_window,
+            rollover_points=points - points_in_window,
+            starts_at=ends_at - points,
+            ends_at=ends_at,
+            straddles_line=bool(self.straddles_line[i]),
+        )
+
+    def resize(self, i: int, size: str) -> None:
+        delta = self.size_points.get(size, 0) - int(self.points[i])
+        self.sizes[i] = size
+        if delta == 0:
+            return
+        self.points[i] += delta
+        self.ends_at[i:] += delta
+        self._record(self._recompute(i, len(self.epic_ids)))
+
+    def insert(self, epic_id: int, size: str, priority: int) -> None:
+        i = _sorted_position(self.priorities, self.epic_ids, priority, epic_id)
+        points = self.size_points.get(size, 0)
+        previous_end = int(self.ends_at[i - 1]) if i > 0 else 0
+
+        self.epic_ids = np.insert(self.epic_ids, i, epic_id)
+        self.priorities = np.insert(self.priorities, i, priority)
+        self.sizes.insert(i, size)
+        self.points = np.insert(self.points, i, points)
+        self.ends_at = np.insert(self.ends_at, i, previous_end)
+        self.ends_at[i:] += points
+        self.window_index = np.insert(self.window_index, i, -1)
+        self.points_in_window = np.insert(self.points_in_window, i, 0)
+        self.straddles_line = np.insert(self.straddles_line, i, False)
+        self._record(self._recompute(i, len(self.epic_ids)))
+
+    def remove(self, i: int) -> None:
+        epic_id = int(self.epic_ids[i])
+        points = int(self.points[i])
+
+        self.ends_at[i:] -= points
+        for name in ("epic_ids", "priorities", "points", "ends_at", "window_index", "points_in_window", "straddles_line"):
+            setattr(self, name, np.delete(getattr(self, name), i))
+        del self.sizes[i]
+        self._record(self._recompute(i, len(self.epic_ids)), removed=[epic_id])
+
+    def move(self, i: int, priority: int) -> None:
+        epic_id = int(self.epic_ids[i])
+        order = np.delete(np.arange(len(self.epic_ids)), i)
+        remaining_priorities = self.priorities[order]
+        j = _sorted_position(remaining_priorities, self.epic_ids[order], priority, epic_id)
+        self.reorder(np.insert(order, j, i), np.insert(remaining_priorities, j, priority))
+
+    def reorder(self, order: np.ndarray, priorities: np.ndarray) -> None:
+        """Apply a permutation of current indices; only the span it disturbs is recomputed."""
+        self.priorities = np.asarray(priorities, dtype=np.int64)
+        moved = np.flatnonzero(order != np.arange(len(order)))
+        if len(moved) == 0:
+            return
+        start, stop = int(moved[0]), int(moved[-1]) + 1
+
+        for name in ("epic_ids", "points", "window_index", "points_in_window", "straddles_line"):
+            values = getattr(self, name)
+            values[start:stop] = values[order[start:stop]]
+        self.sizes[start:stop] = [self.sizes[k] for k in order[start:stop].tolist()]
+        offset = int(self.ends_at[start - 1]) if start > 0 else 0
+        self.ends_at[start:stop] = offset + np.cumsum(self.points[start:stop])
+        self._record(self._recompute(start, stop))
+
+    def reallocate(self, capacity: Optional[int] = None, size_points: Optional[Dict[str, int]] = None) -> None:
+        if capacity is not None:
+            self.capacity = capacity
+        if size_points is not None:
+            self.size_points = size_points
+            self.points = np.fromiter((size_points.get(s, 0) for s in self.sizes), dtype=np.int64, count=len(self.sizes))
+            self.ends_at = np.cumsum(self.points)
+        changed = self._recompute(0, len(self.epic_ids))
+        if len(changed):
+            self._record(changed)
+
+    def used_points(self) -> List[int]:
+        rollover = self.points - self.points_in_window
+        used = np.bincount(self.window_index, weights=self.points_in_window, minlength=self.window_count)
+        used += np.bincount(
+            self.window_index[self.straddles_line] + 1,
+            weights=rollover[self.straddles_line],
+            minlength=self.window_count
+        )
+        return used.astype(np.int64).tolist()
+
+    def cut_line_index(self) -> int:
+        return int(np.searchsorted(self.ends_at, self.capacity * self.window_count, side="right")) - 1
+
+    def changes_since(self, since: Optional[int]) -> Tuple[bool, List[schemas.EpicAllocation], List[int]]:
+        """Allocations changed after ``since``; falls back to everything when the log cannot tell."""
+        if since is None or since < self.oldest_version:
+            return True, [self.allocation(i) for i in range(len(self.epic_ids))], []
+
+        changed: Dict[int, schemas.EpicAllocation] = {}
+        removed = set()
+        for version, allocations, removed_ids in self.changelog:
+            if version <= since:
+                continue
+            changed.update(allocations)
+            for epic_id in removed_ids:
+                changed.pop(epic_id, None)
+                removed.add(epic_id)
+        return False, list(changed.values()), sorted(removed)
+
+
+class ForecastTracker:
+    """
+    Per-process registry of incremental forecasts, updated from the write endpoints.
+
+    Each write hook carries the team data version its commit produced and is
+    applied only to states one version behind it (or already at it, as the
+    hooks are idempotent). A state that missed a write, including writes
+    from other workers, is rebuilt by ``get`` once the team's version is
+    ahead of it.
+    """
+
+    def __init__(self, max_forecasts: int = MAX_TRACKED_FORECASTS):
+        self.max_forecasts = max_forecasts
+        self._forecasts: "OrderedDict[Tuple[int, int], IncrementalForecast]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _team_forecasts(self, team_id: int, data_version: int) -> List[IncrementalForecast]:
+        """The team's states the write at ``data_version`` applies to, moved to that version."""
+        states = [
+            f for (tid, _), f in self._forecasts.items()
+            if tid == team_id and data_version - 1 <= f.data_version <= data_version
+        ]
+        for state in states:
+            state.data_version = data_version
+        return states
+
+    def get(self, db: Session, team: models.Team, window_count: int) -> IncrementalForecast:
+        key = (team.id, window_count)
+        with self.lock:
+            state = self._forecasts.get(key)
+            if state is not None and state.data_version >= team.data_version:
+                self._forecasts.move_to_end(key)
+                return state
+
+        size_points = size_points_lookup(
+            db.query(models.SizeMapping.size, models.SizeMapping.points)
+            .filter(models.SizeMapping.team_id == team.id)
+        )
+        rows = db.query(models.Epic.id, models.Epic.priority, models.Epic.current_size).filter(
+            models.Epic.team_id == team.id
+        ).order_by(models.Epic.priority, models.Epic.id).all()
+        state = IncrementalForecast(
+            window_count,
+            team_capacity(team),
+            size_points,
+            np.fromiter((r.id for r in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((r.priority for r in rows), dtype=np.int64, count=len(rows)),
+            [r.current_size for r in rows],
+            team.data_version,
+        )
+
+        with self.lock:
+            # A concurrent rebuild, or hooks applied meanwhile, may have stored a newer state.
+            current = self._forecasts.get(key)
+            if current is not None and current.data_version >= state.data_version:
+                self._forecasts.move_to_end(key)
+                return current
+            self._forecasts[key] = state
+            self._forecasts.move_to_end(key)
+            while len(self._forecasts) > self.max_forecasts:
+                self._forecasts.popitem(last=False)
+        return state
+
+    def epic_added(self, team_id: int, epic_id: int, size: str, priority: int, data_version: int) -> None:
+        with self.lock:
+            for state in self._team_forecasts(team_id, data_version):
+                if state._index_of(epic_id) is None:
+                    state.insert(epic_id, size, priority)
+
+    def epic_updated(self, team_id: int, epic_id: int, size: str, priority: int, data_version: int) -> None:
+        with self.lock:
+            for state in self._team_forecasts(team_id, data_version):
+                i = state._index_of(epic_id)
+                if i is None:
+                    state.insert(epic_id, size, priority)
+                    continue
+                if state.sizes[i] != size:
+                    state.resize(i, size)
+                if int(state.priorities[i]) != priority:
+                    state.move(i, priority)
+
+    def epic_removed(self, team_id: int, epic_id: int, data_version: int) -> None:
+        with self.lock:
+            for state in self._team_forecasts(team_id, data_version):
+                i = state._index_of(epic_id)
+                if i is not None:
+                    state.remove(i)
+
+    def epics_reordered(self, team_id: int, epic_ids: List[int], data_version: int) -> None:
+        with self.lock:
+            requested = np.asarray(epic_ids, dtype=np.int64)
+            for state in self._team_forecasts(team_id, data_version):
+                if len(requested) != len(state.epic_ids) or not np.array_equal(np.sort(requested), np.sort(state.epic_ids)):
+                    del self._forecasts[(team_id, state.window_count)]
+                    continue
+                index_of = {int(epic_id): i for i, epic_id in enumerate(state.epic_ids.tolist())}
+                order = np.fromiter((index_of[int(e)] for e in requested), dtype=np.int64, count=len(requested))
+                state.reorder(order, np.arange(len(order), dtype=np.int64) * RANK_GAP)
+
+    def epics_rebalanced(self, team_id: int, gap: int, data_version: int) -> None:
+        """Priorities were respaced ``gap`` apart; the order, and so the forecast, is unchanged."""
+        with self.lock:
+            for state in self._team_forecasts(team_id, data_version):
+                state.priorities = np.arange(len(state.epic_ids), dtype=np.int64) * gap
+
+    def size_mappings_changed(self, team_id: int, size_points: Dict[str, int], data_version: int) -> None:
+        with self.lock:
+            for state in self._team_forecasts(team_id, data_version):
+                state.reallocate(size_points=size_points)
+
+    def capacity_changed(self, team: models.Team, data_version: int) -> None:
+        capacity = team_capacity(team)
+        with self.lock:
+            for state in self._team_forecasts(team.id, data_version):
+                if state.capacity != capacity:
+                    state.reallocate(capacity=capacity)
+
+    def invalidate(self, team_id: Optional[int] = None) -> None:
+        with self.lock:
+            if team_id is None:
+                self._forecasts.clear()
+                return
+            for key in [k for k in self._forecasts if k[0] == team_id]:
+                del self._forecasts[key]
+
+
+forecast_tracker = ForecastTracker()
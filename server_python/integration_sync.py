@@ -0,0 +1,121 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server_python import models
+from server_python.logger import get_logger, log_error
+
+logger = get_logger("sync")
+
+
+class SyncNotEnabled(Exception):
+    pass
+
+
+@dataclass
+class SyncResult:
+    team_id: int
+    full: bool
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    synced_at: Optional[datetime] = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.fetched or self.deleted)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def integration_config(db: AsyncSession, team_id: int, integration_type: str) -> Optional[models.IntegrationConfig]:
+    return await db.scalar(
+        select(models.IntegrationConfig).where(
+            models.IntegrationConfig.team_id == team_id,
+            models.IntegrationConfig.integration_type == integration_type
+        )
+    )
+
+
+async def sync_enabled_team_ids(db: AsyncSession, integration_type: str, required: str) -> List[int]:
+    """Teams whose active config has sync_enabled and a ``required`` setting (project key, board id)."""
+    configs = await db.execute(
+        select(models.IntegrationConfig.team_id, models.IntegrationConfig.config).where(
+            models.IntegrationConfig.integration_type == integration_type,
+            models.IntegrationConfig.is_active.is_not(False)
+        ).order_by(models.IntegrationConfig.team_id)
+    )
+    return [team_id for team_id, config in configs if config.get("sync_enabled") and config.get(required)]
+
+
+class SyncScheduler:
+    """
+    Syncs every enabled team on an interval.
+
+    Each team's sync starts after a random delay of up to ``jitter`` seconds,
+    so teams do not hit the upstream API in one burst, and at most
+    ``concurrency`` teams sync at once. A failing team is logged and retried
+    on the next round.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        list_teams: Callable[[], Awaitable[List[int]]],
+        sync_team: Callable[[int], Awaitable[object]],
+        interval: float,
+        jitter: float,
+        concurrency: int
+    ):
+        self.name = name
+        self.list_teams = list_teams
+        self.sync_team = sync_team
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sync(self, team_id: int, semaphore: asyncio.Semaphore):
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        async with semaphore:
+            try:
+                await self.sync_team(team_id)
+            except Exception as e:
+                log_error(logger, e, f"{self.name} sync for team {team_id}")
+
+    async def run_once(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._sync(team_id, semaphore) for team_id in await self.list_teams()))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                log_error(logger, e, f"{self.name} sync round")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            logger.info(f"{self.name} sync every {self.interval}s, up to {self.concurrency} teams at once")
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
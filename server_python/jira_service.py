@@ -1,7 +1,10 @@
+import asyncio
 import os
+from typing import AsyncIterator, List, Optional, Dict, Any
 import httpx
-from typing import List, Optional, Dict, Any
 from server_python import schemas
+from server_python.http_clients import shared_client
+from server_python.metadata_cache import credentials_fingerprint, metadata_cache
 
 
 class JiraService:
@@ -20,6 +23,12 @@ class JiraService:
         self.username = os.getenv("JIRA_USERNAME", "")
         self.password = os.getenv("JIRA_PASSWORD", "")
 
+        # Search page size and how many Data Center pages are fetched at once.
+        self.page_size = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "100"))
+        self.search_concurrency = int(os.getenv("JIRA_SEARCH_CONCURRENCY", "4"))
+
+        self.http = shared_client("jira")
+
     @property
     def is_configured(self) -> bool:
         if not self.base_url:
@@ -49,26 +58,40 @@ class JiraService:
             return (self.username, self.password)
         return None
 
-    async def get_projects(self) -> List[schemas.JiraProject]:
+    @property
+    def credentials_key(self) -> str:
+        return credentials_fingerprint(
+            self.base_url, self.deployment_type, self.email, self.api_token, self.pat, self.username, self.password
+        )
+
+    async def get_projects(self, team_id: Optional[int] = None) -> List[schemas.JiraProject]:
+        """Projects visible to the configured account, cached per team and credentials."""
         if not self.is_configured:
             return []
 
         url = f"{self.base_url}/rest/api/{self.api_version}/project"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+
+        async def request(headers: Dict[str, str]) -> httpx.Response:
+            return await self.http.get(
+                "project",
                 url,
                 auth=self.get_auth(),
-                headers=self.get_auth_headers()
+                headers={**self.get_auth_headers(), **headers}
             )
-            if response.status_code != 200:
-                return []
 
-            projects = response.json()
-            return [
-                schemas.JiraProject(key=p["key"], name=p["name"])
-                for p in projects
-            ]
+        return await metadata_cache.get(
+            ("jira projects", self.credentials_key, team_id), request, self._parse_projects, default=[]
+        )
+
+    def _parse_projects(self, projects: List[Dict[str, Any]]) -> List[schemas.JiraProject]:
+        return [
+            schemas.JiraProject(key=p["key"], name=p["name"])
+            for p in projects
+        ]
+
+    @property
+    def story_points_field(self) -> str:
+        return "customfield_10016" if self.deployment_type == "cloud" else "customfield_10002"
 
     async def get_issues(
         self,
@@ -76,41 +99,108 @@ class JiraService:
         issue_type: str = "Epic",
         jql: Optional[str] = None
     ) -> List[schemas.JiraIssue]:
+        issues = []
+        async for page in self.iter_issues(project_key, issue_type, jql):
+            issues.extend(page)
+        return issues
+
+    async def iter_issues(
+        self,
+        project_key: str,
+        issue_type: str = "Epic",
+        jql: Optional[str] = None,
+        strict: bool = False
+    ) -> AsyncIterator[List[schemas.JiraIssue]]:
+        """
+        Every issue matching the search, one page at a time and in search order.
+
+        Cloud pages follow nextPageToken one after another. Data Center
+        reports the total on the first page, so the remaining startAt pages
+        are requested together, at most JIRA_SEARCH_CONCURRENCY at once.
+        A failed first page yields nothing unless ``strict``; a failed later
+        page always raises rather than silently truncating the result.
+        """
         if not self.is_configured:
-            return []
+            return
 
         query = jql or f"project = {project_key} AND type = {issue_type}"
-        url = f"{self.base_url}/rest/api/{self.api_version}/search"
-        
-        story_points_field = "customfield_10016" if self.deployment_type == "cloud" else "customfield_10002"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                auth=self.get_auth(),
-                headers=self.get_auth_headers(),
-                params={
-                    "jql": query,
-                    "maxResults": 100,
-                    "fields": f"summary,issuetype,description,{story_points_field}"
-                }
-            )
-            if response.status_code != 200:
-                return []
-
+        params = {
+            "jql": query,
+            "maxResults": self.page_size,
+            "fields": f"summary,issuetype,description,{self.story_points_field}"
+        }
+        if self.deployment_type == "cloud":
+            pages = self._cloud_pages(params, strict)
+        else:
+            pages = self._datacenter_pages(params, strict)
+        async for data in pages:
+            yield [self._parse_issue(issue) for issue in data.get("issues", [])]
+
+    async def _search(self, endpoint: str, params: Dict[str, Any]) -> httpx.Response:
+        return await self.http.get(
+            endpoint,
+            f"{self.base_url}/rest/api/{self.api_version}/{endpoint}",
+            auth=self.get_auth(),
+            headers=self.get_auth_headers(),
+            params=params
+        )
+
+    async def _cloud_pages(self, params: Dict[str, Any], strict: bool) -> AsyncIterator[Dict[str, Any]]:
+        # Cloud's paged search is /search/jql; it returns no total, only a token for the next page.
+        response = await self._search("search/jql", params)
+        if response.status_code != 200:
+            if strict:
+                response.raise_for_status()
+            return
+        while True:
             data = response.json()
-            issues = []
-            for issue in data.get("issues", []):
-                fields = issue.get("fields", {})
-                story_points = fields.get(story_points_field) or fields.get("customfield_10016")
-                issues.append(schemas.JiraIssue(
-                    key=issue["key"],
-                    summary=fields.get("summary", ""),
-                    issue_type=fields.get("issuetype", {}).get("name", "Unknown"),
-                    story_points=int(story_points) if story_points else None,
-                    description=self._extract_description(fields.get("description"))
-                ))
-            return issues
+            yield data
+            token = data.get("nextPageToken")
+            if not token or data.get("isLast"):
+                return
+            response = await self._search("search/jql", {**params, "nextPageToken": token})
+            response.raise_for_status()
+
+    async def _datacenter_pages(self, params: Dict[str, Any], strict: bool) -> AsyncIterator[Dict[str, Any]]:
+        response = await self._search("search", {**params, "startAt": 0})
+        if response.status_code != 200:
+            if strict:
+                response.raise_for_status()
+            return
+        first = response.json()
+        yield first
+
+        # The server may cap maxResults below what was asked for.
+        page_size = first.get("maxResults") or self.page_size
+        starts = range(page_size, first.get("total", 0), page_size)
+        if not starts:
+            return
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def fetch(start: int) -> Dict[str, Any]:
+            async with semaphore:
+                page = await self._search("search", {**params, "startAt": start})
+            page.raise_for_status()
+            return page.json()
+
+        tasks = [asyncio.ensure_future(fetch(start)) for start in starts]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _parse_issue(self, issue: Dict[str, Any]) -> schemas.JiraIssue:
+        fields = issue.get("fields", {})
+        story_points = fields.get(self.story_points_field) or fields.get("customfield_10016")
+        return schemas.JiraIssue(
+            key=issue["key"],
+            summary=fields.get("summary", ""),
+            issue_type=fields.get("issuetype", {}).get("name", "Unknown"),
+            story_points=int(story_points) if story_points else None,
+            description=self._extract_description(fields.get("description"))
+        )
 
     def _extract_description(self, desc) -> str:
         if not desc:
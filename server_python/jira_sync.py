@@ -0,0 +1,127 @@
+import math
+import os
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server_python import imports
+from server_python import versions
+from server_python.database import AsyncSessionLocal
+from server_python.forecast_cache import forecast_cache
+from server_python.incremental_forecast import forecast_tracker
+from server_python.integration_sync import (
+    SyncNotEnabled, SyncResult, SyncScheduler, integration_config, parse_time, sync_enabled_team_ids, utcnow
+)
+from server_python.jira_service import JiraService, jira_service
+from server_python.logger import get_logger
+from server_python.size_lookup import size_lookup_cache
+
+logger = get_logger("sync")
+
+JIRA_SYNC_INTERVAL_SECONDS = float(os.getenv("JIRA_SYNC_INTERVAL_SECONDS", "300"))
+JIRA_SYNC_JITTER_SECONDS = float(os.getenv("JIRA_SYNC_JITTER_SECONDS", "30"))
+JIRA_SYNC_CONCURRENCY = int(os.getenv("JIRA_SYNC_CONCURRENCY", "2"))
+# Deletions only show up in a full listing, so one runs at most this often.
+JIRA_SYNC_RECONCILE_SECONDS = float(os.getenv("JIRA_SYNC_RECONCILE_SECONDS", "3600"))
+# Delta queries reach back this much further than the last sync, for clock skew and slow indexing.
+JIRA_SYNC_OVERLAP_MINUTES = 2
+
+
+def delta_jql(base: str, since_minutes: int) -> str:
+    # A relative date avoids JQL's user-timezone interpretation of absolute ones.
+    return f"{base} AND updated >= -{since_minutes}m"
+
+
+async def sync_team(
+    db: AsyncSession, team_id: int, service: JiraService = jira_service, full: bool = False
+) -> SyncResult:
+    """
+    Bring a team's Jira epics up to date with its project.
+
+    Normally only issues updated since the last sync (plus a small overlap)
+    are fetched and upserted. The first sync, a forced one, and one every
+    JIRA_SYNC_RECONCILE_SECONDS list the whole project instead and also
+    delete previously synced epics whose issue no longer matches. Raises SyncNotEnabled when
+    the team has no enabled Jira sync config.
+    """
+    config = await integration_config(db, team_id, "jira")
+    settings = config.config if config else {}
+    if not settings.get("sync_enabled") or not settings.get("project_key"):
+        raise SyncNotEnabled("Jira sync is not enabled for this team")
+
+    started = utcnow()
+    state = config.sync_state or {}
+    last_synced = parse_time(state.get("last_synced_at"))
+    last_reconciled = parse_time(state.get("last_reconciled_at"))
+    full = full or last_synced is None or last_reconciled is None or \
+        started - last_reconciled >= timedelta(seconds=JIRA_SYNC_RECONCILE_SECONDS)
+
+    project_key = settings["project_key"]
+    issue_type = settings.get("default_issue_type") or "Epic"
+    jql = f"project = {project_key} AND type = {issue_type}"
+    if not full:
+        minutes = math.ceil((started - last_synced).total_seconds() / 60) + JIRA_SYNC_OVERLAP_MINUTES
+        jql = delta_jql(jql, minutes)
+
+    result = SyncResult(team_id=team_id, full=full, synced_at=started)
+    lookup = await size_lookup_cache.get_async(db, team_id)
+    seen = set()
+    async for issues in service.iter_issues(project_key, issue_type, jql, strict=True):
+        issues = [issue for issue in issues if issue.key not in seen]
+        seen.update(issue.key for issue in issues)
+        if not issues:
+            continue
+        sizes = lookup.sizes_for([issue.story_points for issue in issues])
+        items = [
+            imports.ImportedItem(issue.key, issue.summary, issue.description or "", size)
+            for issue, size in zip(issues, sizes)
+        ]
+        epics, created = await db.run_sync(imports.upsert_epics, team_id, "Jira", items, True)
+        result.created += created
+        result.updated += len(epics) - created
+    result.fetched = len(seen)
+    synced_before = set(state.get("issue_keys", []))
+    if full:
+        # Only issues an earlier sync took from this project; epics imported
+        # from other projects or by hand stay.
+        result.deleted = await db.run_sync(
+            imports.delete_missing, team_id, "Jira", seen, f"{project_key}-", synced_before
+        )
+
+    config.sync_state = {
+        "last_synced_at": started.isoformat(),
+        "last_reconciled_at": started.isoformat() if full else state.get("last_reconciled_at"),
+        "issue_keys": sorted(seen if full else seen | synced_before),
+    }
+    if result.changed:
+        await db.execute(versions.bump(team_id))
+    await db.commit()
+
+    if result.changed:
+        forecast_tracker.invalidate(team_id)
+        forecast_cache.bump(team_id)
+    logger.info(
+        f"Jira sync for team {team_id} ({'full' if full else 'delta'}): {result.fetched} fetched, "
+        f"{result.created} created, {result.updated} updated, {result.deleted} deleted"
+    )
+    return result
+
+
+async def _list_teams():
+    async with AsyncSessionLocal() as db:
+        return await sync_enabled_team_ids(db, "jira", "project_key")
+
+
+async def _sync_scheduled_team(team_id: int):
+    async with AsyncSessionLocal() as db:
+        await sync_team(db, team_id)
+
+
+jira_sync_scheduler = SyncScheduler(
+    "Jira", _list_teams, _sync_scheduled_team,
+    JIRA_SYNC_INTERVAL_SECONDS, JIRA_SYNC_JITTER_SECONDS, JIRA_SYNC_CONCURRENCY
+)
+
+
+def start_scheduler():
+    if jira_service.is_configured:
+        jira_sync_scheduler.start()
@@ -1,15 +1,39 @@
 import os
 import secrets
-from fastapi import FastAPI, Depends, HTTPException, status, Request, Header
+import httpx
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, status, Request, Response, Header, Query, UploadFile, File
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, defer
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from server_python.database import get_db, engine, Base
+from server_python.database import get_db, get_async_db, get_read_db, get_async_read_db, mark_write, engine, all_pool_status
 from server_python import models
 from server_python import schemas
+from server_python import forecast
+from server_python import monte_carlo
+from server_python import portfolio
+from server_python import snapshots
+from server_python import versions
+from server_python import epic_listing
+from server_python import imports
+from server_python import file_import
+from server_python import export
+from server_python import migrate
+from server_python import ranking
+from server_python import http_clients
+from server_python import jira_sync
+from server_python import trello_sync
+from server_python.integration_sync import SyncNotEnabled
+from server_python.incremental_forecast import forecast_tracker
+from server_python.forecast_cache import forecast_cache
+from server_python.size_lookup import size_lookup_cache
 from server_python.auth import (
     get_current_user, get_current_user_optional, create_user, authenticate_user,
     get_user_by_email, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -18,10 +42,22 @@ from server_python.logger import get_logger, log_request, log_response, log_erro
 
 logger = get_logger("api")
 
-Base.metadata.create_all(bind=engine)
-logger.info("Database tables created/verified")
 
-app = FastAPI(title="Portfolio FlowOps API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if migrate.RUN_MIGRATIONS_ON_STARTUP:
+        migrate.migrate(engine)
+        logger.info("Database tables created/verified")
+    jira_sync.start_scheduler()
+    trello_sync.start_scheduler()
+    yield
+    await jira_sync.jira_sync_scheduler.stop()
+    await trello_sync.trello_sync_scheduler.stop()
+    await http_clients.close_all()
+    portfolio.shutdown_executor()
+
+
+app = FastAPI(title="Portfolio FlowOps API", lifespan=lifespan)
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -29,12 +65,25 @@ async def log_requests(request: Request, call_next):
     try:
         response = await call_next(request)
         logger.debug(f"RESPONSE: {request.method} {request.url.path} -> {response.status_code}")
+        mark_write(request, response)
         return response
     except Exception as e:
         log_error(logger, e, f"{request.method} {request.url.path}")
         raise
 
 
+@app.exception_handler(httpx.TransportError)
+async def upstream_unavailable(request: Request, exc: httpx.TransportError):
+    log_error(logger, exc, f"{request.method} {request.url.path}")
+    return JSONResponse(status_code=503, content={"detail": "Upstream service unavailable"})
+
+
+@app.exception_handler(httpx.HTTPStatusError)
+async def upstream_failed(request: Request, exc: httpx.HTTPStatusError):
+    log_error(logger, exc, f"{request.method} {request.url.path}")
+    return JSONResponse(status_code=502, content={"detail": f"Upstream request failed ({exc.response.status_code})"})
+
+
 @app.post("/api/auth/signup", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
 def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     logger.info(f"Signup attempt for email: {user_data.email}")
@@ -97,31 +146,48 @@ def logout(current_user: models.User = Depends(get_current_user)):
     return {"message": "Successfully logged out"}
 
 
+@app.get("/api/internal/pool-metrics", response_model=List[schemas.PoolStatus])
+def get_pool_metrics():
+    """Connection pool occupancy and checkout wait times, to tell pool exhaustion from slow queries."""
+    return all_pool_status()
+
+
+@app.get("/api/internal/upstream-metrics", response_model=List[schemas.UpstreamEndpointStats])
+def get_upstream_metrics():
+    """Jira and Trello call counts and latency per endpoint, over the shared keep-alive clients."""
+    return http_clients.upstream_metrics.snapshot()
+
+
 @app.get("/api/teams", response_model=List[schemas.Team])
-def get_teams(db: Session = Depends(get_db)):
-    return db.query(models.Team).all()
+async def get_teams(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    team_versions = (await db.execute(versions.all_team_versions_query())).all()
+    not_modified = versions.conditional(request, response, versions.versions_etag(request, team_versions))
+    if not_modified:
+        return not_modified
+    result = await db.execute(select(models.Team))
+    return result.scalars().all()
 
 
 @app.post("/api/teams", response_model=schemas.Team)
-def create_team(team: schemas.TeamCreate, db: Session = Depends(get_db)):
+async def create_team(team: schemas.TeamCreate, db: AsyncSession = Depends(get_async_db)):
     db_team = models.Team(**team.model_dump())
     db.add(db_team)
-    db.commit()
-    db.refresh(db_team)
+    await db.commit()
+    await db.refresh(db_team)
     return db_team
 
 
 @app.get("/api/teams/{team_id}", response_model=schemas.Team)
-def get_team(team_id: int, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def get_team(team_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    return team
+    return versions.conditional(request, response, versions.etag(request, team.data_version)) or team
 
 
 @app.patch("/api/teams/{team_id}", response_model=schemas.Team)
-def update_team(team_id: int, team_update: schemas.TeamUpdate, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def update_team(team_id: int, team_update: schemas.TeamUpdate, db: AsyncSession = Depends(get_async_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -130,59 +196,131 @@ def update_team(team_id: int, team_update: schemas.TeamUpdate, db: Session = Dep
         setattr(team, field, value)
     
     team.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(team)
+    data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+    await db.commit()
+    await db.refresh(team)
+    forecast_tracker.capacity_changed(team, data_version)
+    forecast_cache.bump(team.id)
     return team
 
 
 @app.delete("/api/teams/{team_id}")
-def delete_team(team_id: int, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def delete_team(team_id: int, db: AsyncSession = Depends(get_async_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    db.delete(team)
-    db.commit()
+    await db.delete(team)
+    await db.commit()
+    forecast_tracker.invalidate(team_id)
+    forecast_cache.bump(team_id)
+    size_lookup_cache.invalidate(team_id)
     return {"message": "Team deleted"}
 
 
+async def _team_not_modified(db: AsyncSession, team_id: int, request: Request, response: Response) -> Optional[Response]:
+    """
+    Answer If-None-Match from the team's data version alone.
+
+    The version is read before the data, so a write landing in between makes
+    the ETag older than the body and the next request refetches; never the
+    reverse.
+    """
+    version = await db.scalar(versions.team_version_query(team_id))
+    if version is None:
+        return None
+    return versions.conditional(request, response, versions.etag(request, version))
+
+
 @app.get("/api/teams/{team_id}/size-mappings", response_model=List[schemas.SizeMapping])
-def get_size_mappings(team_id: int, db: Session = Depends(get_db)):
-    return db.query(models.SizeMapping).filter(models.SizeMapping.team_id == team_id).all()
+async def get_size_mappings(team_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    not_modified = await _team_not_modified(db, team_id, request, response)
+    if not_modified:
+        return not_modified
+    result = await db.execute(select(models.SizeMapping).where(models.SizeMapping.team_id == team_id))
+    return result.scalars().all()
 
 
 @app.put("/api/teams/{team_id}/size-mappings", response_model=List[schemas.SizeMapping])
-def update_size_mappings(team_id: int, mappings: List[schemas.SizeMappingCreate], db: Session = Depends(get_db)):
-    db.query(models.SizeMapping).filter(models.SizeMapping.team_id == team_id).delete()
-    
-    new_mappings = []
-    for mapping in mappings:
-        db_mapping = models.SizeMapping(team_id=team_id, **mapping.model_dump())
-        db.add(db_mapping)
-        new_mappings.append(db_mapping)
-    
-    db.commit()
-    for m in new_mappings:
-        db.refresh(m)
+async def update_size_mappings(
+    team_id: int,
+    mappings: List[schemas.SizeMappingCreate],
+    db: AsyncSession = Depends(get_async_db)
+):
+    await db.execute(delete(models.SizeMapping).where(models.SizeMapping.team_id == team_id))
+    
+    new_mappings = [models.SizeMapping(team_id=team_id, **mapping.model_dump()) for mapping in mappings]
+    db.add_all(new_mappings)
+    data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+    await db.commit()
+    forecast_tracker.size_mappings_changed(team_id, forecast.size_points_lookup(new_mappings), data_version)
+    forecast_cache.bump(team_id)
+    size_lookup_cache.invalidate(team_id)
     return new_mappings
 
 
+def epic_list_params(
+    limit: Optional[int] = Query(None, ge=1, le=epic_listing.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    statuses: Optional[List[str]] = Query(None, alias="status"),
+    sources: Optional[List[str]] = Query(None, alias="source"),
+    sizes: Optional[List[str]] = Query(None, alias="size"),
+    fields: Optional[str] = None
+) -> epic_listing.EpicListParams:
+    try:
+        return epic_listing.EpicListParams(
+            limit=limit,
+            after=epic_listing.decode_cursor(cursor) if cursor else None,
+            statuses=statuses,
+            sources=sources,
+            sizes=sizes,
+            fields=epic_listing.parse_fields(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _epic_page(epics: list, next_cursor: Optional[str], params: epic_listing.EpicListParams, response: Response):
+    """Projected rows are already plain dicts, so they skip response_model validation."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if params.fields:
+        return JSONResponse(jsonable_encoder(epics), headers={
+            name: response.headers[name] for name in ("X-Next-Cursor", "ETag", "Cache-Control") if name in response.headers
+        })
+    return epics
+
+
 @app.get("/api/teams/{team_id}/epics", response_model=List[schemas.Epic])
-def get_epics(team_id: int, db: Session = Depends(get_db)):
-    return db.query(models.Epic).filter(models.Epic.team_id == team_id).order_by(models.Epic.priority).all()
+async def get_epics(
+    team_id: int,
+    request: Request,
+    response: Response,
+    params: epic_listing.EpicListParams = Depends(epic_list_params),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Epics in priority order; `limit` pages with an X-Next-Cursor header, `fields` picks columns."""
+    not_modified = await _team_not_modified(db, team_id, request, response)
+    if not_modified:
+        return not_modified
+    epics, next_cursor = await db.run_sync(epic_listing.list_epics, team_id, params)
+    return _epic_page(epics, next_cursor, params, response)
 
 
 @app.post("/api/teams/{team_id}/epics", response_model=schemas.Epic)
-def create_epic(team_id: int, epic: schemas.EpicCreate, db: Session = Depends(get_db)):
+async def create_epic(team_id: int, epic: schemas.EpicCreate, db: AsyncSession = Depends(get_async_db)):
     db_epic = models.Epic(team_id=team_id, **epic.model_dump())
     db.add(db_epic)
-    db.commit()
-    db.refresh(db_epic)
+    data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+    await db.commit()
+    await db.refresh(db_epic)
+    forecast_tracker.epic_added(team_id, db_epic.id, db_epic.current_size, db_epic.priority, data_version)
+    forecast_cache.bump(team_id)
     return db_epic
 
 
 @app.patch("/api/epics/{epic_id}", response_model=schemas.Epic)
-def update_epic(epic_id: int, epic_update: schemas.EpicUpdate, db: Session = Depends(get_db)):
-    epic = db.query(models.Epic).filter(models.Epic.id == epic_id).first()
+async def update_epic(epic_id: int, epic_update: schemas.EpicUpdate, db: AsyncSession = Depends(get_async_db)):
+    epic = await db.get(models.Epic, epic_id)
     if not epic:
         raise HTTPException(status_code=404, detail="Epic not found")
     
@@ -191,33 +329,336 @@ def update_epic(epic_id: int, epic_update: schemas.EpicUpdate, db: Session = Dep
         setattr(epic, field, value)
     
     epic.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(epic)
+    data_version = (await db.execute(versions.bump(epic.team_id))).scalar_one()
+    await db.commit()
+    await db.refresh(epic)
+    forecast_tracker.epic_updated(epic.team_id, epic.id, epic.current_size, epic.priority, data_version)
+    forecast_cache.bump(epic.team_id)
     return epic
 
 
 @app.delete("/api/epics/{epic_id}")
-def delete_epic(epic_id: int, db: Session = Depends(get_db)):
-    epic = db.query(models.Epic).filter(models.Epic.id == epic_id).first()
+async def delete_epic(epic_id: int, db: AsyncSession = Depends(get_async_db)):
+    epic = await db.get(models.Epic, epic_id)
     if not epic:
         raise HTTPException(status_code=404, detail="Epic not found")
-    db.delete(epic)
-    db.commit()
+    team_id = epic.team_id
+    await db.delete(epic)
+    data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+    await db.commit()
+    forecast_tracker.epic_removed(team_id, epic_id, data_version)
+    forecast_cache.bump(team_id)
     return {"message": "Epic deleted"}
 
 
 @app.put("/api/teams/{team_id}/epics/reorder")
-def reorder_epics(team_id: int, request: schemas.ReorderRequest, db: Session = Depends(get_db)):
-    for idx, epic_id in enumerate(request.epic_ids):
-        epic = db.query(models.Epic).filter(models.Epic.id == epic_id, models.Epic.team_id == team_id).first()
-        if epic:
-            epic.priority = idx
-    db.commit()
+async def reorder_epics(team_id: int, request: schemas.ReorderRequest, db: AsyncSession = Depends(get_async_db)):
+    if request.epic_ids:
+        await db.execute(ranking.reorder_statement(team_id, request.epic_ids))
+        data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+        await db.commit()
+        forecast_tracker.epics_reordered(team_id, request.epic_ids, data_version)
+    forecast_cache.bump(team_id)
     return {"message": "Epics reordered"}
 
 
+@app.post("/api/teams/{team_id}/epics/import", response_model=schemas.FileImportResponse)
+def import_epic_file(team_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Create epics from an uploaded CSV or XLSX file, parsed row by row and committed in batches."""
+    team = db.get(models.Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    try:
+        rows = file_import.read_rows(file.file, file.filename, file.content_type)
+        result = file_import.import_rows(db, team_id, rows, size_lookup_cache.get(db, team_id))
+    except file_import.FileFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        forecast_tracker.invalidate(team_id)
+        forecast_cache.bump(team_id)
+    logger.info(f"File import for team {team_id}: {result.imported_count} epics, {result.error_count} errors")
+    return result
+
+
+def _export_response(db: Session, export_format: str, filename: str, team_ids, include_forecast: bool, windows: int):
+    try:
+        export.check_format(export_format)
+    except export.ExportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        export.export_stream(db, export_format, team_ids, include_forecast, windows),
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+
+@app.get("/api/teams/{team_id}/epics/export")
+def export_epics(
+    team_id: int,
+    export_format: str = Query("csv", alias="format"),
+    include_forecast: bool = False,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Stream a team's epics as CSV, NDJSON or Parquet, optionally with forecast windows."""
+    if not db.get(models.Team, team_id):
+        raise HTTPException(status_code=404, detail="Team not found")
+    return _export_response(db, export_format, f"team-{team_id}-epics", [team_id], include_forecast, windows)
+
+
+def _move_epic(db: Session, team_id: int, epic_id: int, move: schemas.EpicMoveRequest):
+    """Look up the epic and its anchors, then give it a rank between them."""
+    def team_epic(anchor_id):
+        found = db.get(models.Epic, anchor_id)
+        if not found or found.team_id != team_id:
+            raise HTTPException(status_code=404, detail="Epic not found")
+        return found
+
+    epic = team_epic(epic_id)
+    if epic_id in (move.after_epic_id, move.before_epic_id):
+        raise HTTPException(status_code=400, detail="An epic cannot be moved relative to itself")
+    above = team_epic(move.after_epic_id) if move.after_epic_id is not None else None
+    below = team_epic(move.before_epic_id) if move.before_epic_id is not None else None
+    if above and below and (above.priority, above.id) >= (below.priority, below.id):
+        raise HTTPException(status_code=400, detail="after_epic_id must come before before_epic_id")
+
+    rebalanced, crowded = ranking.place_between(db, epic, above, below)
+    epic.updated_at = datetime.utcnow()
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
+    return epic, rebalanced, crowded, data_version
+
+
+def _epic_moved(epic: models.Epic, rebalanced: bool, data_version: int) -> None:
+    if rebalanced:
+        forecast_tracker.epics_rebalanced(epic.team_id, ranking.RANK_GAP, data_version)
+    forecast_tracker.epic_updated(epic.team_id, epic.id, epic.current_size, epic.priority, data_version)
+    forecast_cache.bump(epic.team_id)
+
+
+async def rebalance_epic_ranks(bind: AsyncEngine, team_id: int) -> None:
+    async with AsyncSession(bind) as db:
+        await db.run_sync(ranking.rebalance, team_id)
+        data_version = (await db.execute(versions.bump(team_id))).scalar_one()
+        await db.commit()
+    forecast_tracker.epics_rebalanced(team_id, ranking.RANK_GAP, data_version)
+
+
+def rebalance_demo_epic_ranks(bind: Engine, team_id: int) -> None:
+    with Session(bind) as db:
+        ranking.rebalance(db, team_id)
+        data_version = db.execute(versions.bump(team_id)).scalar_one()
+        db.commit()
+    forecast_tracker.epics_rebalanced(team_id, ranking.RANK_GAP, data_version)
+
+
+@app.post("/api/teams/{team_id}/epics/{epic_id}/move", response_model=schemas.Epic)
+async def move_epic(
+    team_id: int,
+    epic_id: int,
+    move: schemas.EpicMoveRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    epic, rebalanced, crowded, data_version = await db.run_sync(_move_epic, team_id, epic_id, move)
+    await db.commit()
+    _epic_moved(epic, rebalanced, data_version)
+    if crowded:
+        background_tasks.add_task(rebalance_epic_ranks, db.bind, team_id)
+    return epic
+
+
+@app.get("/api/teams/{team_id}/forecast", response_model=schemas.Forecast)
+def get_forecast(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    engineer_count: Optional[int] = Query(None, ge=0),
+    avg_points_per_engineer: Optional[int] = Query(None, ge=0),
+    sprints_in_increment: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    # The version in the key stops a lagging replica from caching data older than the last write.
+    return forecast_cache.get_or_compute(
+        team.id,
+        (team.data_version, windows, engineer_count, avg_points_per_engineer, sprints_in_increment),
+        lambda: forecast.forecast_team(
+            db, team, windows,
+            engineer_count=engineer_count,
+            avg_points_per_engineer=avg_points_per_engineer,
+            sprints_in_increment=sprints_in_increment
+        )
+    )
+
+
+@app.get("/api/teams/{team_id}/forecast/stream")
+def stream_forecast(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    engineer_count: Optional[int] = Query(None, ge=0),
+    avg_points_per_engineer: Optional[int] = Query(None, ge=0),
+    sprints_in_increment: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Forecast as NDJSON, read and allocated in chunks so memory stays flat for huge backlogs."""
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    return StreamingResponse(
+        forecast.stream_team_forecast(
+            db, team, windows,
+            engineer_count=engineer_count,
+            avg_points_per_engineer=avg_points_per_engineer,
+            sprints_in_increment=sprints_in_increment
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/api/teams/{team_id}/forecast/changes", response_model=schemas.ForecastChanges)
+def get_forecast_changes(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    since: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Epics whose window assignment changed since version `since` (everything when omitted or expired)."""
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    state = forecast_tracker.get(db, team, windows)
+    with forecast_tracker.lock:
+        full, changed, removed = state.changes_since(since)
+        return schemas.ForecastChanges(
+            team_id=team_id,
+            window_count=windows,
+            version=state.version,
+            full=full,
+            changed=changed,
+            removed=removed,
+            used_points=state.used_points(),
+            cut_line_index=state.cut_line_index()
+        )
+
+
+@app.post("/api/teams/{team_id}/forecast/sweep", response_model=schemas.ForecastSweep)
+def sweep_forecast(team_id: int, request: schemas.ForecastSweepRequest, db: Session = Depends(get_db)):
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    scenario_count = 1
+    for sweep_range in (request.engineer_count, request.avg_points_per_engineer, request.sprints_in_increment):
+        if sweep_range is not None:
+            if sweep_range.stop < sweep_range.start:
+                raise HTTPException(status_code=400, detail="Sweep range stop must not be below start")
+            scenario_count *= (sweep_range.stop - sweep_range.start) // sweep_range.step + 1
+    if scenario_count > forecast.MAX_SWEEP_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep covers {scenario_count} scenarios; the limit is {forecast.MAX_SWEEP_SCENARIOS}"
+        )
+    
+    return forecast.sweep_team(db, team, request)
+
+
+@app.get("/api/teams/{team_id}/forecast/monte-carlo", response_model=schemas.MonteCarloForecast)
+def get_monte_carlo_forecast(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    trials: int = Query(monte_carlo.DEFAULT_TRIALS, ge=1000, le=100_000),
+    seed: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    if forecast.team_capacity(team) <= 0:
+        raise HTTPException(status_code=400, detail="Team capacity must be greater than zero")
+    
+    return monte_carlo.monte_carlo_team(db, team, windows, trials, seed)
+
+
+@app.get("/api/portfolio/forecast")
+def get_portfolio_forecast(
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    team_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """Stream per-team window loads as NDJSON, followed by a portfolio rollup line."""
+    backlogs = portfolio.load_portfolio_backlogs(db, team_ids)
+    logger.info(f"Portfolio forecast for {len(backlogs)} teams, {windows} windows")
+    return StreamingResponse(
+        portfolio.stream_portfolio_forecast(backlogs, windows),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/api/portfolio/epics/export")
+def export_portfolio_epics(
+    export_format: str = Query("csv", alias="format"),
+    team_ids: Optional[List[int]] = Query(None),
+    include_forecast: bool = False,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Every team's epics (or those of team_ids) in one stream, ordered by team."""
+    return _export_response(db, export_format, "portfolio-epics", team_ids, include_forecast, windows)
+
+
+@app.post("/api/teams/{team_id}/snapshots", response_model=schemas.PlanningSnapshot)
+def create_snapshot(team_id: int, snapshot: schemas.PlanningSnapshotCreate, db: Session = Depends(get_db)):
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    db_snapshot = models.PlanningSnapshot(
+        team_id=team_id,
+        name=snapshot.name,
+        planning_increment=snapshot.planning_increment,
+        snapshot_data=snapshots.capture_snapshot_data(db, team, snapshot.window_count)
+    )
+    db.add(db_snapshot)
+    db.commit()
+    db.refresh(db_snapshot)
+    return db_snapshot
+
+
+@app.get("/api/teams/{team_id}/snapshots", response_model=List[schemas.PlanningSnapshotSummary])
+def get_snapshots(team_id: int, db: Session = Depends(get_read_db)):
+    """Snapshot metadata only; the snapshot data is never loaded."""
+    return db.query(models.PlanningSnapshot).options(
+        defer(models.PlanningSnapshot.snapshot_data, raiseload=True)
+    ).filter(
+        models.PlanningSnapshot.team_id == team_id
+    ).order_by(models.PlanningSnapshot.created_at.desc(), models.PlanningSnapshot.id.desc()).all()
+
+
+@app.get("/api/teams/{team_id}/snapshots/diff", response_model=schemas.SnapshotDiff)
+def diff_snapshots(team_id: int, base_id: int, head_id: int, db: Session = Depends(get_read_db)):
+    base = snapshots.get_team_snapshot(db, team_id, base_id)
+    head = snapshots.get_team_snapshot(db, team_id, head_id)
+    if not base or not head:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    
+    return snapshots.diff_snapshots(base, head)
+
+
+@app.get("/api/teams/{team_id}/snapshots/{snapshot_id}", response_model=schemas.PlanningSnapshot)
+def get_snapshot(team_id: int, snapshot_id: int, db: Session = Depends(get_read_db)):
+    snapshot = snapshots.get_team_snapshot(db, team_id, snapshot_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return snapshot
+
+
 @app.get("/api/teams/{team_id}/jira/config", response_model=schemas.JiraConfig)
-def get_jira_config(team_id: int, db: Session = Depends(get_db)):
+def get_jira_config(team_id: int, db: Session = Depends(get_read_db)):
     team = db.query(models.Team).filter(models.Team.id == team_id).first()
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
@@ -255,6 +696,9 @@ def save_jira_config(team_id: int, config_data: schemas.JiraConfigCreate, db: Se
     config_dict = config_data.model_dump()
     
     if config:
+        # A different project or issue type starts over with a full sync.
+        if any(config.config.get(key) != config_dict[key] for key in ("project_key", "default_issue_type")):
+            config.sync_state = None
         config.config = config_dict
     else:
         config = models.IntegrationConfig(
@@ -277,8 +721,8 @@ def save_jira_config(team_id: int, config_data: schemas.JiraConfigCreate, db: Se
 
 
 @app.get("/api/teams/{team_id}/jira/projects", response_model=List[schemas.JiraProject])
-async def get_jira_projects(team_id: int, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def get_jira_projects(team_id: int, db: AsyncSession = Depends(get_async_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -287,7 +731,7 @@ async def get_jira_projects(team_id: int, db: Session = Depends(get_db)):
     if not jira_service.is_configured:
         raise HTTPException(status_code=503, detail="Jira not configured")
     
-    return await jira_service.get_projects()
+    return await jira_service.get_projects(team_id)
 
 
 @app.get("/api/teams/{team_id}/jira/issues", response_model=List[schemas.JiraIssue])
@@ -295,9 +739,9 @@ async def get_jira_issues(
     team_id: int,
     project_key: str,
     issue_type: str = "Epic",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -313,9 +757,9 @@ async def get_jira_issues(
 async def import_jira_issues(
     team_id: int,
     import_request: schemas.JiraImportRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -324,57 +768,51 @@ async def import_jira_issues(
     if not jira_service.is_configured:
         raise HTTPException(status_code=503, detail="Jira not configured")
     
-    issues = await jira_service.get_issues(
+    # Each search page is upserted as it arrives; the whole import still commits once.
+    lookup = await size_lookup_cache.get_async(db, team_id)
+    epics, created, seen = [], 0, set()
+    async for issues in jira_service.iter_issues(
         import_request.project_key,
         import_request.issue_type,
         import_request.jql
-    )
-    
-    size_mappings = db.query(models.SizeMapping).filter(
-        models.SizeMapping.team_id == team_id
-    ).order_by(models.SizeMapping.points).all()
-    
-    created_epics = []
-    for issue in issues:
-        size = map_points_to_size(issue.story_points, size_mappings)
-        
-        epic = models.Epic(
-            team_id=team_id,
-            external_id=issue.key,
-            title=issue.summary,
-            description=issue.description or "",
-            original_size=size,
-            current_size=size,
-            status="backlog",
-            source="Jira",
-            priority=len(created_epics)
-        )
-        db.add(epic)
-        db.commit()
-        db.refresh(epic)
-        created_epics.append(epic)
-    
+    ):
+        issues = [issue for issue in issues if issue.key not in seen]
+        seen.update(issue.key for issue in issues)
+        if not issues:
+            continue
+        sizes = lookup.sizes_for([issue.story_points for issue in issues])
+        items = [
+            imports.ImportedItem(issue.key, issue.summary, issue.description or "", size)
+            for issue, size in zip(issues, sizes)
+        ]
+        page_epics, page_created = await db.run_sync(imports.upsert_epics, team_id, "Jira", items)
+        epics.extend(page_epics)
+        created += page_created
+    await db.execute(versions.bump(team_id))
+    await db.commit()
+    
+    forecast_tracker.invalidate(team_id)
+    forecast_cache.bump(team_id)
     return schemas.JiraImportResponse(
-        imported_count=len(created_epics),
-        epics=created_epics
+        imported_count=len(epics),
+        created_count=created,
+        updated_count=len(epics) - created,
+        epics=epics
     )
 
 
-def map_points_to_size(story_points: int | None, size_mappings: list) -> str:
-    """Map story points to closest T-shirt size"""
-    if not story_points or not size_mappings:
-        return "M"
-    
-    closest = None
-    min_diff = float('inf')
-    
-    for mapping in size_mappings:
-        diff = abs(mapping.points - story_points)
-        if diff < min_diff:
-            min_diff = diff
-            closest = mapping
-    
-    return closest.size if closest else "M"
+@app.post("/api/teams/{team_id}/jira/sync", response_model=schemas.SyncResponse)
+async def sync_jira_issues(team_id: int, full: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Run the team's Jira delta sync now; ``full`` also removes epics whose issue is gone."""
+    team = await db.get(models.Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    if not jira_sync.jira_service.is_configured:
+        raise HTTPException(status_code=503, detail="Jira not configured")
+    try:
+        return await jira_sync.sync_team(db, team_id, full=full)
+    except SyncNotEnabled as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/api/teams/{team_id}/jira/map-points", response_model=schemas.MapPointsResponse)
@@ -383,42 +821,36 @@ def map_story_points(team_id: int, request: schemas.MapPointsRequest, db: Sessio
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    size_mappings = db.query(models.SizeMapping).filter(
-        models.SizeMapping.team_id == team_id
-    ).order_by(models.SizeMapping.points).all()
-    
-    if not size_mappings:
+    lookup = size_lookup_cache.get(db, team_id)
+    if not lookup:
         return schemas.MapPointsResponse(size="M", points=request.story_points, matched=False)
     
-    exact_match = None
-    closest = None
-    min_diff = float('inf')
-    
-    for mapping in size_mappings:
-        if mapping.points == request.story_points:
-            exact_match = mapping
-            break
-        diff = abs(mapping.points - request.story_points)
-        if diff < min_diff:
-            min_diff = diff
-            closest = mapping
-    
-    if exact_match:
-        return schemas.MapPointsResponse(
-            size=exact_match.size,
-            points=exact_match.points,
-            matched=True
+    size, points = lookup.closest(request.story_points)
+    return schemas.MapPointsResponse(size=size, points=points, matched=points == request.story_points)
+
+
+@app.post("/api/teams/{team_id}/jira/map-points/batch", response_model=schemas.MapPointsBatchResponse)
+def map_story_points_batch(team_id: int, request: schemas.MapPointsBatchRequest, db: Session = Depends(get_db)):
+    """Map many story-point values to sizes in one vectorized lookup."""
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    lookup = size_lookup_cache.get(db, team_id)
+    if not lookup:
+        count = len(request.story_points)
+        return schemas.MapPointsBatchResponse(
+            sizes=["M"] * count,
+            points=request.story_points,
+            matched=[False] * count
         )
     
-    return schemas.MapPointsResponse(
-        size=closest.size,
-        points=closest.points,
-        matched=False
-    )
+    sizes, points, matched = lookup.match_many(request.story_points)
+    return schemas.MapPointsBatchResponse(sizes=sizes, points=points, matched=matched)
 
 
 @app.get("/api/teams/{team_id}/trello/config", response_model=schemas.TrelloConfig)
-def get_trello_config(team_id: int, db: Session = Depends(get_db)):
+def get_trello_config(team_id: int, db: Session = Depends(get_read_db)):
     team = db.query(models.Team).filter(models.Team.id == team_id).first()
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
@@ -456,6 +888,9 @@ def save_trello_config(team_id: int, config_data: schemas.TrelloConfigCreate, db
     config_dict = config_data.model_dump()
     
     if config:
+        # A different board or label scheme starts over with a full sync.
+        if any(config.config.get(key) != config_dict[key] for key in ("board_id", "epic_label", "size_label_prefix")):
+            config.sync_state = None
         config.config = config_dict
     else:
         config = models.IntegrationConfig(
@@ -478,8 +913,8 @@ def save_trello_config(team_id: int, config_data: schemas.TrelloConfigCreate, db
 
 
 @app.get("/api/teams/{team_id}/trello/boards", response_model=List[schemas.TrelloBoard])
-async def get_trello_boards(team_id: int, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def get_trello_boards(team_id: int, db: AsyncSession = Depends(get_async_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -488,13 +923,13 @@ async def get_trello_boards(team_id: int, db: Session = Depends(get_db)):
     if not trello_service.is_configured:
         raise HTTPException(status_code=503, detail="Trello not configured")
     
-    boards = await trello_service.get_boards()
+    boards = await trello_service.get_boards(team_id)
     return [schemas.TrelloBoard(id=b.id, name=b.name) for b in boards]
 
 
 @app.get("/api/teams/{team_id}/trello/lists", response_model=List[schemas.TrelloList])
-async def get_trello_lists(team_id: int, board_id: str, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+async def get_trello_lists(team_id: int, board_id: str, db: AsyncSession = Depends(get_async_db)):
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -503,7 +938,7 @@ async def get_trello_lists(team_id: int, board_id: str, db: Session = Depends(ge
     if not trello_service.is_configured:
         raise HTTPException(status_code=503, detail="Trello not configured")
     
-    lists = await trello_service.get_lists(board_id)
+    lists = await trello_service.get_lists(board_id, team_id)
     return [schemas.TrelloList(id=l.id, name=l.name) for l in lists]
 
 
@@ -511,9 +946,9 @@ async def get_trello_lists(team_id: int, board_id: str, db: Session = Depends(ge
 async def import_trello_cards(
     team_id: int,
     import_request: schemas.TrelloImportRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await db.get(models.Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -528,32 +963,35 @@ async def import_trello_cards(
         import_request.filter_label
     )
     
-    created_epics = []
-    for card in cards:
-        size = card.size_label or "M"
-        
-        epic = models.Epic(
-            team_id=team_id,
-            external_id=card.id,
-            title=card.name,
-            description=card.desc,
-            original_size=size,
-            current_size=size,
-            status="backlog",
-            source="Trello",
-            priority=len(created_epics)
-        )
-        db.add(epic)
-        db.commit()
-        db.refresh(epic)
-        created_epics.append(epic)
+    items = [imports.ImportedItem(card.id, card.name, card.desc, card.size_label or "M") for card in cards]
+    epics, created = await db.run_sync(imports.upsert_epics, team_id, "Trello", items)
+    await db.execute(versions.bump(team_id))
+    await db.commit()
     
+    forecast_tracker.invalidate(team_id)
+    forecast_cache.bump(team_id)
     return schemas.TrelloImportResponse(
-        imported_count=len(created_epics),
-        epics=created_epics
+        imported_count=len(epics),
+        created_count=created,
+        updated_count=len(epics) - created,
+        epics=epics
     )
 
 
+@app.post("/api/teams/{team_id}/trello/sync", response_model=schemas.SyncResponse)
+async def sync_trello_cards(team_id: int, full: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Run the team's Trello board sync now; ``full`` reprocesses every card."""
+    team = await db.get(models.Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    if not trello_sync.trello_service.is_configured:
+        raise HTTPException(status_code=503, detail="Trello not configured")
+    try:
+        return await trello_sync.sync_team(db, team_id, full=full)
+    except SyncNotEnabled as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 def create_demo_team_data(db: Session) -> models.Team:
     """Create a new team with demo data for a session."""
     team = models.Team(
@@ -611,6 +1049,9 @@ def cleanup_stale_demo_sessions(db: Session, hours: int = 24):
     
     for session in stale_sessions:
         db.query(models.Team).filter(models.Team.id == session.team_id).delete()
+        forecast_tracker.invalidate(session.team_id)
+        forecast_cache.bump(session.team_id)
+        size_lookup_cache.invalidate(session.team_id)
     
     db.query(models.DemoSession).filter(
         models.DemoSession.last_accessed < cutoff
@@ -687,6 +1128,9 @@ def delete_demo_session(
     db.query(models.Team).filter(models.Team.id == demo_session.team_id).delete()
     db.query(models.DemoSession).filter(models.DemoSession.id == demo_session.id).delete()
     db.commit()
+    forecast_tracker.invalidate(demo_session.team_id)
+    forecast_cache.bump(demo_session.team_id)
+    size_lookup_cache.invalidate(demo_session.team_id)
     
     logger.info(f"Demo session deleted: token={demo_session.session_token[:8]}...")
     return {"message": "Demo session deleted"}
@@ -748,14 +1192,19 @@ def update_demo_team(
         setattr(team, key, value)
     team.updated_at = datetime.utcnow()
     
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
     db.commit()
     db.refresh(team)
+    forecast_tracker.capacity_changed(team, data_version)
+    forecast_cache.bump(team.id)
     return team
 
 
 @app.get("/api/demo/teams/{team_id}/epics", response_model=List[schemas.Epic])
 def get_demo_epics(
     team_id: int,
+    response: Response,
+    params: epic_listing.EpicListParams = Depends(epic_list_params),
     demo_session: Optional[models.DemoSession] = Depends(get_demo_session),
     db: Session = Depends(get_db)
 ):
@@ -766,10 +1215,8 @@ def get_demo_epics(
     if team_id != demo_session.team_id:
         raise HTTPException(status_code=403, detail="Access denied to this team")
     
-    epics = db.query(models.Epic).filter(
-        models.Epic.team_id == team_id
-    ).order_by(models.Epic.priority).all()
-    return epics
+    epics, next_cursor = epic_listing.list_epics(db, team_id, params)
+    return _epic_page(epics, next_cursor, params, response)
 
 
 @app.post("/api/demo/teams/{team_id}/epics", response_model=schemas.Epic, status_code=status.HTTP_201_CREATED)
@@ -786,19 +1233,18 @@ def create_demo_epic(
     if team_id != demo_session.team_id:
         raise HTTPException(status_code=403, detail="Access denied to this team")
     
-    max_priority = db.query(models.Epic).filter(
-        models.Epic.team_id == team_id
-    ).count()
-    
     epic_dict = epic_data.model_dump(exclude={'priority'})
     epic = models.Epic(
         team_id=team_id,
-        priority=max_priority,
+        priority=ranking.append_rank(db, team_id),
         **epic_dict
     )
     db.add(epic)
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
     db.commit()
     db.refresh(epic)
+    forecast_tracker.epic_added(team_id, epic.id, epic.current_size, epic.priority, data_version)
+    forecast_cache.bump(team_id)
     return epic
 
 
@@ -825,8 +1271,11 @@ def update_demo_epic(
         setattr(epic, key, value)
     epic.updated_at = datetime.utcnow()
     
+    data_version = db.execute(versions.bump(epic.team_id)).scalar_one()
     db.commit()
     db.refresh(epic)
+    forecast_tracker.epic_updated(epic.team_id, epic.id, epic.current_size, epic.priority, data_version)
+    forecast_cache.bump(epic.team_id)
     return epic
 
 
@@ -847,8 +1296,12 @@ def delete_demo_epic(
     if epic.team_id != demo_session.team_id:
         raise HTTPException(status_code=403, detail="Access denied to this epic")
     
+    team_id = epic.team_id
     db.delete(epic)
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
     db.commit()
+    forecast_tracker.epic_removed(team_id, epic_id, data_version)
+    forecast_cache.bump(team_id)
     return {"message": "Epic deleted"}
 
 
@@ -866,15 +1319,12 @@ def reorder_demo_epics(
     if team_id != demo_session.team_id:
         raise HTTPException(status_code=403, detail="Access denied to this team")
     
-    for i, epic_id in enumerate(reorder.epic_ids):
-        epic = db.query(models.Epic).filter(
-            models.Epic.id == epic_id,
-            models.Epic.team_id == team_id
-        ).first()
-        if epic:
-            epic.priority = i
-    
+    if reorder.epic_ids:
+        db.execute(ranking.reorder_statement(team_id, reorder.epic_ids))
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
     db.commit()
+    forecast_tracker.epics_reordered(team_id, reorder.epic_ids, data_version)
+    forecast_cache.bump(team_id)
     
     epics = db.query(models.Epic).filter(
         models.Epic.team_id == team_id
@@ -882,6 +1332,31 @@ def reorder_demo_epics(
     return epics
 
 
+@app.post("/api/demo/teams/{team_id}/epics/{epic_id}/move", response_model=schemas.Epic)
+def move_demo_epic(
+    team_id: int,
+    epic_id: int,
+    move: schemas.EpicMoveRequest,
+    background_tasks: BackgroundTasks,
+    demo_session: Optional[models.DemoSession] = Depends(get_demo_session),
+    db: Session = Depends(get_db)
+):
+    """Move one epic between two others in the demo session."""
+    if not demo_session:
+        raise HTTPException(status_code=401, detail="Demo session required")
+    
+    if team_id != demo_session.team_id:
+        raise HTTPException(status_code=403, detail="Access denied to this team")
+    
+    epic, rebalanced, crowded, data_version = _move_epic(db, team_id, epic_id, move)
+    db.commit()
+    db.refresh(epic)
+    _epic_moved(epic, rebalanced, data_version)
+    if crowded:
+        background_tasks.add_task(rebalance_demo_epic_ranks, db.get_bind(), team_id)
+    return epic
+
+
 @app.get("/api/demo/teams/{team_id}/size-mappings", response_model=List[schemas.SizeMapping])
 def get_demo_size_mappings(
     team_id: int,
@@ -923,19 +1398,85 @@ def update_demo_size_mappings(
         db.add(mapping)
         new_mappings.append(mapping)
     
+    data_version = db.execute(versions.bump(team_id)).scalar_one()
     db.commit()
     
     for mapping in new_mappings:
         db.refresh(mapping)
     
+    forecast_tracker.size_mappings_changed(team_id, forecast.size_points_lookup(new_mappings), data_version)
+    forecast_cache.bump(team_id)
+    size_lookup_cache.invalidate(team_id)
     return new_mappings
 
 
+@app.get("/api/demo/teams/{team_id}/forecast", response_model=schemas.Forecast)
+def get_demo_forecast(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    engineer_count: Optional[int] = Query(None, ge=0),
+    avg_points_per_engineer: Optional[int] = Query(None, ge=0),
+    sprints_in_increment: Optional[int] = Query(None, ge=0),
+    demo_session: Optional[models.DemoSession] = Depends(get_demo_session),
+    db: Session = Depends(get_db)
+):
+    """Forecast the demo team's backlog across planning windows."""
+    if not demo_session:
+        raise HTTPException(status_code=401, detail="Demo session required")
+    
+    if team_id != demo_session.team_id:
+        raise HTTPException(status_code=403, detail="Access denied to this team")
+    
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    return forecast_cache.get_or_compute(
+        team.id,
+        (team.data_version, windows, engineer_count, avg_points_per_engineer, sprints_in_increment),
+        lambda: forecast.forecast_team(
+            db, team, windows,
+            engineer_count=engineer_count,
+            avg_points_per_engineer=avg_points_per_engineer,
+            sprints_in_increment=sprints_in_increment
+        )
+    )
+
+
+@app.get("/api/demo/teams/{team_id}/forecast/monte-carlo", response_model=schemas.MonteCarloForecast)
+def get_demo_monte_carlo_forecast(
+    team_id: int,
+    windows: int = Query(forecast.DEFAULT_WINDOW_COUNT, ge=1, le=100),
+    trials: int = Query(monte_carlo.DEFAULT_TRIALS, ge=1000, le=100_000),
+    seed: Optional[int] = None,
+    demo_session: Optional[models.DemoSession] = Depends(get_demo_session),
+    db: Session = Depends(get_db)
+):
+    """Monte Carlo forecast for the demo team's backlog."""
+    if not demo_session:
+        raise HTTPException(status_code=401, detail="Demo session required")
+    
+    if team_id != demo_session.team_id:
+        raise HTTPException(status_code=403, detail="Access denied to this team")
+    
+    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    if forecast.team_capacity(team) <= 0:
+        raise HTTPException(status_code=400, detail="Team capacity must be greater than zero")
+    
+    return monte_carlo.monte_carlo_team(db, team, windows, trials, seed)
+
+
 @app.post("/api/reset-demo", response_model=schemas.ResetDemoResponse)
 def reset_demo(db: Session = Depends(get_db)):
     """Legacy reset-demo endpoint - clears all teams (non-session mode)."""
     db.query(models.Team).delete()
     db.commit()
+    forecast_tracker.invalidate()
+    forecast_cache.clear()
+    size_lookup_cache.clear()
     
     team = create_demo_team_data(db)
     
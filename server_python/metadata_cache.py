@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+import httpx
+
+from server_python.logger import get_logger, log_error
+
+logger = get_logger("http")
+
+METADATA_CACHE_TTL_SECONDS = float(os.getenv("METADATA_CACHE_TTL_SECONDS", "300"))
+# How long past the TTL an entry is still served while it refreshes in the background.
+METADATA_CACHE_STALE_SECONDS = float(os.getenv("METADATA_CACHE_STALE_SECONDS", "86400"))
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "512"))
+
+T = TypeVar("T")
+
+
+def credentials_fingerprint(*credentials: str) -> str:
+    """Short digest of the credentials used for a request, so cache keys never hold secrets."""
+    return hashlib.sha256("\0".join(credentials).encode()).hexdigest()[:16]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MetadataCache:
+    """
+    TTL cache with stale-while-revalidate for upstream metadata lists.
+
+    An entry younger than ``ttl`` is served as is. For ``stale`` seconds
+    after that it is still served at once while a single background request
+    refreshes it; older entries and misses wait for the upstream. Refreshes
+    send If-None-Match / If-Modified-Since when the upstream gave an ETag or
+    Last-Modified, so an unchanged list costs a 304. A failed refresh keeps
+    the old value, and a failed miss returns ``default`` without caching it.
+    At most ``max_entries`` entries are kept, least recently used out first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = METADATA_CACHE_TTL_SECONDS,
+        stale: float = METADATA_CACHE_STALE_SECONDS,
+        max_entries: int = METADATA_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    async def get(
+        self,
+        key: Hashable,
+        request: Callable[[Dict[str, str]], Awaitable[httpx.Response]],
+        parse: Callable[[Any], T],
+        default: T
+    ) -> T:
+        """
+        The cached value for ``key``, fetching it when missing or expired.
+
+        ``request(headers)`` performs the upstream GET with the given
+        conditional headers, and ``parse`` turns a 200 response's JSON into
+        the value to cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                age = time.monotonic() - entry.fetched_at
+                if age < self.ttl:
+                    self.hits += 1
+                    return entry.value
+                if age < self.ttl + self.stale:
+                    self.stale_hits += 1
+                    self._refresh(key, entry, request, parse)
+                    return entry.value
+            self.misses += 1
+
+        # Shielded so a cancelled request still lets the fetch fill the cache.
+        fetched = await asyncio.shield(self._refresh(key, entry, request, parse))
+        return fetched.value if fetched is not None else default
+
+    def _refresh(self, key, entry, request, parse) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(key, entry, request, parse))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetched(key, done))
+        return task
+
+    def _fetched(self, key, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _fetch(self, key, entry: Optional[_Entry], request, parse) -> Optional[_Entry]:
+        try:
+            response = await request(entry.conditional_headers() if entry else {})
+        except httpx.HTTPError as e:
+            if entry is None:
+                raise
+            log_error(logger, e, f"Refreshing cached {key}")
+            return entry
+
+        if response.status_code == 304 and entry is not None:
+            fresh = _Entry(entry.value, time.monotonic(), entry.etag, entry.last_modified)
+        elif response.status_code == 200:
+            fresh = _Entry(
+                parse(response.json()),
+                time.monotonic(),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+        else:
+            return entry
+
+        with self._lock:
+            if response.status_code == 304:
+                self.not_modified += 1
+            self._entries[key] = fresh
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fresh
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self.hits = self.stale_hits = self.misses = self.not_modified = 0
+
+
+metadata_cache = MetadataCache()
@@ -0,0 +1,44 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Connection, Engine
+
+from server_python import models  # noqa: F401  (registers the tables)
+from server_python.database import Base, engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+# Convenient for a single dev server; deployments with several workers turn it
+# off and run `python -m server_python.migrate` once before starting them.
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def alembic_config(connection: Connection = None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(__file__), "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade(target: Engine, revision: str = "head"):
+    """
+    Bring an existing database up to the current indexes.
+
+    create_all only creates missing tables, so indexes added to models.py
+    after a table exists reach it through a migration instead.
+    """
+    # Alembic manages the transactions itself: the Postgres index builds
+    # need to step outside of one.
+    with target.connect() as connection:
+        command.upgrade(alembic_config(connection), revision)
+        connection.commit()
+
+
+def migrate(target: Engine):
+    """Create any missing tables, then apply pending migrations."""
+    Base.metadata.create_all(bind=target)
+    upgrade(target)
+
+
+if __name__ == "__main__":
+    migrate(engine)
@@ -0,0 +1,57 @@
+"""Composite indexes for the hot lookups and one imported epic per external id.
+
+Databases created before this revision only have primary keys plus the
+users.email and demo_sessions.session_token indexes, so team dashboards
+scan the whole epics table.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_epics_team_priority", "epics", ["team_id", "priority", "id"], False),
+    ("uq_epics_team_external_id", "epics", ["team_id", "external_id"], True),
+    ("ix_size_mappings_team_size", "size_mappings", ["team_id", "size"], False),
+    ("ix_integration_configs_team_type", "integration_configs", ["team_id", "integration_type"], False),
+    ("ix_demo_sessions_last_accessed", "demo_sessions", ["last_accessed"], False),
+    ("ix_planning_snapshots_team_created", "planning_snapshots", ["team_id", "created_at"], False),
+]
+
+
+def upgrade():
+    # Earlier imports could add the same Jira issue / Trello card twice. Keep
+    # the first copy linked and detach the rest so the unique index can build.
+    op.execute(sa.text(
+        "UPDATE epics SET external_id = NULL "
+        "WHERE external_id IS NOT NULL AND id NOT IN ("
+        "SELECT MIN(id) FROM epics WHERE external_id IS NOT NULL GROUP BY team_id, external_id)"
+    ))
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY keeps a multi-million-row epics table writable while
+        # the index builds; it cannot run inside a transaction.
+        with op.get_context().autocommit_block():
+            for name, table, columns, unique in INDEXES:
+                op.create_index(
+                    name, table, columns, unique=unique,
+                    if_not_exists=True, postgresql_concurrently=True
+                )
+    else:
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,38 @@
+"""Key imported epics by (team_id, source, external_id).
+
+Imports upsert on this key, so a Jira issue key and a Trello card id can
+never collide within a team.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The old (team_id, external_id) index is stricter, so no duplicates to clear.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "uq_epics_team_source_external_id", "epics", ["team_id", "source", "external_id"],
+                unique=True, if_not_exists=True, postgresql_concurrently=True
+            )
+            op.drop_index("uq_epics_team_external_id", table_name="epics", if_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index(
+            "uq_epics_team_source_external_id", "epics", ["team_id", "source", "external_id"],
+            unique=True, if_not_exists=True
+        )
+        op.drop_index("uq_epics_team_external_id", table_name="epics", if_exists=True)
+
+
+def downgrade():
+    op.create_index("uq_epics_team_external_id", "epics", ["team_id", "external_id"], unique=True, if_not_exists=True)
+    op.drop_index("uq_epics_team_source_external_id", table_name="epics", if_exists=True)
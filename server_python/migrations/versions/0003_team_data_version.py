@@ -0,0 +1,26 @@
+"""Per-team data version for ETags.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all has already added the column on databases created since.
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("teams")}
+    if "data_version" not in columns:
+        # A constant default: no table rewrite on Postgres 11+.
+        op.add_column("teams", sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("teams", "data_version")
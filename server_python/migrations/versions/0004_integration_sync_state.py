@@ -0,0 +1,25 @@
+"""Delta-sync state on integration configs.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all has already added the column on databases created since.
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("integration_configs")}
+    if "sync_state" not in columns:
+        op.add_column("integration_configs", sa.Column("sync_state", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("integration_configs", "sync_state")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, JSON, Table
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, JSON, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from server_python.database import Base
@@ -48,6 +48,8 @@ class Team(Base):
     avg_points_per_engineer = Column(Integer, nullable=False, default=8)
     sprint_length_weeks = Column(Integer, nullable=False, default=2)
     sprints_in_increment = Column(Integer, nullable=False, default=6)
+    # Bumped in the same transaction as every write to the team's data; ETags derive from it.
+    data_version = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -60,6 +62,9 @@ class Team(Base):
 
 class SizeMapping(Base):
     __tablename__ = "size_mappings"
+    __table_args__ = (
+        Index("ix_size_mappings_team_size", "team_id", "size"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
@@ -73,6 +78,10 @@ class SizeMapping(Base):
 
 class Epic(Base):
     __tablename__ = "epics"
+    __table_args__ = (
+        Index("ix_epics_team_priority", "team_id", "priority", "id"),
+        Index("uq_epics_team_source_external_id", "team_id", "source", "external_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
@@ -93,6 +102,9 @@ class Epic(Base):
 
 class PlanningSnapshot(Base):
     __tablename__ = "planning_snapshots"
+    __table_args__ = (
+        Index("ix_planning_snapshots_team_created", "team_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
@@ -106,11 +118,16 @@ class PlanningSnapshot(Base):
 
 class IntegrationConfig(Base):
     __tablename__ = "integration_configs"
+    __table_args__ = (
+        Index("ix_integration_configs_team_type", "team_id", "integration_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     integration_type = Column(Text, nullable=False)
     config = Column(JSON, nullable=False)
+    # Delta-sync bookkeeping (high-water marks), kept apart from the user's settings.
+    sync_state = Column(JSON, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -124,6 +141,6 @@ class DemoSession(Base):
     session_token = Column(String(64), unique=True, nullable=False, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    last_accessed = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_accessed = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     team = relationship("Team")
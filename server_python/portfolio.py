@@ -0,0 +1,164 @@
+import os
+import json
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import schemas
+from server_python.forecast import allocate_windows, team_capacity
+
+
+PORTFOLIO_WORKERS = int(os.getenv("PORTFOLIO_WORKERS", "0")) or os.cpu_count() or 1
+# Below this many teams the work is cheaper than shipping it to other processes.
+PORTFOLIO_PARALLEL_MIN_TEAMS = int(os.getenv("PORTFOLIO_PARALLEL_MIN_TEAMS", "16"))
+# Teams handed to a worker per task, to amortize pickling round trips.
+PORTFOLIO_BATCH_SIZE = 8
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass
+class TeamBacklog:
+    team_id: int
+    team_name: str
+    capacity: int
+    points: np.ndarray
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Forking a server with live DB pools, event loop and client threads
+        # can deadlock the child; workers start from a clean interpreter instead.
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor = ProcessPoolExecutor(
+            max_workers=PORTFOLIO_WORKERS,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the worker processes, if any were started; the next parallel forecast starts new ones."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def load_portfolio_backlogs(db: Session, team_ids: Optional[Sequence[int]] = None) -> List[TeamBacklog]:
+    """
+    Points vectors for many teams from two set-based queries.
+
+    Epics are joined to their team's size mapping in SQL and come back
+    ordered by team then priority, so each team is one contiguous slice.
+    """
+    team_query = db.query(models.Team)
+    if team_ids:
+        team_query = team_query.filter(models.Team.id.in_(team_ids))
+    teams = team_query.order_by(models.Team.id).all()
+    if not teams:
+        return []
+
+    size_points = db.query(
+        models.SizeMapping.team_id,
+        models.SizeMapping.size,
+        func.max(models.SizeMapping.points).label("points")
+    ).group_by(models.SizeMapping.team_id, models.SizeMapping.size).subquery()
+
+    epic_query = db.query(
+        models.Epic.team_id,
+        func.coalesce(size_points.c.points, 0)
+    ).outerjoin(size_points, and_(
+        size_points.c.team_id == models.Epic.team_id,
+        size_points.c.size == models.Epic.current_size
+    ))
+    if team_ids:
+        epic_query = epic_query.filter(models.Epic.team_id.in_(team_ids))
+    rows = epic_query.order_by(models.Epic.team_id, models.Epic.priority, models.Epic.id).all()
+
+    epic_team_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    points = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    unique_ids, starts = np.unique(epic_team_ids, return_index=True)
+    stops = np.append(starts[1:], len(rows))
+    slices = {int(t): (int(a), int(b)) for t, a, b in zip(unique_ids, starts, stops)}
+
+    backlogs = []
+    for team in teams:
+        start, stop = slices.get(team.id, (0, 0))
+        backlogs.append(TeamBacklog(team.id, team.name, team_capacity(team), points[start:stop]))
+    return backlogs
+
+
+def forecast_backlog(backlog: TeamBacklog, window_count: int) -> schemas.PortfolioTeamForecast:
+    allocation = allocate_windows(backlog.points, backlog.capacity, window_count)
+    total_points = int(allocation.ends_at[-1]) if len(backlog.points) else 0
+    if backlog.capacity > 0:
+        windows_needed = -(-total_points // backlog.capacity)
+    else:
+        windows_needed = None if total_points else 0
+    return schemas.PortfolioTeamForecast(
+        team_id=backlog.team_id,
+        team_name=backlog.team_name,
+        capacity=backlog.capacity,
+        epic_count=len(backlog.points),
+        total_points=total_points,
+        used_points=allocation.used_points.tolist(),
+        cut_line_index=allocation.cut_line_index,
+        beyond_capacity=total_points > backlog.capacity * window_count,
+        windows_needed=windows_needed,
+    )
+
+
+def _forecast_batch(backlogs: List[TeamBacklog], window_count: int) -> List[schemas.PortfolioTeamForecast]:
+    return [forecast_backlog(b, window_count) for b in backlogs]
+
+
+def forecast_portfolio(
+    backlogs: List[TeamBacklog],
+    window_count: int,
+    min_parallel_teams: int = PORTFOLIO_PARALLEL_MIN_TEAMS
+) -> Iterator[schemas.PortfolioTeamForecast]:
+    """Yield team forecasts as they finish, fanning out to worker processes for large portfolios."""
+    if len(backlogs) < min_parallel_teams or PORTFOLIO_WORKERS <= 1:
+        for backlog in backlogs:
+            yield forecast_backlog(backlog, window_count)
+        return
+
+    executor = get_executor()
+    futures = [
+        executor.submit(_forecast_batch, backlogs[i:i + PORTFOLIO_BATCH_SIZE], window_count)
+        for i in range(0, len(backlogs), PORTFOLIO_BATCH_SIZE)
+    ]
+    for future in as_completed(futures):
+        yield from future.result()
+
+
+def rollup(forecasts: List[schemas.PortfolioTeamForecast], window_count: int) -> schemas.PortfolioRollup:
+    used = np.zeros(window_count, dtype=np.int64)
+    for f in forecasts:
+        used += f.used_points
+    capacity = sum(f.capacity for f in forecasts)
+    return schemas.PortfolioRollup(
+        team_count=len(forecasts),
+        window_count=window_count,
+        capacity=capacity,
+        used_points=used.tolist(),
+        total_points=sum(f.total_points for f in forecasts),
+        total_capacity=capacity * window_count,
+        teams_beyond_capacity=sum(1 for f in forecasts if f.beyond_capacity),
+    )
+
+
+def stream_portfolio_forecast(backlogs: List[TeamBacklog], window_count: int) -> Iterator[str]:
+    """NDJSON lines: one per team as it completes, then the portfolio rollup."""
+    forecasts = []
+    for team_forecast in forecast_portfolio(backlogs, window_count):
+        forecasts.append(team_forecast)
+        yield json.dumps({"type": "team", **team_forecast.model_dump()}) + "\n"
+    yield json.dumps({"type": "rollup", **rollup(forecasts, window_count).model_dump()}) + "\n"
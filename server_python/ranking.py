@@ -0,0 +1,114 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import case, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from server_python import models
+
+
+# Spacing between neighbouring priorities after a rebalance. A move takes the
+# midpoint of its neighbours, so about ten moves into the same slot fit
+# before the gap is used up.
+RANK_GAP = 1024
+# Below this gap a rebalance is scheduled, well before moves run out of room.
+CROWDED_GAP = RANK_GAP >> 6
+
+
+def rank_between(above: Optional[int], below: Optional[int]) -> Optional[int]:
+    """A priority strictly between two neighbours, or None when they are adjacent."""
+    if above is None and below is None:
+        return 0
+    if above is None:
+        return below - RANK_GAP
+    if below is None:
+        return above + RANK_GAP
+    if below - above < 2:
+        return None
+    return (above + below) // 2
+
+
+def append_rank(db: Session, team_id: int) -> int:
+    """The priority that places a new epic after the team's last one."""
+    last_priority = db.scalar(select(func.max(models.Epic.priority)).where(models.Epic.team_id == team_id))
+    return 0 if last_priority is None else last_priority + RANK_GAP
+
+
+def is_crowded(above: Optional[int], rank: int, below: Optional[int]) -> bool:
+    return (above is not None and rank - above < CROWDED_GAP) or (below is not None and below - rank < CROWDED_GAP)
+
+
+def reorder_statement(team_id: int, epic_ids: List[int]):
+    """One UPDATE spacing the listed epics RANK_GAP apart in list order, so later moves find room."""
+    return update(models.Epic).where(
+        models.Epic.team_id == team_id,
+        models.Epic.id.in_(epic_ids)
+    ).values(
+        priority=case({epic_id: idx * RANK_GAP for idx, epic_id in enumerate(epic_ids)}, value=models.Epic.id)
+    ).execution_options(synchronize_session=False)
+
+
+def rebalance_statement(team_id: int):
+    """One UPDATE respacing the team's priorities RANK_GAP apart, keeping their order."""
+    ranked = select(
+        models.Epic.id,
+        (func.row_number().over(order_by=(models.Epic.priority, models.Epic.id)) - 1).label("position")
+    ).where(models.Epic.team_id == team_id).subquery()
+    return update(models.Epic).where(
+        models.Epic.id == ranked.c.id
+    ).values(
+        priority=ranked.c.position * RANK_GAP
+    ).execution_options(synchronize_session=False)
+
+
+def rebalance(db: Session, team_id: int) -> None:
+    db.execute(rebalance_statement(team_id))
+
+
+def neighbour(db: Session, epic: models.Epic, anchor: models.Epic, below: bool) -> Optional[models.Epic]:
+    """The epic directly below (or above) ``anchor`` in priority order, skipping ``epic``."""
+    key = tuple_(models.Epic.priority, models.Epic.id)
+    anchor_key = (anchor.priority, anchor.id)
+    query = select(models.Epic).where(
+        models.Epic.team_id == anchor.team_id,
+        models.Epic.id != epic.id,
+        key > anchor_key if below else key < anchor_key
+    )
+    if below:
+        query = query.order_by(models.Epic.priority, models.Epic.id)
+    else:
+        query = query.order_by(models.Epic.priority.desc(), models.Epic.id.desc())
+    return db.scalars(query.limit(1)).first()
+
+
+def place_between(
+    db: Session,
+    epic: models.Epic,
+    above: Optional[models.Epic],
+    below: Optional[models.Epic]
+) -> Tuple[bool, bool]:
+    """
+    Give ``epic`` a priority between ``above`` and ``below``, touching one row.
+
+    With only one anchor the other neighbour is looked up; with neither the
+    epic moves to the top. When the neighbours have no room between them the
+    team is rebalanced first. Returns (rebalanced, crowded).
+    """
+    if above is None and below is None:
+        below = db.scalars(
+            select(models.Epic).where(models.Epic.team_id == epic.team_id, models.Epic.id != epic.id)
+            .order_by(models.Epic.priority, models.Epic.id).limit(1)
+        ).first()
+    elif below is None:
+        below = neighbour(db, epic, above, below=True)
+    elif above is None:
+        above = neighbour(db, epic, below, below=False)
+
+    rank = rank_between(above and above.priority, below and below.priority)
+    rebalanced = rank is None
+    if rebalanced:
+        rebalance(db, epic.team_id)
+        for row in (above, below):
+            db.refresh(row)
+        rank = rank_between(above.priority, below.priority)
+
+    epic.priority = rank
+    return rebalanced, is_crowded(above and above.priority, rank, below and below.priority)
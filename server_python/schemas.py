@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Any
 from datetime import datetime
 
@@ -149,6 +149,217 @@ class ReorderRequest(BaseModel):
     epic_ids: List[int]
 
 
+class EpicMoveRequest(BaseModel):
+    """Place an epic directly below ``after_epic_id`` and/or above ``before_epic_id``; neither moves it to the top."""
+    after_epic_id: Optional[int] = None
+    before_epic_id: Optional[int] = None
+
+
+class EpicAllocation(BaseModel):
+    epic_id: int
+    points: int
+    window_index: int
+    points_in_window: int
+    rollover_points: int
+    starts_at: int
+    ends_at: int
+    straddles_line: bool
+
+
+class ForecastWindow(BaseModel):
+    index: int
+    capacity: int
+    used_points: int
+    epics: List[EpicAllocation]
+
+
+class Forecast(BaseModel):
+    team_id: int
+    capacity: int
+    window_count: int
+    total_points: int
+    total_capacity: int
+    beyond_capacity: bool
+    cut_line_index: int
+    cut_line_epic_id: Optional[int] = None
+    windows: List[ForecastWindow]
+
+
+class ForecastChanges(BaseModel):
+    team_id: int
+    window_count: int
+    version: int
+    full: bool
+    changed: List[EpicAllocation]
+    removed: List[int]
+    used_points: List[int]
+    cut_line_index: int
+
+
+class PortfolioTeamForecast(BaseModel):
+    team_id: int
+    team_name: str
+    capacity: int
+    epic_count: int
+    total_points: int
+    used_points: List[int]
+    cut_line_index: int
+    beyond_capacity: bool
+    windows_needed: Optional[int] = None
+
+
+class PortfolioRollup(BaseModel):
+    team_count: int
+    window_count: int
+    capacity: int
+    used_points: List[int]
+    total_points: int
+    total_capacity: int
+    teams_beyond_capacity: int
+
+
+class SweepRange(BaseModel):
+    start: int = Field(ge=0)
+    stop: int = Field(ge=0)
+    step: int = Field(default=1, ge=1)
+
+
+class ForecastSweepRequest(BaseModel):
+    engineer_count: Optional[SweepRange] = None
+    avg_points_per_engineer: Optional[SweepRange] = None
+    sprints_in_increment: Optional[SweepRange] = None
+    window_count: int = Field(default=3, ge=1, le=100)
+
+
+class SweepScenario(BaseModel):
+    engineer_count: int
+    avg_points_per_engineer: int
+    sprints_in_increment: int
+    capacity: int
+    windows_needed: Optional[int] = None
+    cut_line_index: int
+    cut_line_epic_id: Optional[int] = None
+
+
+class ForecastSweep(BaseModel):
+    team_id: int
+    window_count: int
+    total_points: int
+    scenarios: List[SweepScenario]
+
+
+class MonteCarloEpic(BaseModel):
+    epic_id: int
+    points: int
+    p50_window: Optional[int] = None
+    p80_window: Optional[int] = None
+    p95_window: Optional[int] = None
+
+
+class MonteCarloWindow(BaseModel):
+    index: int
+    capacity: int
+    overflow_probability: float
+
+
+class MonteCarloForecast(BaseModel):
+    team_id: int
+    capacity: int
+    window_count: int
+    trials: int
+    horizon: int
+    epics: List[MonteCarloEpic]
+    windows: List[MonteCarloWindow]
+
+
+class PlanningSnapshotCreate(BaseModel):
+    name: str
+    planning_increment: str
+    window_count: int = Field(3, ge=1, le=100)
+
+
+class PlanningSnapshotSummary(BaseModel):
+    id: int
+    team_id: int
+    name: str
+    planning_increment: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PlanningSnapshot(PlanningSnapshotSummary):
+    snapshot_data: dict
+
+
+class SnapshotEpicMove(BaseModel):
+    epic_id: int
+    from_priority: int
+    to_priority: int
+    from_window: int
+    to_window: int
+
+
+class SnapshotEpicResize(BaseModel):
+    epic_id: int
+    from_size: str
+    to_size: str
+
+
+class SnapshotDiff(BaseModel):
+    base_id: int
+    head_id: int
+    added: List[int]
+    removed: List[int]
+    moved: List[SnapshotEpicMove]
+    resized: List[SnapshotEpicResize]
+    base_cut_line_epic_id: Optional[int] = None
+    head_cut_line_epic_id: Optional[int] = None
+    cut_line_shift: int
+    entered_above_line: List[int]
+    dropped_below_line: List[int]
+
+
+class PoolWaitBucket(BaseModel):
+    le_ms: Optional[float] = None
+    count: int
+
+
+class PoolCheckoutMetrics(BaseModel):
+    checkouts: int
+    timeouts: int
+    connects: int
+    invalidations: int
+    wait_mean_ms: float
+    wait_max_ms: float
+    wait_histogram: List[PoolWaitBucket]
+
+
+class PoolStatus(BaseModel):
+    name: str
+    backend: str
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    recycle: int
+    pre_ping: bool
+    metrics: Optional[PoolCheckoutMetrics] = None
+
+
+class UpstreamEndpointStats(BaseModel):
+    endpoint: str
+    calls: int
+    errors: int
+    latency_mean_ms: float
+    latency_max_ms: float
+    latency_histogram: List[PoolWaitBucket]
+
+
 class ResetDemoResponse(BaseModel):
     team_id: int
     message: str
@@ -193,9 +404,38 @@ class JiraImportRequest(BaseModel):
 
 class JiraImportResponse(BaseModel):
     imported_count: int
+    created_count: int = 0
+    updated_count: int = 0
     epics: List[Epic]
 
 
+class FileImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class FileImportResponse(BaseModel):
+    imported_count: int
+    error_count: int
+    errors: List[FileImportRowError]
+
+    class Config:
+        from_attributes = True
+
+
+class SyncResponse(BaseModel):
+    team_id: int
+    full: bool
+    fetched: int
+    created: int
+    updated: int
+    deleted: int
+    synced_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class MapPointsRequest(BaseModel):
     story_points: int
 
@@ -206,6 +446,16 @@ class MapPointsResponse(BaseModel):
     matched: bool = True
 
 
+class MapPointsBatchRequest(BaseModel):
+    story_points: List[int] = Field(max_length=100_000)
+
+
+class MapPointsBatchResponse(BaseModel):
+    sizes: List[str]
+    points: List[int]
+    matched: List[bool]
+
+
 class TrelloConfigBase(BaseModel):
     board_id: Optional[str] = None
     epic_label: str = "Epic"
@@ -250,6 +500,8 @@ class TrelloImportRequest(BaseModel):
 
 class TrelloImportResponse(BaseModel):
     imported_count: int
+    created_count: int = 0
+    updated_count: int = 0
     epics: List[Epic]
 
 
@@ -0,0 +1,121 @@
+import bisect
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import versions
+
+
+DEFAULT_SIZE = "M"
+
+
+class SizeLookup:
+    """
+    A team's size mappings compiled for nearest-points lookup.
+
+    Points are kept sorted with the doubled midpoints between neighbours, so a
+    lookup is one bisect. A value exactly halfway between two sizes maps to the
+    smaller one, as the original linear scan did.
+    """
+
+    def __init__(self, mappings: Iterable[Tuple[str, int]]):
+        by_points: Dict[int, str] = {}
+        for size, points in sorted(mappings, key=lambda m: m[1]):
+            by_points.setdefault(points, size)
+        self.points = list(by_points)
+        self.sizes = list(by_points.values())
+        self._midpoints = [a + b for a, b in zip(self.points, self.points[1:])]
+        self._points_array = np.array(self.points, dtype=np.int64)
+        self._sizes_array = np.array(self.sizes, dtype=object)
+        self._midpoints_array = np.array(self._midpoints, dtype=np.int64)
+
+    def __bool__(self) -> bool:
+        return bool(self.points)
+
+    def closest(self, story_points: int) -> Tuple[str, int]:
+        i = bisect.bisect_left(self._midpoints, 2 * story_points)
+        return self.sizes[i], self.points[i]
+
+    def closest_many(self, story_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        i = np.searchsorted(self._midpoints_array, 2 * np.asarray(story_points, dtype=np.int64), side="left")
+        return self._sizes_array[i], self._points_array[i]
+
+    def match_many(self, story_points: List[int]) -> Tuple[List[str], List[int], List[bool]]:
+        values = np.asarray(story_points, dtype=np.int64)
+        sizes, points = self.closest_many(values)
+        return sizes.tolist(), points.tolist(), (points == values).tolist()
+
+    def sizes_for(self, story_points: List[Optional[int]]) -> List[str]:
+        """Sizes for imported issues; unestimated issues default to M."""
+        if not self.points:
+            return [DEFAULT_SIZE] * len(story_points)
+        values = np.fromiter((p or 0 for p in story_points), dtype=np.int64, count=len(story_points))
+        sizes, _ = self.closest_many(values)
+        return np.where(values == 0, DEFAULT_SIZE, sizes).tolist()
+
+
+class SizeLookupCache:
+    """
+    Compiled lookups per team, tagged with the team's data version.
+
+    Every size mapping write bumps the version in the database, so a lookup
+    compiled by another worker process is rebuilt on its next use here. The
+    version is read before the mappings: a write landing in between leaves
+    the lookup tagged older than its contents and it is rebuilt once more,
+    never served stale.
+    """
+
+    def __init__(self):
+        self._lookups: Dict[int, Tuple[int, SizeLookup]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, team_id: int, version: Optional[int]) -> Optional[SizeLookup]:
+        with self._lock:
+            cached = self._lookups.get(team_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return None
+
+    def _store(self, team_id: int, version: Optional[int], lookup: SizeLookup) -> SizeLookup:
+        if version is None:
+            return lookup
+        with self._lock:
+            cached = self._lookups.get(team_id)
+            if cached is None or cached[0] <= version:
+                self._lookups[team_id] = (version, lookup)
+        return lookup
+
+    def _mappings_query(self, team_id: int):
+        return select(models.SizeMapping.size, models.SizeMapping.points).where(
+            models.SizeMapping.team_id == team_id
+        )
+
+    def get(self, db: Session, team_id: int) -> SizeLookup:
+        version = db.scalar(versions.team_version_query(team_id))
+        lookup = self._cached(team_id, version)
+        if lookup is not None:
+            return lookup
+        return self._store(team_id, version, SizeLookup(db.execute(self._mappings_query(team_id)).all()))
+
+    async def get_async(self, db: AsyncSession, team_id: int) -> SizeLookup:
+        version = await db.scalar(versions.team_version_query(team_id))
+        lookup = self._cached(team_id, version)
+        if lookup is not None:
+            return lookup
+        result = await db.execute(self._mappings_query(team_id))
+        return self._store(team_id, version, SizeLookup(result.all()))
+
+    def invalidate(self, team_id: int):
+        with self._lock:
+            self._lookups.pop(team_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._lookups.clear()
+
+
+size_lookup_cache = SizeLookupCache()
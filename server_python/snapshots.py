@@ -0,0 +1,145 @@
+import bisect
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+
+from server_python import models
+from server_python import schemas
+from server_python.forecast import allocate_windows, build_points_vector, size_points_lookup, team_capacity
+
+
+SNAPSHOT_FORMAT = 1
+
+
+def capture_snapshot_data(db: Session, team: models.Team, window_count: int) -> Dict:
+    """
+    The team's backlog and forecast as parallel arrays in priority order.
+
+    Columnar data keeps a snapshot of thousands of epics to a few short JSON
+    arrays instead of one object per epic.
+    """
+    size_points = size_points_lookup(
+        db.query(models.SizeMapping.size, models.SizeMapping.points)
+        .filter(models.SizeMapping.team_id == team.id)
+    )
+    rows = db.query(models.Epic.id, models.Epic.priority, models.Epic.current_size).filter(
+        models.Epic.team_id == team.id
+    ).order_by(models.Epic.priority, models.Epic.id).all()
+
+    sizes = [row.current_size for row in rows]
+    capacity = team_capacity(team)
+    allocation = allocate_windows(build_points_vector(sizes, size_points), capacity, window_count)
+    cut_line_index = allocation.cut_line_index
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "capacity": capacity,
+        "window_count": window_count,
+        "cut_line_index": cut_line_index,
+        "cut_line_epic_id": rows[cut_line_index].id if cut_line_index >= 0 else None,
+        "used_points": allocation.used_points.tolist(),
+        "epic_ids": [row.id for row in rows],
+        "priorities": [row.priority for row in rows],
+        "sizes": sizes,
+        "points": allocation.points.tolist(),
+        "windows": allocation.window_index.tolist(),
+    }
+
+
+def _reordered(base_positions: Dict[int, int], head_ids: List[int]) -> Set[int]:
+    """
+    Epics whose relative order changed: those outside a longest run kept in
+    base order (O(n log n)).
+
+    Raw priorities are not compared, since sparse ranks change them on every
+    move and rebalance; dragging one epic reports just that epic.
+    """
+    common = [epic_id for epic_id in head_ids if epic_id in base_positions]
+    tails: List[int] = []
+    tail_at: List[int] = []
+    previous: List[Optional[int]] = [None] * len(common)
+    for k, epic_id in enumerate(common):
+        position = base_positions[epic_id]
+        length = bisect.bisect_left(tails, position)
+        previous[k] = tail_at[length - 1] if length else None
+        if length == len(tails):
+            tails.append(position)
+            tail_at.append(k)
+        else:
+            tails[length] = position
+            tail_at[length] = k
+
+    kept = set()
+    k = tail_at[-1] if tail_at else None
+    while k is not None:
+        kept.add(common[k])
+        k = previous[k]
+    return {epic_id for epic_id in common if epic_id not in kept}
+
+
+def diff_snapshots(base: models.PlanningSnapshot, head: models.PlanningSnapshot) -> schemas.SnapshotDiff:
+    """Compare two snapshots with one hash lookup per epic."""
+    before = base.snapshot_data
+    after = head.snapshot_data
+    base_positions = {epic_id: i for i, epic_id in enumerate(before["epic_ids"])}
+    reordered = _reordered(base_positions, after["epic_ids"])
+    base_cut = before["cut_line_index"]
+    head_cut = after["cut_line_index"]
+
+    added: List[int] = []
+    moved: List[schemas.SnapshotEpicMove] = []
+    resized: List[schemas.SnapshotEpicResize] = []
+    entered_above_line: List[int] = []
+    dropped_below_line: List[int] = []
+
+    for j, epic_id in enumerate(after["epic_ids"]):
+        i = base_positions.pop(epic_id, None)
+        if i is None:
+            added.append(epic_id)
+            if j <= head_cut:
+                entered_above_line.append(epic_id)
+            continue
+
+        if epic_id in reordered or before["windows"][i] != after["windows"][j]:
+            moved.append(schemas.SnapshotEpicMove(
+                epic_id=epic_id,
+                from_priority=before["priorities"][i],
+                to_priority=after["priorities"][j],
+                from_window=before["windows"][i],
+                to_window=after["windows"][j],
+            ))
+        if before["sizes"][i] != after["sizes"][j]:
+            resized.append(schemas.SnapshotEpicResize(
+                epic_id=epic_id,
+                from_size=before["sizes"][i],
+                to_size=after["sizes"][j],
+            ))
+
+        was_above, is_above = i <= base_cut, j <= head_cut
+        if is_above and not was_above:
+            entered_above_line.append(epic_id)
+        elif was_above and not is_above:
+            dropped_below_line.append(epic_id)
+
+    removed = list(base_positions)
+    dropped_below_line.extend(epic_id for epic_id, i in base_positions.items() if i <= base_cut)
+
+    return schemas.SnapshotDiff(
+        base_id=base.id,
+        head_id=head.id,
+        added=added,
+        removed=removed,
+        moved=moved,
+        resized=resized,
+        base_cut_line_epic_id=before["cut_line_epic_id"],
+        head_cut_line_epic_id=after["cut_line_epic_id"],
+        cut_line_shift=head_cut - base_cut,
+        entered_above_line=entered_above_line,
+        dropped_below_line=dropped_below_line,
+    )
+
+
+def get_team_snapshot(db: Session, team_id: int, snapshot_id: int) -> Optional[models.PlanningSnapshot]:
+    return db.query(models.PlanningSnapshot).filter(
+        models.PlanningSnapshot.id == snapshot_id,
+        models.PlanningSnapshot.team_id == team_id
+    ).first()
@@ -1,8 +1,12 @@
 import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 import httpx
-from typing import List, Optional
 from pydantic import BaseModel
 
+from server_python.http_clients import shared_client
+from server_python.metadata_cache import credentials_fingerprint, metadata_cache
+
 
 class TrelloBoard(BaseModel):
     id: str
@@ -20,6 +24,17 @@ class TrelloCard(BaseModel):
     desc: str = ""
     labels: List[str] = []
     size_label: Optional[str] = None
+    list_id: Optional[str] = None
+    date_last_activity: Optional[datetime] = None
+
+
+class TrelloBoardSnapshot(BaseModel):
+    id: str
+    name: str
+    date_last_activity: Optional[datetime] = None
+    lists: List[TrelloList] = []
+    labels: List[str] = []
+    cards: List[TrelloCard] = []
 
 
 class TrelloService:
@@ -30,6 +45,7 @@ class TrelloService:
     def __init__(self):
         self.api_key = os.getenv("TRELLO_API_KEY", "")
         self.token = os.getenv("TRELLO_TOKEN", "")
+        self.http = shared_client("trello")
 
     @property
     def is_configured(self) -> bool:
@@ -38,35 +54,49 @@ class TrelloService:
     def _auth_params(self) -> dict:
         return {"key": self.api_key, "token": self.token}
 
-    async def get_boards(self) -> List[TrelloBoard]:
+    @property
+    def credentials_key(self) -> str:
+        return credentials_fingerprint(self.api_key, self.token)
+
+    async def get_boards(self, team_id: Optional[int] = None) -> List[TrelloBoard]:
+        """Boards of the token's member, cached per team and credentials."""
         if not self.is_configured:
             return []
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async def request(headers: Dict[str, str]) -> httpx.Response:
+            return await self.http.get(
+                "boards",
                 f"{self.BASE_URL}/members/me/boards",
-                params={**self._auth_params(), "fields": "id,name"}
+                params={**self._auth_params(), "fields": "id,name"},
+                headers=headers
             )
-            if response.status_code != 200:
-                return []
 
-            boards = response.json()
-            return [TrelloBoard(id=b["id"], name=b["name"]) for b in boards]
+        return await metadata_cache.get(
+            ("trello boards", self.credentials_key, team_id), request, self._parse_boards, default=[]
+        )
 
-    async def get_lists(self, board_id: str) -> List[TrelloList]:
+    async def get_lists(self, board_id: str, team_id: Optional[int] = None) -> List[TrelloList]:
+        """A board's lists, cached per team and credentials."""
         if not self.is_configured:
             return []
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async def request(headers: Dict[str, str]) -> httpx.Response:
+            return await self.http.get(
+                "lists",
                 f"{self.BASE_URL}/boards/{board_id}/lists",
-                params={**self._auth_params(), "fields": "id,name"}
+                params={**self._auth_params(), "fields": "id,name"},
+                headers=headers
             )
-            if response.status_code != 200:
-                return []
 
-            lists = response.json()
-            return [TrelloList(id=l["id"], name=l["name"]) for l in lists]
+        return await metadata_cache.get(
+            ("trello lists", self.credentials_key, team_id, board_id), request, self._parse_lists, default=[]
+        )
+
+    def _parse_boards(self, boards: List[Dict[str, Any]]) -> List[TrelloBoard]:
+        return [TrelloBoard(id=b["id"], name=b["name"]) for b in boards]
+
+    def _parse_lists(self, lists: List[Dict[str, Any]]) -> List[TrelloList]:
+        return [TrelloList(id=l["id"], name=l["name"]) for l in lists]
 
     async def get_cards(
         self,
@@ -79,41 +109,101 @@ class TrelloService:
 
         endpoint = f"{self.BASE_URL}/lists/{list_id}/cards" if list_id else f"{self.BASE_URL}/boards/{board_id}/cards"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                endpoint,
-                params={**self._auth_params(), "fields": "id,name,desc,labels"}
-            )
-            if response.status_code != 200:
-                return []
+        response = await self.http.get(
+            "cards",
+            endpoint,
+            params={**self._auth_params(), "fields": "id,name,desc,labels"}
+        )
+        if response.status_code != 200:
+            return []
 
-            cards_data = response.json()
-            cards = []
+        cards_data = response.json()
+        cards = []
+        
+        for c in cards_data:
+            label_names = [label.get("name", "") for label in c.get("labels", [])]
             
-            for c in cards_data:
-                label_names = [label.get("name", "") for label in c.get("labels", [])]
-                
-                if filter_label and filter_label not in label_names:
-                    continue
-                
-                size_label = self._extract_size_label(label_names)
-                
-                cards.append(TrelloCard(
-                    id=c["id"],
-                    name=c["name"],
-                    desc=c.get("desc", ""),
-                    labels=label_names,
-                    size_label=size_label
-                ))
+            if filter_label and filter_label not in label_names:
+                continue
             
-            return cards
-
-    def _extract_size_label(self, labels: List[str]) -> Optional[str]:
+            size_label = self._extract_size_label(label_names)
+            
+            cards.append(TrelloCard(
+                id=c["id"],
+                name=c["name"],
+                desc=c.get("desc", ""),
+                labels=label_names,
+                size_label=size_label
+            ))
+        
+        return cards
+
+    async def get_board_activity(self, board_id: str) -> Optional[datetime]:
+        """The board's dateLastActivity, which moves whenever anything on it changes."""
+        response = await self.http.get(
+            "board activity",
+            f"{self.BASE_URL}/boards/{board_id}",
+            params={**self._auth_params(), "fields": "dateLastActivity"}
+        )
+        response.raise_for_status()
+        return _parse_date(response.json().get("dateLastActivity"))
+
+    async def get_board_snapshot(self, board_id: str, size_label_prefix: str = "") -> TrelloBoardSnapshot:
+        """Board, open lists, labels and open cards in one nested request; errors raise."""
+        response = await self.http.get(
+            "board snapshot",
+            f"{self.BASE_URL}/boards/{board_id}",
+            params={
+                **self._auth_params(),
+                "fields": "id,name,dateLastActivity",
+                "lists": "open",
+                "list_fields": "id,name",
+                "labels": "all",
+                "label_fields": "id,name",
+                "cards": "open",
+                "card_fields": "id,name,desc,labels,idList,dateLastActivity",
+            }
+        )
+        response.raise_for_status()
+        board = response.json()
+
+        cards = []
+        for c in board.get("cards", []):
+            label_names = [label.get("name", "") for label in c.get("labels", [])]
+            cards.append(TrelloCard(
+                id=c["id"],
+                name=c["name"],
+                desc=c.get("desc", ""),
+                labels=label_names,
+                size_label=self._extract_size_label(label_names, size_label_prefix),
+                list_id=c.get("idList"),
+                date_last_activity=_parse_date(c.get("dateLastActivity"))
+            ))
+
+        return TrelloBoardSnapshot(
+            id=board["id"],
+            name=board["name"],
+            date_last_activity=_parse_date(board.get("dateLastActivity")),
+            lists=[TrelloList(id=l["id"], name=l["name"]) for l in board.get("lists", [])],
+            labels=[label.get("name", "") for label in board.get("labels", [])],
+            cards=cards
+        )
+
+    def _extract_size_label(self, labels: List[str], prefix: str = "") -> Optional[str]:
         size_labels = ["2-XS", "XS", "S", "M", "L", "XL", "2-XL", "3-XL"]
         for label in labels:
+            if prefix:
+                if not label.upper().startswith(prefix.upper()):
+                    continue
+                label = label[len(prefix):].strip()
             if label.upper() in [s.upper() for s in size_labels]:
                 return label.upper()
         return None
 
 
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    # Trello dates look like 2024-05-01T12:00:00.000Z.
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
 trello_service = TrelloService()
@@ -0,0 +1,130 @@
+import hashlib
+import os
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server_python import imports
+from server_python import versions
+from server_python.database import AsyncSessionLocal
+from server_python.forecast_cache import forecast_cache
+from server_python.incremental_forecast import forecast_tracker
+from server_python.integration_sync import (
+    SyncNotEnabled, SyncResult, SyncScheduler, integration_config, parse_time, sync_enabled_team_ids, utcnow
+)
+from server_python.logger import get_logger
+from server_python.trello_service import TrelloService, trello_service
+
+logger = get_logger("sync")
+
+TRELLO_SYNC_INTERVAL_SECONDS = float(os.getenv("TRELLO_SYNC_INTERVAL_SECONDS", "300"))
+TRELLO_SYNC_JITTER_SECONDS = float(os.getenv("TRELLO_SYNC_JITTER_SECONDS", "30"))
+TRELLO_SYNC_CONCURRENCY = int(os.getenv("TRELLO_SYNC_CONCURRENCY", "4"))
+# Every card is reprocessed at most this often, catching anything the activity dates missed.
+TRELLO_SYNC_RECONCILE_SECONDS = float(os.getenv("TRELLO_SYNC_RECONCILE_SECONDS", "3600"))
+
+
+def labels_digest(labels) -> str:
+    return hashlib.sha1("\n".join(sorted(labels)).encode()).hexdigest()
+
+
+async def sync_team(
+    db: AsyncSession, team_id: int, service: TrelloService = trello_service, full: bool = False
+) -> SyncResult:
+    """
+    Bring a team's Trello epics up to date with its board.
+
+    A board whose dateLastActivity has not moved costs one small request and
+    nothing else. Otherwise the board, its labels and cards come back in one
+    nested request, and only cards active since the previous snapshot are
+    upserted; previously synced cards that are gone, archived or lost the
+    epic label are deleted. The first sync, a forced one, one after the
+    board's labels changed and one every TRELLO_SYNC_RECONCILE_SECONDS
+    process every card.
+    Raises SyncNotEnabled when the team has no enabled Trello sync config.
+    """
+    config = await integration_config(db, team_id, "trello")
+    settings = config.config if config else {}
+    if not settings.get("sync_enabled") or not settings.get("board_id"):
+        raise SyncNotEnabled("Trello sync is not enabled for this team")
+
+    started = utcnow()
+    state = config.sync_state or {}
+    last_activity = parse_time(state.get("board_activity"))
+    last_reconciled = parse_time(state.get("last_reconciled_at"))
+    full = full or last_activity is None or last_reconciled is None or \
+        started - last_reconciled >= timedelta(seconds=TRELLO_SYNC_RECONCILE_SECONDS)
+
+    board_id = settings["board_id"]
+    result = SyncResult(team_id=team_id, full=full, synced_at=started)
+    if not full:
+        activity = await service.get_board_activity(board_id)
+        if activity is not None and activity <= last_activity:
+            config.sync_state = {**state, "last_synced_at": started.isoformat()}
+            await db.commit()
+            return result
+
+    board = await service.get_board_snapshot(board_id, settings.get("size_label_prefix") or "")
+    digest = labels_digest(board.labels)
+    # A renamed label changes card sizes without touching the cards' activity dates.
+    if digest != state.get("labels_digest"):
+        full = result.full = True
+
+    epic_label = settings.get("epic_label")
+    cards = [card for card in board.cards if not epic_label or epic_label in card.labels]
+    cards_to_apply = cards if full else [
+        card for card in cards
+        if card.date_last_activity is None or card.date_last_activity > last_activity
+    ]
+
+    items = [imports.ImportedItem(card.id, card.name, card.desc, card.size_label or "M") for card in cards_to_apply]
+    epics, created = await db.run_sync(imports.upsert_epics, team_id, "Trello", items, True)
+    result.fetched = len(items)
+    result.created = created
+    result.updated = len(epics) - created
+    # Only cards an earlier sync took from this board; epics from other boards stay.
+    card_ids = {card.id for card in cards}
+    synced_before = set(state.get("card_ids", []))
+    result.deleted = await db.run_sync(
+        imports.delete_missing, team_id, "Trello", card_ids, None, synced_before
+    )
+
+    config.sync_state = {
+        "last_synced_at": started.isoformat(),
+        "last_reconciled_at": started.isoformat() if full else state.get("last_reconciled_at"),
+        "board_activity": (board.date_last_activity or started).isoformat(),
+        "labels_digest": digest,
+        "card_ids": sorted(card_ids),
+    }
+    if result.changed:
+        await db.execute(versions.bump(team_id))
+    await db.commit()
+
+    if result.changed:
+        forecast_tracker.invalidate(team_id)
+        forecast_cache.bump(team_id)
+    logger.info(
+        f"Trello sync for team {team_id} ({'full' if full else 'delta'}): {len(board.cards)} cards on board, "
+        f"{result.created} created, {result.updated} updated, {result.deleted} deleted"
+    )
+    return result
+
+
+async def _list_teams():
+    async with AsyncSessionLocal() as db:
+        return await sync_enabled_team_ids(db, "trello", "board_id")
+
+
+async def _sync_scheduled_team(team_id: int):
+    async with AsyncSessionLocal() as db:
+        await sync_team(db, team_id)
+
+
+trello_sync_scheduler = SyncScheduler(
+    "Trello", _list_teams, _sync_scheduled_team,
+    TRELLO_SYNC_INTERVAL_SECONDS, TRELLO_SYNC_JITTER_SECONDS, TRELLO_SYNC_CONCURRENCY
+)
+
+
+def start_scheduler():
+    if trello_service.is_configured:
+        trello_sync_scheduler.start()
@@ -0,0 +1,72 @@
+import hashlib
+from typing import Iterable, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import select, update
+
+from server_python import models
+
+
+# Browsers may keep the body but must revalidate it, which is a 304 when unchanged.
+CACHE_CONTROL = "private, no-cache"
+
+
+def bump(team_id: int):
+    """
+    Statement moving a team to its next data version, to run in the write's own transaction.
+
+    Every write to a team, its epics or its size mappings runs this before
+    committing, so the version (and every ETag derived from it) changes in
+    the same commit as the data. It returns the new version, which the
+    forecast tracker hooks take after the commit.
+    """
+    return update(models.Team).where(models.Team.id == team_id).values(
+        data_version=models.Team.data_version + 1
+    ).returning(models.Team.data_version).execution_options(synchronize_session=False)
+
+
+def team_version_query(team_id: int):
+    return select(models.Team.data_version).where(models.Team.id == team_id)
+
+
+def all_team_versions_query():
+    return select(models.Team.id, models.Team.data_version).order_by(models.Team.id)
+
+
+def etag(request: Request, *parts: object) -> str:
+    """
+    Strong ETag for a representation of versioned data.
+
+    The query string is part of the key, since a page, filter or projection
+    of the same data is a different representation.
+    """
+    digest = hashlib.sha1(
+        "|".join([request.url.path, str(sorted(request.query_params.multi_items())), *map(str, parts)]).encode()
+    ).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def versions_etag(request: Request, versions: Iterable[Tuple[int, int]]) -> str:
+    return etag(request, *(f"{team_id}:{version}" for team_id, version in versions))
+
+
+def etag_matches(if_none_match: Optional[str], current: str) -> bool:
+    """If-None-Match uses weak comparison, so a W/ prefix still matches."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == current:
+            return True
+    return False
+
+
+def conditional(request: Request, response: Response, current: str) -> Optional[Response]:
+    """
+    A 304 when the client already holds ``current``; otherwise None, with the
+    ETag set on ``response`` for the full reply.
+    """
+    headers = {"ETag": current, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), current):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
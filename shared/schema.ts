@@ -1,5 +1,5 @@
 import { sql } from "drizzle-orm";
-import { pgTable, text, varchar, integer, serial, timestamp, jsonb, boolean } from "drizzle-orm/pg-core";
+import { pgTable, text, varchar, integer, serial, timestamp, jsonb, boolean, index, uniqueIndex } from "drizzle-orm/pg-core";
 import { createInsertSchema } from "drizzle-zod";
 import { z } from "zod";
 
@@ -17,12 +17,14 @@ export const teams = pgTable("teams", {
   avgPointsPerEngineer: integer("avg_points_per_engineer").notNull().default(8),
   sprintLengthWeeks: integer("sprint_length_weeks").notNull().default(2),
   sprintsInIncrement: integer("sprints_in_increment").notNull().default(6),
+  dataVersion: integer("data_version").notNull().default(0), // Bumped by every write; drives ETags
   createdAt: timestamp("created_at").defaultNow().notNull(),
   updatedAt: timestamp("updated_at").defaultNow().notNull(),
 });
 
 export const insertTeamSchema = createInsertSchema(teams).omit({
   id: true,
+  dataVersion: true,
   createdAt: true,
   updatedAt: true,
 });
@@ -38,7 +40,9 @@ export const sizeMappings = pgTable("size_mappings", {
   points: integer("points").notNull(),
   confidence: integer("confidence").notNull(), // 0-100
   anchorDescription: text("anchor_description").notNull(),
-});
+}, (table) => [
+  index("ix_size_mappings_team_size").on(table.teamId, table.size),
+]);
 
 export const insertSizeMappingSchema = createInsertSchema(sizeMappings).omit({
   id: true,
@@ -62,7 +66,10 @@ export const epics = pgTable("epics", {
   priority: integer("priority").notNull().default(0), // For ordering
   createdAt: timestamp("created_at").defaultNow().notNull(),
   updatedAt: timestamp("updated_at").defaultNow().notNull(),
-});
+}, (table) => [
+  index("ix_epics_team_priority").on(table.teamId, table.priority, table.id),
+  uniqueIndex("uq_epics_team_source_external_id").on(table.teamId, table.source, table.externalId),
+]);
 
 export const insertEpicSchema = createInsertSchema(epics).omit({
   id: true,
@@ -81,7 +88,9 @@ export const planningSnapshots = pgTable("planning_snapshots", {
   planningIncrement: text("planning_increment").notNull(), // e.g., "Q3 2024"
   snapshotData: jsonb("snapshot_data").notNull(), // Stores epic states, capacity, etc.
   createdAt: timestamp("created_at").defaultNow().notNull(),
-});
+}, (table) => [
+  index("ix_planning_snapshots_team_created").on(table.teamId, table.createdAt),
+]);
 
 export const insertPlanningSnapshotSchema = createInsertSchema(planningSnapshots).omit({
   id: true,
@@ -97,12 +106,16 @@ export const integrationConfigs = pgTable("integration_configs", {
   teamId: integer("team_id").notNull().references(() => teams.id, { onDelete: "cascade" }),
   integrationType: text("integration_type").notNull(), // 'jira' or 'trello'
   config: jsonb("config").notNull(), // Stores API keys, project IDs, board IDs, etc.
+  syncState: jsonb("sync_state"), // Delta-sync high-water marks, written by the server
   isActive: boolean("is_active").default(true),
   createdAt: timestamp("created_at").defaultNow().notNull(),
-});
+}, (table) => [
+  index("ix_integration_configs_team_type").on(table.teamId, table.integrationType),
+]);
 
 export const insertIntegrationConfigSchema = createInsertSchema(integrationConfigs).omit({
   id: true,
+  syncState: true,
   createdAt: true,
 });
 
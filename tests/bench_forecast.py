@@ -0,0 +1,203 @@
+"""
+Forecast engine micro-benchmarks.
+
+Runs the allocation, sweep, incremental, Monte Carlo and size-lookup code
+against synthetic backlogs and writes throughput, peak memory and p50/p99
+latency per case to JSON:
+
+    python -m tests.bench_forecast --output bench_output.json
+    python -m tests.bench_forecast --sizes 1000 10000 --compare bench_output.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import numpy as np
+
+from server_python.forecast import allocate_windows, sweep_capacities
+from server_python.incremental_forecast import IncrementalForecast
+from server_python.monte_carlo import simulate
+from server_python.size_lookup import SizeLookup
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SIZE_MAPPINGS = [("XS", 1), ("S", 3), ("M", 5), ("L", 8), ("XL", 13), ("XXL", 21)]
+# Most planned epics are S-L; the tails are rare.
+SIZE_WEIGHTS = [0.08, 0.24, 0.32, 0.22, 0.10, 0.04]
+UNESTIMATED_SHARE = 0.1
+WINDOW_COUNT = 6
+SWEEP_CAPACITIES = 100
+MONTE_CARLO_TRIALS = 1_000
+# Monte Carlo is trials x epics; above this it measures memory bandwidth, not the engine.
+MONTE_CARLO_MAX_EPICS = 100_000
+TARGET_SECONDS_PER_CASE = 2.0
+MAX_REPEATS = 200
+MIN_REPEATS = 5
+
+
+def synthetic_backlog(n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    size_index = rng.choice(len(SIZE_MAPPINGS), size=n, p=SIZE_WEIGHTS)
+    points = np.array([p for _, p in SIZE_MAPPINGS], dtype=np.int64)[size_index]
+    sizes = np.array([s for s, _ in SIZE_MAPPINGS], dtype=object)[size_index]
+    story_points = rng.integers(1, 40, size=n)
+    unestimated = rng.random(n) < UNESTIMATED_SHARE
+    # Per window, roughly a tenth of the backlog fits, so the cut line lands mid-backlog.
+    capacity = max(1, int(points.sum()) // (WINDOW_COUNT * 10))
+    return {
+        "points": points,
+        "sizes": sizes,
+        "story_points": [None if u else int(p) for p, u in zip(story_points, unestimated)],
+        "confidence_spreads": rng.choice([0.1, 0.2, 0.3, 0.5], size=n),
+        "capacity": capacity,
+    }
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q)) * 1000
+
+
+def measure(name: str, n: int, fn: Callable[[], object], items: Optional[int] = None) -> Dict:
+    """Time ``fn`` repeatedly, then run it once more under tracemalloc for peak memory."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    repeats = int(min(MAX_REPEATS, max(MIN_REPEATS, TARGET_SECONDS_PER_CASE / max(first, 1e-9))))
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = float(np.percentile(samples, 50))
+    return {
+        "case": name,
+        "epics": n,
+        "repeats": repeats,
+        "p50_ms": p50 * 1000,
+        "p99_ms": percentile_ms(samples, 99),
+        "throughput_per_s": (items or n) / p50 if p50 > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_size(n: int) -> List[Dict]:
+    backlog = synthetic_backlog(n)
+    points, sizes, capacity = backlog["points"], backlog["sizes"], backlog["capacity"]
+    ends_at = np.cumsum(points)
+    capacities = np.linspace(capacity // 2, capacity * 2, SWEEP_CAPACITIES).astype(np.int64)
+    lookup = SizeLookup(SIZE_MAPPINGS)
+    story_points = backlog["story_points"]
+    estimated = [p for p in story_points if p]
+    scalar_sample = estimated[:10_000]
+
+    results = [
+        measure("allocate_windows", n, lambda: allocate_windows(points, capacity, WINDOW_COUNT)),
+        measure(
+            "sweep_capacities", n,
+            lambda: sweep_capacities(ends_at, capacities, WINDOW_COUNT),
+            items=n * SWEEP_CAPACITIES
+        ),
+        measure("size_lookup.sizes_for", n, lambda: lookup.sizes_for(story_points)),
+        measure("size_lookup.match_many", n, lambda: lookup.match_many(estimated), items=len(estimated)),
+        measure(
+            "size_lookup.closest", n,
+            lambda: [lookup.closest(p) for p in scalar_sample],
+            items=len(scalar_sample)
+        ),
+    ]
+
+    state = IncrementalForecast(
+        WINDOW_COUNT, capacity, dict(SIZE_MAPPINGS),
+        np.arange(1, n + 1), np.arange(n), list(sizes)
+    )
+    middle = n // 2
+    resize_to = ["S", "L"]
+    flips = iter(range(10**9))
+    results.append(measure(
+        "incremental.resize_middle", n,
+        lambda: state.resize(middle, resize_to[next(flips) % 2]),
+        items=1
+    ))
+
+    if n <= MONTE_CARLO_MAX_EPICS:
+        spreads = backlog["confidence_spreads"]
+        results.append(measure(
+            "monte_carlo.simulate", n,
+            lambda: simulate(points, spreads, capacity, WINDOW_COUNT, trials=MONTE_CARLO_TRIALS, seed=1),
+            items=n * MONTE_CARLO_TRIALS
+        ))
+    return results
+
+
+def run_benchmarks(sizes: List[int]) -> Dict:
+    results = []
+    for n in sizes:
+        for result in bench_size(n):
+            results.append(result)
+            print(
+                f"{result['case']:<28} {n:>9,} epics  p50 {result['p50_ms']:>10.3f} ms  "
+                f"p99 {result['p99_ms']:>10.3f} ms  peak {result['peak_memory_bytes'] / 1e6:>8.1f} MB",
+                file=sys.stderr
+            )
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> List[Dict]:
+    """p50 ratio (current / baseline) per case and size present in both runs."""
+    previous = {(r["case"], r["epics"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get((result["case"], result["epics"]))
+        if before and before["p50_ms"] > 0:
+            rows.append({
+                "case": result["case"],
+                "epics": result["epics"],
+                "p50_ratio": result["p50_ms"] / before["p50_ms"],
+                "peak_memory_ratio": result["peak_memory_bytes"] / max(before["peak_memory_bytes"], 1),
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="Earlier JSON output to compare p50 and peak memory against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes)
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+        for row in report["comparison"]:
+            print(f"{row['case']:<28} {row['epics']:>9,} epics  p50 x{row['p50_ratio']:.2f}", file=sys.stderr)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
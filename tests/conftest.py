@@ -1,49 +1,80 @@
+import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from server_python.database import Base, get_db
+from server_python.database import Base, get_db, get_async_db, get_read_db, get_async_read_db
 from server_python.main import app
+from server_python.incremental_forecast import forecast_tracker
+from server_python.forecast_cache import forecast_cache
+from server_python.size_lookup import size_lookup_cache
+from server_python.metadata_cache import metadata_cache
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# A file rather than :memory:, so the sync and async engines see the same database.
+SQLITE_PATH = os.path.join(tempfile.mkdtemp(prefix="portfolio-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{SQLITE_PATH}", poolclass=NullPool)
+
+
+@event.listens_for(engine, "connect")
+def _enable_wal(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
 
-_test_db: Session = None
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 def override_get_db():
-    global _test_db
+    db = TestingSessionLocal()
     try:
-        yield _test_db
+        yield db
     finally:
-        pass
+        db.close()
+
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
 
 
 @pytest.fixture(scope="function")
 def db_session():
-    global _test_db
     Base.metadata.create_all(bind=engine)
-    _test_db = TestingSessionLocal()
+    db = TestingSessionLocal()
     try:
-        yield _test_db
+        yield db
     finally:
-        _test_db.close()
-        _test_db = None
+        db.close()
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_metadata_cache():
+    # Services built in different tests share credentials, and so cache keys.
+    yield
+    metadata_cache.clear()
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+    forecast_tracker.invalidate()
+    forecast_cache.clear()
+    size_lookup_cache.clear()
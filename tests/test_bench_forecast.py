@@ -0,0 +1,25 @@
+import json
+
+from tests import bench_forecast
+
+
+class TestBenchmarkSuite:
+    def test_writes_machine_readable_report(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench_forecast, "TARGET_SECONDS_PER_CASE", 0.01)
+        output = tmp_path / "bench.json"
+        bench_forecast.main(["--sizes", "1000", "--output", str(output)])
+
+        report = json.loads(output.read_text())
+        cases = {r["case"] for r in report["results"]}
+        assert {"allocate_windows", "size_lookup.sizes_for", "monte_carlo.simulate"} <= cases
+        for result in report["results"]:
+            assert result["epics"] == 1000
+            assert result["repeats"] >= bench_forecast.MIN_REPEATS
+            assert 0 < result["p50_ms"] <= result["p99_ms"]
+            assert result["throughput_per_s"] > 0
+            assert result["peak_memory_bytes"] >= 0
+
+        comparison = tmp_path / "compare.json"
+        bench_forecast.main(["--sizes", "1000", "--output", str(comparison), "--compare", str(output)])
+        rows = json.loads(comparison.read_text())["comparison"]
+        assert len(rows) == len(report["results"])
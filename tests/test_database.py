@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import exc
+
+from server_python.database import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, async_database_url, build_engine, engine_options, pool_status
+)
+
+
+class TestEngineOptions:
+    def test_postgres_pool_settings_from_env(self):
+        options = engine_options("postgresql://u:p@db/app", {
+            "DB_POOL_SIZE": "20", "DB_MAX_OVERFLOW": "5", "DB_POOL_TIMEOUT": "2.5",
+            "DB_POOL_RECYCLE": "60", "DB_POOL_PRE_PING": "false", "DB_STATEMENT_TIMEOUT_MS": "15000"
+        })
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 5
+        assert options["pool_timeout"] == 2.5
+        assert options["pool_recycle"] == 60
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"] == {"options": "-c statement_timeout=15000"}
+
+    def test_postgres_defaults_ping_and_recycle(self):
+        options = engine_options("postgresql://u:p@db/app", {})
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == 300
+        assert "connect_args" not in options
+
+    def test_async_postgres_uses_async_pool(self):
+        options = engine_options("postgresql+asyncpg://u:p@db/app", {"DB_STATEMENT_TIMEOUT_MS": "500"})
+        assert options["poolclass"] is InstrumentedAsyncQueuePool
+        assert options["connect_args"] == {"server_settings": {"statement_timeout": "500"}}
+
+    def test_async_database_url(self):
+        assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+        assert async_database_url(
+            "postgresql://u:p@db/app?sslmode=require&channel_binding=require"
+        ) == "postgresql+asyncpg://u:p@db/app?ssl=require"
+        assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+        assert async_database_url("postgresql+asyncpg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+    def test_sqlite_keeps_default_pooling(self):
+        assert engine_options("sqlite:///:memory:", {"DB_POOL_SIZE": "20"}) == {}
+
+
+class TestPoolMetrics:
+    def test_tracks_checkouts_overflow_and_timeouts(self):
+        pooled = build_engine(
+            "sqlite://", {}, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1,
+            pool_timeout=0.01, connect_args={"check_same_thread": False}
+        )
+        first, second = pooled.connect(), pooled.connect()
+        with pytest.raises(exc.TimeoutError):
+            pooled.connect()
+
+        status = pool_status("test", pooled)
+        assert status["checked_out"] == 2
+        assert status["overflow"] == 1
+        metrics = status["metrics"]
+        assert metrics["checkouts"] == 2
+        assert metrics["timeouts"] == 1
+        assert metrics["connects"] == 2
+        assert sum(b["count"] for b in metrics["wait_histogram"]) == 3
+        assert metrics["wait_max_ms"] >= 10
+
+        first.close()
+        second.close()
+        pooled.dispose()
+        assert pool_status("test", pooled)["metrics"]["checkouts"] == 2
+
+    def test_pool_metrics_endpoint(self, client):
+        response = client.get("/api/internal/pool-metrics")
+        assert response.status_code == 200
+        pools = {p["name"]: p for p in response.json()}
+        assert set(pools) == {"sync", "async"}
+        assert pools["sync"]["backend"] == pools["async"]["backend"] == "sqlite"
@@ -7,6 +7,8 @@ from sqlalchemy.pool import StaticPool
 from server_python.main import app
 from server_python.database import Base, get_db
 from server_python import models
+from server_python import ranking
+from server_python import versions
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -161,6 +163,41 @@ class TestDemoSessions:
         assert epic_response.status_code == 201
         assert epic_response.json()["title"] == "New Epic"
 
+    def test_created_demo_epic_lands_last_after_moves_and_rebalance(self, client):
+        session = client.post("/api/demo/session").json()
+        headers = {"X-Demo-Session": session["session_token"]}
+        team_id = session["team"]["id"]
+        ids = [e["id"] for e in client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()]
+        client.post(
+            f"/api/demo/teams/{team_id}/epics/{ids[0]}/move", headers=headers, json={"after_epic_id": ids[-1]}
+        )
+        new_epic = {"title": "New Epic", "original_size": "M", "current_size": "M", "source": "Template"}
+
+        created = client.post(f"/api/demo/teams/{team_id}/epics", headers=headers, json=new_epic).json()
+        epics = client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()
+        assert [e["id"] for e in epics][-2:] == [ids[0], created["id"]]
+
+        with TestingSessionLocal() as db:
+            ranking.rebalance(db, team_id)
+            db.commit()
+        created = client.post(f"/api/demo/teams/{team_id}/epics", headers=headers, json=new_epic).json()
+        epics = client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()
+        assert epics[-1]["id"] == created["id"]
+        assert created["priority"] == epics[-2]["priority"] + ranking.RANK_GAP
+
+    def test_demo_forecast_follows_the_data_version(self, client):
+        session = client.post("/api/demo/session").json()
+        headers = {"X-Demo-Session": session["session_token"]}
+        team_id = session["team"]["id"]
+        assert client.get(f"/api/demo/teams/{team_id}/forecast", headers=headers).json()["total_points"] > 0
+
+        # A write committed elsewhere moves the version without bumping this process's cache.
+        with TestingSessionLocal() as db:
+            db.query(models.Epic).filter(models.Epic.team_id == team_id).delete()
+            db.execute(versions.bump(team_id))
+            db.commit()
+        assert client.get(f"/api/demo/teams/{team_id}/forecast", headers=headers).json()["total_points"] == 0
+
     def test_demo_size_mappings(self, client):
         create_response = client.post("/api/demo/session")
         session = create_response.json()
@@ -195,3 +232,61 @@ class TestDemoSessions:
             headers={"X-Demo-Session": token}
         )
         assert get_response.status_code == 404
+
+    def test_move_demo_epic(self, client):
+        session = client.post("/api/demo/session").json()
+        headers = {"X-Demo-Session": session["session_token"]}
+        team_id = session["team"]["id"]
+        ids = [e["id"] for e in client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()]
+
+        response = client.post(
+            f"/api/demo/teams/{team_id}/epics/{ids[-1]}/move",
+            headers=headers,
+            json={"after_epic_id": ids[0], "before_epic_id": ids[1]}
+        )
+        assert response.status_code == 200
+        epics = client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()
+        assert [e["id"] for e in epics] == [ids[0], ids[-1]] + ids[1:-1]
+
+    def test_move_demo_epic_requires_session_team(self, client):
+        session1 = client.post("/api/demo/session").json()
+        session2 = client.post("/api/demo/session").json()
+        team_id = session2["team"]["id"]
+        epic_id = client.get(
+            f"/api/demo/teams/{team_id}/epics", headers={"X-Demo-Session": session2["session_token"]}
+        ).json()[0]["id"]
+
+        path = f"/api/demo/teams/{team_id}/epics/{epic_id}/move"
+        assert client.post(path, json={}).status_code == 401
+        assert client.post(path, headers={"X-Demo-Session": session1["session_token"]}, json={}).status_code == 403
+
+    def test_reorder_demo_epics(self, client):
+        session = client.post("/api/demo/session").json()
+        headers = {"X-Demo-Session": session["session_token"]}
+        team_id = session["team"]["id"]
+        ids = [e["id"] for e in client.get(f"/api/demo/teams/{team_id}/epics", headers=headers).json()]
+
+        response = client.put(
+            f"/api/demo/teams/{team_id}/epics/reorder",
+            headers=headers,
+            json={"epic_ids": list(reversed(ids))}
+        )
+        assert response.status_code == 200
+        assert [e["id"] for e in response.json()] == list(reversed(ids))
+
+    def test_demo_epics_paged_with_fields(self, client):
+        session = client.post("/api/demo/session").json()
+        headers = {"X-Demo-Session": session["session_token"]}
+        team_id = session["team"]["id"]
+
+        first = client.get(f"/api/demo/teams/{team_id}/epics?limit=5&fields=title", headers=headers)
+        assert first.status_code == 200
+        assert len(first.json()) == 5
+        assert set(first.json()[0]) == {"id", "priority", "title"}
+        rest = client.get(
+            f"/api/demo/teams/{team_id}/epics",
+            params={"limit": 5, "fields": "title", "cursor": first.headers["X-Next-Cursor"]},
+            headers=headers
+        )
+        assert len(rest.json()) == 3
+        assert "X-Next-Cursor" not in rest.headers
@@ -0,0 +1,84 @@
+import pytest
+
+from server_python import epic_listing
+
+
+SIZES = ["S", "M", "L"]
+
+
+def setup_team(client, count=10):
+    team_id = client.post("/api/teams", json={
+        "name": "List Team", "avatar": "https://example.com/a.png"
+    }).json()["id"]
+    ids = []
+    for i in range(count):
+        size = SIZES[i % 3]
+        ids.append(client.post(f"/api/teams/{team_id}/epics", json={
+            "title": f"Epic {i}", "description": "x" * 200, "original_size": size, "current_size": size,
+            "status": "completed" if i % 4 == 0 else "backlog",
+            "source": "Jira" if i % 2 else "Template",
+            # Pairs share a priority, so paging has to tie-break on id.
+            "priority": i // 2
+        }).json()["id"])
+    return team_id, ids
+
+
+def all_pages(client, path, **params):
+    pages, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=query)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+class TestCursor:
+    def test_round_trip(self):
+        assert epic_listing.decode_cursor(epic_listing.encode_cursor(-1024, 42)) == (-1024, 42)
+
+    @pytest.mark.parametrize("cursor", ["", "%%%", "bm90LWEtY3Vyc29y"])
+    def test_malformed(self, cursor):
+        with pytest.raises(ValueError):
+            epic_listing.decode_cursor(cursor)
+
+
+class TestEpicListing:
+    def test_unpaged_listing_returns_everything(self, client):
+        team_id, ids = setup_team(client)
+        response = client.get(f"/api/teams/{team_id}/epics")
+        assert [e["id"] for e in response.json()] == ids
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_pages_cover_the_backlog_once_in_order(self, client):
+        team_id, ids = setup_team(client)
+        pages = all_pages(client, f"/api/teams/{team_id}/epics", limit=3)
+        assert [len(page) for page in pages] == [3, 3, 3, 1]
+        assert [e["id"] for page in pages for e in page] == ids
+
+    def test_filters(self, client):
+        team_id, ids = setup_team(client)
+        epics = client.get(f"/api/teams/{team_id}/epics", params={
+            "status": "backlog", "source": "Jira", "size": ["S", "L"]
+        }).json()
+        assert [e["id"] for e in epics] == [ids[i] for i in (3, 5, 9)]
+
+    def test_filters_with_paging(self, client):
+        team_id, ids = setup_team(client)
+        pages = all_pages(client, f"/api/teams/{team_id}/epics", limit=2, source="Template")
+        assert [e["id"] for page in pages for e in page] == ids[::2]
+
+    def test_fields_projection(self, client):
+        team_id, ids = setup_team(client)
+        pages = all_pages(client, f"/api/teams/{team_id}/epics", limit=4, fields="title,current_size")
+        first = pages[0][0]
+        assert first == {"id": ids[0], "priority": 0, "title": "Epic 0", "current_size": "S"}
+        assert [e["id"] for page in pages for e in page] == ids
+
+    def test_invalid_parameters(self, client):
+        team_id, _ = setup_team(client, count=1)
+        assert client.get(f"/api/teams/{team_id}/epics?fields=title,secret").status_code == 400
+        assert client.get(f"/api/teams/{team_id}/epics?cursor=%%%").status_code == 400
+        assert client.get(f"/api/teams/{team_id}/epics?limit=0").status_code == 422
@@ -0,0 +1,171 @@
+from sqlalchemy import event
+
+from server_python import ranking
+from server_python.incremental_forecast import forecast_tracker
+from tests.conftest import async_engine
+
+
+def setup_team(client, count=4):
+    team_id = client.post("/api/teams", json={
+        "name": "Rank Team", "avatar": "https://example.com/a.png"
+    }).json()["id"]
+    ids = [
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": f"Epic {i}", "original_size": "M", "current_size": "M",
+            "source": "Template", "priority": i
+        }).json()["id"]
+        for i in range(count)
+    ]
+    return team_id, ids
+
+
+def listed(client, team_id):
+    epics = client.get(f"/api/teams/{team_id}/epics").json()
+    return [e["id"] for e in sorted(epics, key=lambda e: (e["priority"], e["id"]))]
+
+
+def move(client, team_id, epic_id, **anchors):
+    return client.post(f"/api/teams/{team_id}/epics/{epic_id}/move", json=anchors)
+
+
+class TestRankBetween:
+    def test_midpoint_and_ends(self):
+        assert ranking.rank_between(0, 1024) == 512
+        assert ranking.rank_between(None, 0) == -ranking.RANK_GAP
+        assert ranking.rank_between(2048, None) == 2048 + ranking.RANK_GAP
+        assert ranking.rank_between(None, None) == 0
+
+    def test_adjacent_ranks_have_no_room(self):
+        assert ranking.rank_between(3, 4) is None
+        assert ranking.rank_between(3, 3) is None
+
+    def test_crowded(self):
+        assert not ranking.is_crowded(0, 512, 1024)
+        assert ranking.is_crowded(0, 8, 16)
+        assert not ranking.is_crowded(None, -1024, 0)
+
+
+class TestMoveEpic:
+    def test_move_between_two_epics(self, client):
+        team_id, ids = setup_team(client)
+        response = move(client, team_id, ids[3], after_epic_id=ids[0], before_epic_id=ids[1])
+        assert response.status_code == 200
+        assert listed(client, team_id) == [ids[0], ids[3], ids[1], ids[2]]
+
+    def test_move_with_one_anchor(self, client):
+        team_id, ids = setup_team(client)
+        move(client, team_id, ids[0], after_epic_id=ids[2])
+        assert listed(client, team_id) == [ids[1], ids[2], ids[0], ids[3]]
+        move(client, team_id, ids[3], before_epic_id=ids[1])
+        assert listed(client, team_id) == [ids[3], ids[1], ids[2], ids[0]]
+
+    def test_move_to_top_and_bottom(self, client):
+        team_id, ids = setup_team(client)
+        move(client, team_id, ids[2])
+        assert listed(client, team_id)[0] == ids[2]
+        move(client, team_id, ids[2], after_epic_id=ids[3])
+        assert listed(client, team_id)[-1] == ids[2]
+
+    def test_dense_priorities_are_rebalanced_then_one_row_moves(self, client):
+        """Contiguous priorities leave no room, so the team is respaced first"""
+        team_id, ids = setup_team(client)
+        move(client, team_id, ids[3], after_epic_id=ids[0], before_epic_id=ids[1])
+        priorities = {e["id"]: e["priority"] for e in client.get(f"/api/teams/{team_id}/epics").json()}
+        gap = ranking.RANK_GAP
+        assert priorities == {ids[0]: 0, ids[1]: gap, ids[2]: 2 * gap, ids[3]: gap // 2}
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("UPDATE EPICS"):
+                statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            move(client, team_id, ids[2], before_epic_id=ids[0])
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        assert len(statements) == 1
+        assert listed(client, team_id) == [ids[2], ids[0], ids[3], ids[1]]
+
+    def test_repeated_moves_into_one_slot_stay_ordered(self, client):
+        """Halving the same gap eventually schedules a background rebalance"""
+        team_id, ids = setup_team(client, count=3)
+        for _ in range(30):
+            move(client, team_id, ids[2], after_epic_id=ids[0], before_epic_id=ids[1])
+            move(client, team_id, ids[1], after_epic_id=ids[0], before_epic_id=ids[2])
+            move(client, team_id, ids[1], after_epic_id=ids[2])
+        assert listed(client, team_id) == [ids[0], ids[2], ids[1]]
+        priorities = sorted(e["priority"] for e in client.get(f"/api/teams/{team_id}/epics").json())
+        assert min(b - a for a, b in zip(priorities, priorities[1:])) >= ranking.CROWDED_GAP
+
+    def test_move_keeps_incremental_forecast_in_step(self, client):
+        team_id, ids = setup_team(client, count=6)
+        client.get(f"/api/teams/{team_id}/forecast/changes?windows=3")
+        move(client, team_id, ids[5], after_epic_id=ids[0], before_epic_id=ids[1])
+        move(client, team_id, ids[0], after_epic_id=ids[3])
+        tracked = forecast_tracker._forecasts[(team_id, 3)]
+        assert tracked.epic_ids.tolist() == listed(client, team_id)
+
+    def test_invalid_moves(self, client):
+        team_id, ids = setup_team(client)
+        assert move(client, team_id, ids[1], after_epic_id=9999).status_code == 404
+        assert move(client, team_id, ids[1], before_epic_id=ids[1]).status_code == 400
+        assert move(client, team_id, ids[1], after_epic_id=ids[2], before_epic_id=ids[0]).status_code == 400
+
+    def test_move_epic_of_another_team(self, client):
+        team_id, ids = setup_team(client)
+        other_id, other_ids = setup_team(client)
+        assert move(client, team_id, other_ids[0]).status_code == 404
+        assert move(client, team_id, ids[0], after_epic_id=other_ids[0]).status_code == 404
+
+
+class TestBulkReorder:
+    def test_reorder_is_one_update(self, client):
+        team_id, ids = setup_team(client, count=20)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("UPDATE EPICS"):
+                statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = client.put(f"/api/teams/{team_id}/epics/reorder", json={"epic_ids": list(reversed(ids))})
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        assert len(statements) == 1
+        priorities = {e["id"]: e["priority"] for e in client.get(f"/api/teams/{team_id}/epics").json()}
+        assert priorities == {epic_id: idx * ranking.RANK_GAP for idx, epic_id in enumerate(reversed(ids))}
+
+    def test_moves_after_a_reorder_touch_one_row(self, client):
+        team_id, ids = setup_team(client)
+        client.get(f"/api/teams/{team_id}/forecast/changes?windows=3")
+        order = [ids[2], ids[0], ids[3], ids[1]]
+        client.put(f"/api/teams/{team_id}/epics/reorder", json={"epic_ids": order})
+        priorities = {e["id"]: e["priority"] for e in client.get(f"/api/teams/{team_id}/epics").json()}
+        tracked = forecast_tracker._forecasts[(team_id, 3)]
+        assert tracked.priorities.tolist() == [priorities[epic_id] for epic_id in tracked.epic_ids.tolist()]
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("UPDATE EPICS"):
+                statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            move(client, team_id, ids[1], after_epic_id=ids[2], before_epic_id=ids[0])
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        assert len(statements) == 1
+        assert listed(client, team_id) == [ids[2], ids[1], ids[0], ids[3]]
+
+    def test_reorder_ignores_other_teams_epics(self, client):
+        team_id, ids = setup_team(client, count=2)
+        other_id, other_ids = setup_team(client, count=2)
+        client.put(f"/api/teams/{team_id}/epics/reorder", json={"epic_ids": [other_ids[1], ids[1], ids[0]]})
+        assert listed(client, other_id) == other_ids
+        assert listed(client, team_id) == [ids[1], ids[0]]
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event
+
+from server_python import versions
+from tests.conftest import async_engine
+
+
+EPIC = {"title": "Epic", "original_size": "M", "current_size": "M", "source": "Template"}
+
+
+def setup_team(client):
+    team_id = client.post("/api/teams", json={
+        "name": "ETag Team", "avatar": "https://example.com/a.png"
+    }).json()["id"]
+    epic_id = client.post(f"/api/teams/{team_id}/epics", json=EPIC).json()["id"]
+    return team_id, epic_id
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={"If-None-Match": etag})
+
+
+class TestEtagMatching:
+    @pytest.mark.parametrize("header,expected", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ("*", True),
+        ('"abd"', False),
+    ])
+    def test_if_none_match(self, header, expected):
+        assert versions.etag_matches(header, '"abc"') is expected
+
+
+class TestConditionalGets:
+    @pytest.mark.parametrize("path", ["/api/teams", "/api/teams/{team_id}", "/api/teams/{team_id}/epics",
+                                      "/api/teams/{team_id}/size-mappings"])
+    def test_unchanged_data_is_not_modified(self, client, path):
+        team_id, _ = setup_team(client)
+        path = path.format(team_id=team_id)
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == versions.CACHE_CONTROL
+
+        response = revalidate(client, path, etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    def test_not_modified_does_not_read_epics(self, client):
+        team_id, _ = setup_team(client)
+        etag = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            assert revalidate(client, f"/api/teams/{team_id}/epics", etag).status_code == 304
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        assert statements and not any("epics" in s for s in statements)
+
+    def test_every_write_changes_the_etag(self, client):
+        team_id, epic_id = setup_team(client)
+        path = f"/api/teams/{team_id}/epics"
+        writes = [
+            lambda: client.patch(f"/api/teams/{team_id}", json={"engineer_count": 7}),
+            lambda: client.put(f"/api/teams/{team_id}/size-mappings", json=[
+                {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"}
+            ]),
+            lambda: client.post(path, json=EPIC),
+            lambda: client.patch(f"/api/epics/{epic_id}", json={"title": "Renamed"}),
+            lambda: client.put(f"{path}/reorder", json={"epic_ids": [epic_id]}),
+            lambda: client.post(f"{path}/{epic_id}/move", json={}),
+        ]
+        seen = {client.get(path).headers["ETag"]}
+        for write in writes:
+            etag = client.get(path).headers["ETag"]
+            assert write().status_code == 200
+            assert revalidate(client, path, etag).status_code == 200
+            seen.add(client.get(path).headers["ETag"])
+        assert len(seen) == len(writes) + 1
+
+        etag = client.get(path).headers["ETag"]
+        client.delete(f"/api/epics/{epic_id}")
+        assert revalidate(client, path, etag).status_code == 200
+
+    def test_other_teams_writes_keep_the_etag(self, client):
+        team_id, _ = setup_team(client)
+        other_id, _ = setup_team(client)
+        etag = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+        client.post(f"/api/teams/{other_id}/epics", json=EPIC)
+        assert revalidate(client, f"/api/teams/{team_id}/epics", etag).status_code == 304
+
+    def test_team_list_etag_follows_membership(self, client):
+        team_id, _ = setup_team(client)
+        etag = client.get("/api/teams").headers["ETag"]
+        other_id, _ = setup_team(client)
+        assert revalidate(client, "/api/teams", etag).status_code == 200
+        etag = client.get("/api/teams").headers["ETag"]
+        client.delete(f"/api/teams/{other_id}")
+        assert revalidate(client, "/api/teams", etag).status_code == 200
+
+    def test_query_parameters_are_separate_representations(self, client):
+        team_id, _ = setup_team(client)
+        full = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+        projected = client.get(f"/api/teams/{team_id}/epics?fields=title")
+        assert projected.headers["ETag"] != full
+        assert revalidate(client, f"/api/teams/{team_id}/epics?fields=title", full).status_code == 200
+        assert revalidate(
+            client, f"/api/teams/{team_id}/epics?fields=title", projected.headers["ETag"]
+        ).status_code == 304
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+
+import pytest
+
+from server_python import export
+
+
+MAPPINGS = [
+    {"size": "S", "points": 5, "confidence": 80, "anchor_description": "Small"},
+    {"size": "M", "points": 13, "confidence": 80, "anchor_description": "Medium"},
+    {"size": "L", "points": 40, "confidence": 80, "anchor_description": "Large"},
+]
+SIZES = ["S", "M", "L"]
+
+
+def setup_team(client, name="Export Team", count=12):
+    team_id = client.post("/api/teams", json={
+        "name": name, "avatar": "https://example.com/a.png",
+        "engineer_count": 1, "avg_points_per_engineer": 10, "sprints_in_increment": 3
+    }).json()["id"]
+    client.put(f"/api/teams/{team_id}/size-mappings", json=MAPPINGS)
+    for i in range(count):
+        size = SIZES[i % 3]
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": f"{name} {i}", "description": "Line one\nline, two", "original_size": size,
+            "current_size": size, "source": "Template", "priority": count - i
+        })
+    return team_id
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestEpicExport:
+    def test_csv(self, client):
+        team_id = setup_team(client)
+        response = client.get(f"/api/teams/{team_id}/epics/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert f'team-{team_id}-epics.csv' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        listed = client.get(f"/api/teams/{team_id}/epics").json()
+        assert [int(row["id"]) for row in rows] == [e["id"] for e in listed]
+        assert list(rows[0]) == list(export.EPIC_COLUMNS)
+        assert rows[0]["description"] == "Line one\nline, two"
+
+    def test_ndjson_matches_the_listing(self, client):
+        team_id = setup_team(client)
+        rows = ndjson(client.get(f"/api/teams/{team_id}/epics/export?format=ndjson"))
+        listed = client.get(f"/api/teams/{team_id}/epics").json()
+        for row, epic in zip(rows, listed):
+            assert {k: row[k] for k in ("id", "title", "current_size", "priority")} == {
+                k: epic[k] for k in ("id", "title", "current_size", "priority")
+            }
+        assert len(rows) == len(listed)
+
+    def test_forecast_columns_match_the_forecast(self, client):
+        team_id = setup_team(client)
+        rows = ndjson(client.get(f"/api/teams/{team_id}/epics/export?format=ndjson&include_forecast=true&windows=4"))
+        forecast = client.get(f"/api/teams/{team_id}/forecast?windows=4").json()
+        allocated = {e["epic_id"]: e for w in forecast["windows"] for e in w["epics"]}
+        for row in rows:
+            epic = allocated[row["id"]]
+            assert (row["points"], row["window_index"], row["starts_at"], row["ends_at"]) == (
+                epic["points"], epic["window_index"], epic["starts_at"], epic["ends_at"]
+            )
+            assert row["beyond_capacity"] is (row["ends_at"] > forecast["total_capacity"])
+        assert any(row["beyond_capacity"] for row in rows)
+
+    def test_parquet(self, client):
+        pq = pytest.importorskip("pyarrow.parquet")
+        team_id = setup_team(client)
+        response = client.get(f"/api/teams/{team_id}/epics/export?format=parquet&include_forecast=true")
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.column_names == export.columns(True)
+        assert table.num_rows == 12
+        assert table.column("points").to_pylist()[:3] == [40, 13, 5]
+
+    def test_invalid_requests(self, client):
+        team_id = setup_team(client, count=1)
+        assert client.get(f"/api/teams/{team_id}/epics/export?format=xml").status_code == 400
+        assert client.get("/api/teams/999/epics/export").status_code == 404
+
+
+class TestPortfolioExport:
+    def test_all_teams_in_team_order(self, client):
+        first = setup_team(client, "First", count=3)
+        second = setup_team(client, "Second", count=2)
+        rows = ndjson(client.get("/api/portfolio/epics/export?format=ndjson"))
+        assert [row["team_id"] for row in rows] == [first] * 3 + [second] * 2
+
+    def test_team_filter(self, client):
+        setup_team(client, "First", count=3)
+        second = setup_team(client, "Second", count=2)
+        response = client.get(f"/api/portfolio/epics/export?team_ids={second}")
+        assert {row["team_id"] for row in csv.DictReader(io.StringIO(response.text))} == {str(second)}
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 100])
+    def test_forecast_is_allocated_per_team_across_chunks(self, client, db_session, chunk_size):
+        setup_team(client, "First", count=7)
+        setup_team(client, "Second", count=5)
+        rows = [row for chunk in export.export_chunks(db_session, include_forecast=True, chunk_size=chunk_size)
+                for row in chunk]
+        expected = [row for chunk in export.export_chunks(db_session, include_forecast=True) for row in chunk]
+        assert rows == expected
+        second = [row for row in rows if row["team_id"] == rows[-1]["team_id"]]
+        assert second[0]["starts_at"] == 0
@@ -0,0 +1,157 @@
+import io
+
+import openpyxl
+import pytest
+
+from server_python import file_import
+from server_python.size_lookup import SizeLookup
+
+
+MAPPINGS = [
+    {"size": "S", "points": 5, "confidence": 80, "anchor_description": "Small"},
+    {"size": "M", "points": 13, "confidence": 80, "anchor_description": "Medium"},
+    {"size": "L", "points": 40, "confidence": 80, "anchor_description": "Large"},
+]
+
+
+def setup_team(client, mappings=True):
+    team_id = client.post("/api/teams", json={
+        "name": "Import Team", "avatar": "https://example.com/a.png"
+    }).json()["id"]
+    if mappings:
+        client.put(f"/api/teams/{team_id}/size-mappings", json=MAPPINGS)
+    return team_id
+
+
+def upload(client, team_id, content, filename="epics.csv"):
+    if isinstance(content, str):
+        content = content.encode()
+    return client.post(f"/api/teams/{team_id}/epics/import", files={"file": (filename, content)})
+
+
+def epics(client, team_id):
+    return client.get(f"/api/teams/{team_id}/epics").json()
+
+
+class TestParseSize:
+    @pytest.mark.parametrize("value,expected", [
+        ("M", "M"), (" xl ", "XL"), ("2-xs", "2-XS"), ("XXL", "2-XL"), ("3XL", "3-XL"), ("", "M"),
+        ("12", "M"), ("6", "S"), ("100", "L"),
+    ])
+    def test_sizes_and_points(self, value, expected):
+        lookup = SizeLookup([("S", 5), ("M", 13), ("L", 40)])
+        assert file_import.parse_size(value, lookup) == expected
+
+    def test_unknown_size(self):
+        with pytest.raises(ValueError, match="Unknown size"):
+            file_import.parse_size("huge", SizeLookup([]))
+
+    @pytest.mark.parametrize("value", ["inf", "-Infinity", "1e999", "nan"])
+    def test_non_finite_points(self, value):
+        lookup = SizeLookup([("S", 5), ("M", 13)])
+        with pytest.raises(ValueError, match="finite"):
+            file_import.parse_size(value, lookup)
+
+    def test_points_need_mappings(self):
+        with pytest.raises(ValueError, match="no size mappings"):
+            file_import.parse_size("8", SizeLookup([]))
+
+
+class TestFileImport:
+    def test_csv_import(self, client):
+        team_id = setup_team(client)
+        response = upload(client, team_id, (
+            "Summary,Description,Size\n"
+            "Login,\"Auth, SSO\",L\n"
+            "Search,,xxl\n"
+            "Billing,Invoices,\n"
+        ))
+        assert response.status_code == 200
+        assert response.json() == {"imported_count": 3, "error_count": 0, "errors": []}
+        created = epics(client, team_id)
+        assert [(e["title"], e["description"], e["current_size"]) for e in created] == [
+            ("Login", "Auth, SSO", "L"), ("Search", "", "2-XL"), ("Billing", "Invoices", "M")
+        ]
+        assert all(e["source"] == "Template" and e["status"] == "backlog" for e in created)
+
+    def test_story_points_column_uses_size_mappings(self, client):
+        team_id = setup_team(client)
+        upload(client, team_id, "title,story points\nA,4\nB,14\nC,60\n")
+        assert [e["current_size"] for e in epics(client, team_id)] == ["S", "M", "L"]
+
+    def test_row_errors_are_reported_and_skipped(self, client):
+        team_id = setup_team(client, mappings=False)
+        response = upload(client, team_id, "title,size\nGood,S\n,M\nBad,HUGE\n\nPoints,8\nAlso good,XS\n")
+        body = response.json()
+        assert body["imported_count"] == 2
+        assert body["error_count"] == 3
+        assert [e["row"] for e in body["errors"]] == [3, 4, 6]
+        assert body["errors"][0]["error"] == "Missing title"
+        assert [e["title"] for e in epics(client, team_id)] == ["Good", "Also good"]
+
+    def test_row_errors_report_file_lines(self, client):
+        team_id = setup_team(client)
+        response = upload(client, team_id, 'title,description,size\nGood,"Spans\ntwo lines",S\n,M\nBad,,HUGE\n')
+        assert [e["row"] for e in response.json()["errors"]] == [4, 5]
+
+    def test_non_finite_points_are_row_errors(self, client):
+        team_id = setup_team(client)
+        response = upload(client, team_id, "title,story points\nGood,8\nHuge,1e999\nAlso good,2\n")
+        body = response.json()
+        assert (body["imported_count"], body["error_count"]) == (2, 1)
+        assert body["errors"][0]["row"] == 3
+        assert "finite" in body["errors"][0]["error"]
+
+    def test_appends_after_existing_epics_in_batches(self, client, monkeypatch):
+        monkeypatch.setattr(file_import, "IMPORT_BATCH_SIZE", 4)
+        team_id = setup_team(client)
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "Existing", "original_size": "M", "current_size": "M", "source": "Template", "priority": 5
+        })
+        rows = "".join(f"Epic {i},S\n" for i in range(10))
+        assert upload(client, team_id, "title,size\n" + rows).json()["imported_count"] == 10
+        titles = [e["title"] for e in epics(client, team_id)]
+        assert titles == ["Existing"] + [f"Epic {i}" for i in range(10)]
+
+    def test_xlsx_import(self, client):
+        team_id = setup_team(client)
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["Name", "Points", "Description"])
+        sheet.append(["Roadmap", 13, "Quarterly plan"])
+        sheet.append(["Onboarding", 5.0, None])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        response = upload(client, team_id, buffer.getvalue(), filename="portfolio.xlsx")
+        assert response.json()["imported_count"] == 2
+        assert [(e["title"], e["description"], e["current_size"]) for e in epics(client, team_id)] == [
+            ("Roadmap", "Quarterly plan", "M"), ("Onboarding", "", "S")
+        ]
+
+    def test_import_changes_the_etag(self, client):
+        team_id = setup_team(client)
+        etag = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+        upload(client, team_id, "title\nNew\n")
+        response = client.get(f"/api/teams/{team_id}/epics", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("content,filename", [
+        ("size\nM\n", "epics.csv"),
+        ("title\nA\n", "epics.pdf"),
+        (b"not a zip", "epics.xlsx"),
+        (b"\xff\xfe\n", "epics.csv"),
+    ])
+    def test_rejected_files(self, client, content, filename):
+        team_id = setup_team(client)
+        assert upload(client, team_id, content, filename=filename).status_code == 400
+
+    def test_undecodable_row_stops_the_import(self, client):
+        team_id = setup_team(client)
+        body = upload(client, team_id, b"title\nKept\n\xff\xfe\n").json()
+        assert body["imported_count"] == 1
+        assert body["error_count"] == 1
+        assert body["errors"][0]["error"].startswith("Unreadable row")
+
+    def test_unknown_team(self, client):
+        assert upload(client, 999, "title\nA\n").status_code == 404
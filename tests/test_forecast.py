@@ -0,0 +1,269 @@
+import json
+import numpy as np
+
+from server_python import forecast
+from server_python.forecast import allocate_windows, sweep_capacities
+
+
+def reference_allocation(points, capacity, window_count):
+    """Straight port of the ForecastPlanner per-epic loop."""
+    used = [0] * window_count
+    rows = []
+    cumulative = 0
+    for p in points:
+        starts_at, ends_at = cumulative, cumulative + p
+        window_index = min(starts_at // capacity, window_count - 1)
+        window_end = (window_index + 1) * capacity
+        straddles = starts_at < window_end and ends_at > window_end and window_index < window_count - 1
+        in_window = window_end - starts_at if straddles else p
+        rollover = ends_at - window_end if straddles else 0
+        used[window_index] += in_window
+        if straddles:
+            used[window_index + 1] += rollover
+        rows.append((window_index, in_window, rollover, straddles))
+        cumulative = ends_at
+    return rows, used
+
+
+def create_team(client, **overrides):
+    team_data = {
+        "name": "Forecast Team",
+        "avatar": "https://example.com/avatar.png",
+        "engineer_count": 1,
+        "avg_points_per_engineer": 5,
+        "sprints_in_increment": 2,
+        **overrides
+    }
+    return client.post("/api/teams", json=team_data).json()["id"]
+
+
+def add_epics(client, team_id, sizes):
+    ids = []
+    for priority, size in enumerate(sizes):
+        response = client.post(f"/api/teams/{team_id}/epics", json={
+            "title": f"Epic {priority}", "original_size": size, "current_size": size,
+            "source": "Template", "priority": priority
+        })
+        ids.append(response.json()["id"])
+    return ids
+
+
+class TestAllocateWindows:
+    def test_matches_reference_loop(self):
+        rng = np.random.default_rng(7)
+        points = rng.choice([1, 2, 5, 8, 13, 21, 34, 55], size=500)
+        allocation = allocate_windows(points, 80, 6)
+        rows, used = reference_allocation(points.tolist(), 80, 6)
+
+        assert allocation.window_index.tolist() == [r[0] for r in rows]
+        assert allocation.points_in_window.tolist() == [r[1] for r in rows]
+        assert allocation.rollover_points.tolist() == [r[2] for r in rows]
+        assert allocation.straddles_line.tolist() == [r[3] for r in rows]
+        assert allocation.used_points.tolist() == used
+
+    def test_straddling_epic_rolls_over(self):
+        allocation = allocate_windows(np.array([6, 6, 3]), 10, 3)
+        assert allocation.window_index.tolist() == [0, 0, 1]
+        assert allocation.straddles_line.tolist() == [False, True, False]
+        assert allocation.points_in_window.tolist() == [6, 4, 3]
+        assert allocation.rollover_points.tolist() == [0, 2, 0]
+        assert allocation.used_points.tolist() == [10, 5, 0]
+
+    def test_overflow_piles_into_last_window(self):
+        allocation = allocate_windows(np.array([8, 8, 8]), 5, 2)
+        assert allocation.window_index.tolist() == [0, 1, 1]
+        assert allocation.straddles_line.tolist() == [True, False, False]
+        assert allocation.cut_line_index == 0
+
+    def test_cut_line_includes_epic_ending_on_capacity(self):
+        allocation = allocate_windows(np.array([5, 5, 1]), 5, 2)
+        assert allocation.cut_line_index == 1
+
+    def test_offset_allocates_in_chunks(self):
+        rng = np.random.default_rng(9)
+        points = rng.choice([1, 3, 5, 8, 13], size=200)
+        whole = allocate_windows(points, 50, 5)
+        first = allocate_windows(points[:70], 50, 5)
+        second = allocate_windows(points[70:], 50, 5, offset=int(first.ends_at[-1]))
+
+        assert np.concatenate([first.window_index, second.window_index]).tolist() == whole.window_index.tolist()
+        assert np.concatenate([first.rollover_points, second.rollover_points]).tolist() == whole.rollover_points.tolist()
+        assert (first.used_points + second.used_points).tolist() == whole.used_points.tolist()
+
+    def test_empty_backlog(self):
+        allocation = allocate_windows(np.array([], dtype=np.int64), 10, 3)
+        assert allocation.used_points.tolist() == [0, 0, 0]
+        assert allocation.cut_line_index == -1
+
+    def test_zero_capacity(self):
+        allocation = allocate_windows(np.array([3, 5]), 0, 2)
+        assert allocation.window_index.tolist() == [1, 1]
+        assert allocation.cut_line_index == -1
+
+
+class TestSweepCapacities:
+    def test_matches_single_allocation(self):
+        points = np.array([8, 5, 3, 8, 13, 2])
+        ends_at = np.cumsum(points)
+        capacities = np.array([4, 10, 15, 40])
+        windows_needed, cut_line_index = sweep_capacities(ends_at, capacities, 2)
+
+        assert windows_needed.tolist() == [10, 4, 3, 1]
+        for capacity, cut in zip(capacities, cut_line_index):
+            assert cut == allocate_windows(points, int(capacity), 2).cut_line_index
+
+    def test_zero_capacity(self):
+        windows_needed, cut_line_index = sweep_capacities(np.cumsum([5, 5]), np.array([0]), 3)
+        assert windows_needed.tolist() == [-1]
+        assert cut_line_index.tolist() == [-1]
+
+
+class TestForecastAPI:
+    def test_forecast_team_not_found(self, client):
+        response = client.get("/api/teams/9999/forecast")
+        assert response.status_code == 404
+
+    def test_forecast_allocates_by_priority(self, client):
+        team_id = create_team(client)
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+            {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+        ])
+        ids = add_epics(client, team_id, ["L", "M", "S", "L", "XL"])
+
+        response = client.get(f"/api/teams/{team_id}/forecast?windows=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["capacity"] == 10
+        assert data["total_points"] == 24
+        assert data["total_capacity"] == 20
+        assert data["beyond_capacity"] is True
+        assert data["cut_line_index"] == 2
+        assert data["cut_line_epic_id"] == ids[2]
+        assert [w["used_points"] for w in data["windows"]] == [10, 14]
+
+        first, second = data["windows"]
+        assert [a["epic_id"] for a in first["epics"]] == ids[:2]
+        assert first["epics"][1]["straddles_line"] is True
+        assert first["epics"][1]["rollover_points"] == 3
+        assert [a["epic_id"] for a in second["epics"]] == ids[2:]
+        assert second["epics"][-1]["points"] == 0
+
+    def test_forecast_scenario_override(self, client):
+        team_id = create_team(client)
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"}
+        ])
+        add_epics(client, team_id, ["M", "M", "M"])
+
+        response = client.get(f"/api/teams/{team_id}/forecast?windows=1&engineer_count=2")
+        data = response.json()
+        assert data["capacity"] == 20
+        assert data["beyond_capacity"] is False
+        assert data["cut_line_index"] == 2
+
+    def test_forecast_rejects_zero_windows(self, client):
+        team_id = create_team(client)
+        response = client.get(f"/api/teams/{team_id}/forecast?windows=0")
+        assert response.status_code == 422
+
+    def test_demo_forecast(self, client):
+        session = client.post("/api/demo/session").json()
+        team_id = session["team"]["id"]
+        headers = {"X-Demo-Session": session["session_token"]}
+
+        response = client.get(f"/api/demo/teams/{team_id}/forecast?windows=2", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["capacity"] == 240
+        assert data["total_points"] == 13 + 8 + 5 + 13 + 21 + 8 + 5 + 13
+
+    def test_demo_forecast_requires_session(self, client):
+        response = client.get("/api/demo/teams/1/forecast")
+        assert response.status_code == 401
+
+    def test_sweep_forecast(self, client):
+        team_id = create_team(client)
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"}
+        ])
+        ids = add_epics(client, team_id, ["M", "M", "M", "M"])
+
+        response = client.post(f"/api/teams/{team_id}/forecast/sweep", json={
+            "engineer_count": {"start": 1, "stop": 2},
+            "sprints_in_increment": {"start": 1, "stop": 3, "step": 2},
+            "window_count": 1
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_points"] == 20
+        scenarios = {(s["engineer_count"], s["sprints_in_increment"]): s for s in data["scenarios"]}
+        assert len(scenarios) == 4
+        assert all(s["avg_points_per_engineer"] == 5 for s in data["scenarios"])
+        assert scenarios[(1, 1)]["windows_needed"] == 4
+        assert scenarios[(1, 1)]["cut_line_epic_id"] == ids[0]
+        assert scenarios[(2, 3)]["capacity"] == 30
+        assert scenarios[(2, 3)]["windows_needed"] == 1
+        assert scenarios[(2, 3)]["cut_line_index"] == 3
+
+    def test_sweep_rejects_oversized_grid(self, client):
+        team_id = create_team(client)
+        response = client.post(f"/api/teams/{team_id}/forecast/sweep", json={
+            "engineer_count": {"start": 0, "stop": 100},
+            "avg_points_per_engineer": {"start": 0, "stop": 100},
+            "sprints_in_increment": {"start": 0, "stop": 10}
+        })
+        assert response.status_code == 400
+
+
+class TestForecastStream:
+    def read_stream(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_stream_matches_forecast(self, client, monkeypatch):
+        monkeypatch.setattr(forecast, "STREAM_CHUNK_SIZE", 3)
+        team_id = create_team(client)
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+            {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+        ])
+        add_epics(client, team_id, ["L", "M", "S", "L", "XL", "M", "S", "L"])
+
+        expected = client.get(f"/api/teams/{team_id}/forecast?windows=4").json()
+        lines = self.read_stream(client, f"/api/teams/{team_id}/forecast/stream?windows=4")
+
+        header, summary = lines[0], lines[-1]
+        assert header == {
+            "type": "forecast", "team_id": team_id, "capacity": 10, "window_count": 4, "total_capacity": 40
+        }
+        assert summary["type"] == "summary"
+        assert summary["total_points"] == expected["total_points"]
+        assert summary["cut_line_index"] == expected["cut_line_index"]
+        assert summary["cut_line_epic_id"] == expected["cut_line_epic_id"]
+        assert summary["used_points"] == [w["used_points"] for w in expected["windows"]]
+
+        streamed = {}
+        current = None
+        for line in lines[1:-1]:
+            if line["type"] == "window":
+                current = streamed.setdefault(line["index"], [])
+            else:
+                assert line.pop("type") == "epic"
+                current.append(line)
+        assert streamed == {w["index"]: w["epics"] for w in expected["windows"]}
+
+    def test_stream_empty_backlog(self, client):
+        team_id = create_team(client)
+        lines = self.read_stream(client, f"/api/teams/{team_id}/forecast/stream?windows=2")
+        assert [line["type"] for line in lines] == ["forecast", "window", "window", "summary"]
+        assert lines[-1]["cut_line_index"] == -1
+        assert lines[-1]["used_points"] == [0, 0]
+
+    def test_stream_team_not_found(self, client):
+        response = client.get("/api/teams/9999/forecast/stream")
+        assert response.status_code == 404
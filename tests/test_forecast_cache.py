@@ -0,0 +1,84 @@
+from server_python.forecast_cache import ForecastCache, forecast_cache
+from tests.test_forecast import add_epics, create_team
+
+
+class TestForecastCache:
+    def test_hit_until_bumped(self):
+        cache = ForecastCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute(1, ("w", 3), compute, size=lambda v: 1) == 1
+        assert cache.get_or_compute(1, ("w", 3), compute, size=lambda v: 1) == 1
+        assert cache.get_or_compute(2, ("w", 3), compute, size=lambda v: 1) == 2
+        cache.bump(1)
+        assert cache.get_or_compute(1, ("w", 3), compute, size=lambda v: 1) == 3
+        assert cache.get_or_compute(2, ("w", 3), compute, size=lambda v: 1) == 2
+        assert (cache.hits, cache.misses) == (2, 3)
+
+    def test_evicts_least_recently_used_past_memory_cap(self):
+        cache = ForecastCache(max_bytes=25)
+        for params in ("a", "b"):
+            cache.get_or_compute(1, params, lambda: params, size=lambda v: 10)
+        cache.get_or_compute(1, "a", lambda: "stale", size=lambda v: 10)
+        cache.get_or_compute(1, "c", lambda: "c", size=lambda v: 10)
+
+        assert cache.size_bytes == 20
+        assert cache.get_or_compute(1, "a", lambda: "new", size=lambda v: 10) == "a"
+        assert cache.get_or_compute(1, "b", lambda: "new", size=lambda v: 10) == "new"
+
+    def test_result_computed_across_a_write_is_not_stored(self):
+        cache = ForecastCache()
+
+        def compute():
+            cache.bump(1)
+            return "stale"
+
+        cache.get_or_compute(1, "a", compute, size=lambda v: 1)
+        assert cache.get_or_compute(1, "a", lambda: "fresh", size=lambda v: 1) == "fresh"
+
+    def test_clear_drops_everything(self):
+        cache = ForecastCache()
+        cache.get_or_compute(1, "a", lambda: "old", size=lambda v: 1)
+        cache.clear()
+        assert cache.size_bytes == 0
+        assert cache.get_or_compute(1, "a", lambda: "new", size=lambda v: 1) == "new"
+
+
+class TestForecastCacheAPI:
+    def test_dashboard_reads_hit_cache_between_edits(self, client):
+        team_id = create_team(client)
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"}
+        ])
+        ids = add_epics(client, team_id, ["M", "M", "M"])
+
+        first = client.get(f"/api/teams/{team_id}/forecast").json()
+        hits = forecast_cache.hits
+        for _ in range(5):
+            assert client.get(f"/api/teams/{team_id}/forecast").json() == first
+        assert forecast_cache.hits == hits + 5
+
+        client.patch(f"/api/epics/{ids[0]}", json={"current_size": "L"})
+        assert client.get(f"/api/teams/{team_id}/forecast").json()["total_points"] == 10
+
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 8, "confidence": 80, "anchor_description": "Medium"}
+        ])
+        assert client.get(f"/api/teams/{team_id}/forecast").json()["total_points"] == 16
+
+        client.patch(f"/api/teams/{team_id}", json={"engineer_count": 3})
+        assert client.get(f"/api/teams/{team_id}/forecast").json()["capacity"] == 30
+
+        client.delete(f"/api/epics/{ids[1]}")
+        assert client.get(f"/api/teams/{team_id}/forecast").json()["total_points"] == 8
+
+    def test_scenario_params_are_part_of_key(self, client):
+        team_id = create_team(client)
+        base = client.get(f"/api/teams/{team_id}/forecast").json()
+        scenario = client.get(f"/api/teams/{team_id}/forecast?engineer_count=4").json()
+        assert base["capacity"] == 10
+        assert scenario["capacity"] == 40
@@ -0,0 +1,122 @@
+import asyncio
+from unittest.mock import PropertyMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from server_python import http_clients
+from server_python.http_clients import SharedClient, client_options, upstream_metrics
+from server_python.main import app
+from server_python.trello_service import TrelloService, trello_service
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    upstream_metrics.clear()
+    yield
+    upstream_metrics.clear()
+
+
+class TestClientOptions:
+    def test_settings_from_env(self):
+        options = client_options({
+            "UPSTREAM_MAX_CONNECTIONS": "50", "UPSTREAM_MAX_KEEPALIVE": "25", "UPSTREAM_KEEPALIVE_EXPIRY": "60",
+            "UPSTREAM_TIMEOUT": "12", "UPSTREAM_CONNECT_TIMEOUT": "2", "UPSTREAM_HTTP2": "false"
+        })
+        assert options["http2"] is False
+        assert options["limits"] == httpx.Limits(
+            max_connections=50, max_keepalive_connections=25, keepalive_expiry=60
+        )
+        assert options["timeout"] == httpx.Timeout(12, connect=2)
+
+    def test_http2_needs_h2(self, monkeypatch):
+        monkeypatch.setattr(http_clients, "_http2_available", lambda: False)
+        assert client_options({})["http2"] is False
+        monkeypatch.setattr(http_clients, "_http2_available", lambda: True)
+        assert client_options({})["http2"] is True
+
+
+class TestSharedClient:
+    @pytest.mark.asyncio
+    async def test_reuses_one_client_and_records_latency(self):
+        shared = SharedClient("svc", transport=httpx.MockTransport(
+            lambda request: httpx.Response(404 if request.url.path == "/missing" else 200)
+        ))
+        first = shared.client
+        await shared.get("thing", "https://upstream.test/thing")
+        await shared.get("thing", "https://upstream.test/thing")
+        await shared.get("missing", "https://upstream.test/missing")
+        assert shared.client is first
+
+        stats = {s["endpoint"]: s for s in upstream_metrics.snapshot()}
+        assert stats["svc thing"]["calls"] == 2
+        assert stats["svc thing"]["errors"] == 0
+        assert stats["svc missing"]["errors"] == 1
+        assert sum(b["count"] for b in stats["svc thing"]["latency_histogram"]) == 2
+
+        await shared.aclose()
+        assert first.is_closed
+        assert shared.client is not first
+        await shared.aclose()
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_are_counted(self):
+        def fail(request):
+            raise httpx.ConnectError("unreachable", request=request)
+
+        shared = SharedClient("svc", transport=httpx.MockTransport(fail))
+        with pytest.raises(httpx.ConnectError):
+            await shared.get("thing", "https://upstream.test/thing")
+        assert upstream_metrics.snapshot()[0]["errors"] == 1
+        await shared.aclose()
+
+    def test_a_new_event_loop_closes_the_old_client(self):
+        shared = SharedClient("svc", transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+        async def current_client():
+            client = shared.client
+            await asyncio.sleep(0)  # lets the replaced client finish closing
+            return client
+
+        first = asyncio.run(current_client())
+        second = asyncio.run(current_client())
+        assert second is not first
+        assert first.is_closed
+        asyncio.run(shared.aclose())
+        assert second.is_closed
+
+    def test_one_shared_client_per_service(self):
+        assert http_clients.shared_client("trello") is trello_service.http
+        assert TrelloService().http is trello_service.http
+
+
+class TestUpstreamEndpoints:
+    def test_lifespan_closes_shared_clients(self, client):
+        # Two teams, since board lists are cached per team.
+        team_ids = [
+            client.post("/api/teams", json={"name": "T", "avatar": "https://example.com/a.png"}).json()["id"]
+            for _ in range(2)
+        ]
+        with patch.object(TrelloService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(trello_service.http, "transport", httpx.MockTransport(
+                    lambda request: httpx.Response(200, json=[{"id": "b1", "name": "Board"}])
+                )):
+            with TestClient(app) as app_client:
+                assert app_client.get(f"/api/teams/{team_ids[0]}/trello/boards").json() == [{"id": "b1", "name": "Board"}]
+                assert app_client.get(f"/api/teams/{team_ids[1]}/trello/boards").status_code == 200
+                opened = trello_service.http._client
+                metrics = app_client.get("/api/internal/upstream-metrics").json()
+                assert [(m["endpoint"], m["calls"]) for m in metrics] == [("trello boards", 2)]
+            assert opened.is_closed
+
+    def test_unreachable_upstream_is_503(self, client):
+        def fail(request):
+            raise httpx.ConnectError("unreachable", request=request)
+
+        with patch.object(TrelloService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(trello_service.http, "transport", httpx.MockTransport(fail)):
+            team_id = client.post("/api/teams", json={"name": "T", "avatar": "https://example.com/a.png"}).json()["id"]
+            response = client.get(f"/api/teams/{team_id}/trello/boards")
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Upstream service unavailable"}
@@ -0,0 +1,163 @@
+import numpy as np
+
+from server_python import models
+from server_python import versions
+from server_python.forecast import allocate_windows
+from server_python.incremental_forecast import IncrementalForecast, forecast_tracker
+
+
+SIZE_POINTS = {"S": 3, "M": 5, "L": 8, "XL": 13}
+
+
+def make_state(sizes, capacity=10, window_count=3):
+    n = len(sizes)
+    return IncrementalForecast(window_count, capacity, dict(SIZE_POINTS), np.arange(1, n + 1), np.arange(n), sizes)
+
+
+def assert_matches_full_allocation(state):
+    points = np.array([state.size_points.get(s, 0) for s in state.sizes])
+    expected = allocate_windows(points, state.capacity, state.window_count)
+    assert state.points.tolist() == points.tolist()
+    assert state.ends_at.tolist() == expected.ends_at.tolist()
+    assert state.window_index.tolist() == expected.window_index.tolist()
+    assert state.straddles_line.tolist() == expected.straddles_line.tolist()
+    assert state.points_in_window.tolist() == expected.points_in_window.tolist()
+    assert state.used_points() == expected.used_points.tolist()
+    assert state.cut_line_index() == expected.cut_line_index
+
+
+class TestIncrementalForecast:
+    def test_resize_reports_only_shifted_epics(self):
+        state = make_state(["M", "M", "M", "M", "M", "M"])
+        version = state.version
+        state.resize(1, "L")
+
+        full, changed, removed = state.changes_since(version)
+        assert not full
+        assert [a.epic_id for a in changed] == [2, 4]
+        assert removed == []
+        assert_matches_full_allocation(state)
+
+    def test_insert_and_remove(self):
+        state = make_state(["S", "M", "L", "M"])
+        state.insert(10, "XL", 1)
+        assert state.epic_ids.tolist() == [1, 2, 10, 3, 4]
+        assert_matches_full_allocation(state)
+
+        version = state.version
+        state.remove(0)
+        full, changed, removed = state.changes_since(version)
+        assert removed == [1]
+        assert 1 not in [a.epic_id for a in changed]
+        assert_matches_full_allocation(state)
+
+    def test_move_recomputes_span_between_positions(self):
+        state = make_state(["M", "L", "S", "M", "XL", "S", "M"])
+        state.move(5, 1)
+        assert state.epic_ids.tolist() == [1, 2, 6, 3, 4, 5, 7]
+        assert state.priorities.tolist() == [0, 1, 1, 2, 3, 4, 6]
+        assert_matches_full_allocation(state)
+
+    def test_reorder_and_reallocate(self):
+        rng = np.random.default_rng(11)
+        sizes = list(rng.choice(list(SIZE_POINTS), size=50))
+        state = make_state(sizes, capacity=40, window_count=4)
+
+        order = rng.permutation(50)
+        state.reorder(order, np.arange(50))
+        assert_matches_full_allocation(state)
+
+        state.reallocate(capacity=25)
+        assert_matches_full_allocation(state)
+        state.reallocate(size_points={"S": 1, "M": 2, "L": 3})
+        assert_matches_full_allocation(state)
+
+    def test_changes_expire_to_full(self):
+        state = make_state(["M", "M"])
+        version = state.version
+        for _ in range(150):
+            state.resize(0, "L")
+            state.resize(0, "M")
+        full, changed, _ = state.changes_since(version)
+        assert full
+        assert len(changed) == 2
+
+    def test_no_changes_since_current_version(self):
+        state = make_state(["M", "M"])
+        full, changed, removed = state.changes_since(state.version)
+        assert (full, changed, removed) == (False, [], [])
+
+
+def setup_team(client):
+    team_id = client.post("/api/teams", json={
+        "name": "Incremental", "avatar": "https://example.com/avatar.png",
+        "engineer_count": 1, "avg_points_per_engineer": 5, "sprints_in_increment": 2
+    }).json()["id"]
+    client.put(f"/api/teams/{team_id}/size-mappings", json=[
+        {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+        {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+    ])
+    ids = [
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": f"Epic {i}", "original_size": "M", "current_size": "M",
+            "source": "Template", "priority": i
+        }).json()["id"]
+        for i in range(5)
+    ]
+    return team_id, ids
+
+
+class TestForecastChangesAPI:
+    def test_changes_follow_edits(self, client):
+        team_id, ids = setup_team(client)
+
+        initial = client.get(f"/api/teams/{team_id}/forecast/changes").json()
+        assert initial["full"] is True
+        assert len(initial["changed"]) == 5
+
+        client.patch(f"/api/epics/{ids[2]}", json={"current_size": "L"})
+        delta = client.get(f"/api/teams/{team_id}/forecast/changes?since={initial['version']}").json()
+        assert delta["full"] is False
+        assert [a["epic_id"] for a in delta["changed"]] == [ids[2], ids[3]]
+
+        client.put(f"/api/teams/{team_id}/epics/reorder", json={"epic_ids": list(reversed(ids))})
+        client.delete(f"/api/epics/{ids[0]}")
+        latest = client.get(f"/api/teams/{team_id}/forecast/changes?since={delta['version']}").json()
+        assert latest["removed"] == [ids[0]]
+
+        full = client.get(f"/api/teams/{team_id}/forecast?windows=3").json()
+        assert latest["used_points"] == [w["used_points"] for w in full["windows"]]
+        assert latest["cut_line_index"] == full["cut_line_index"]
+
+    def test_writes_without_a_hook_rebuild_the_state(self, client, db_session):
+        """A write from another worker only moves the data version"""
+        team_id, ids = setup_team(client)
+        initial = client.get(f"/api/teams/{team_id}/forecast/changes").json()
+
+        db_session.query(models.Epic).filter(models.Epic.id == ids[0]).update({"current_size": "L"})
+        db_session.execute(versions.bump(team_id))
+        db_session.commit()
+
+        latest = client.get(f"/api/teams/{team_id}/forecast/changes?since={initial['version']}").json()
+        assert latest["full"] is True
+        assert latest["changed"][0]["points"] == 8
+
+    def test_hooks_skip_states_that_missed_a_write(self, client, db_session):
+        team_id, ids = setup_team(client)
+        client.get(f"/api/teams/{team_id}/forecast/changes")
+        state = forecast_tracker._forecasts[(team_id, 3)]
+        version = state.data_version
+
+        # The write at version + 1 committed without reaching this state.
+        db_session.query(models.Epic).filter(models.Epic.id == ids[1]).delete()
+        db_session.execute(versions.bump(team_id))
+        db_session.query(models.Epic).filter(models.Epic.id == ids[0]).delete()
+        db_session.execute(versions.bump(team_id))
+        db_session.commit()
+        forecast_tracker.epic_removed(team_id, ids[0], version + 2)
+        assert ids[0] in state.epic_ids.tolist()
+
+        client.get(f"/api/teams/{team_id}/forecast/changes")
+        rebuilt = forecast_tracker._forecasts[(team_id, 3)]
+        assert rebuilt.data_version == version + 2
+        assert rebuilt.epic_ids.tolist() == ids[2:]
@@ -1,7 +1,23 @@
+import httpx
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, PropertyMock
 from fastapi.testclient import TestClient
 
+from server_python import imports
+from server_python import models
+from server_python import schemas
+from server_python import versions
+from server_python.jira_service import JiraService, jira_service
+from server_python.size_lookup import SizeLookup
+
+
+def search_pages(issues, page_size=100):
+    """Stand-in for JiraService.iter_issues that pages a fixed list of issues."""
+    async def iter_issues(*args, **kwargs):
+        for start in range(0, len(issues), page_size):
+            yield issues[start:start + page_size]
+    return iter_issues
+
 
 class TestJiraAPI:
     """Unit tests for Jira integration API endpoints"""
@@ -38,6 +54,98 @@ class TestJiraAPI:
         response = client.post(f"/api/teams/{team_id}/jira/import", json=import_data)
         assert response.status_code in [200, 503]
 
+    def test_import_jira_issues_maps_sizes(self, client):
+        """Imported issues become epics sized from the team's mappings"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+            {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+        ])
+        issues = [
+            schemas.JiraIssue(key="TEST-1", summary="One", issue_type="Epic", story_points=2),
+            schemas.JiraIssue(key="TEST-2", summary="Two", issue_type="Epic", story_points=13),
+            schemas.JiraIssue(key="TEST-3", summary="Three", issue_type="Epic"),
+        ]
+
+        with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(jira_service, "iter_issues", search_pages(issues)):
+            response = client.post(f"/api/teams/{team_id}/jira/import", json={"project_key": "TEST"})
+
+        assert response.status_code == 200
+        epics = response.json()["epics"]
+        assert [(e["external_id"], e["current_size"]) for e in epics] == [
+            ("TEST-1", "S"), ("TEST-2", "L"), ("TEST-3", "M")
+        ]
+        listed = client.get(f"/api/teams/{team_id}/epics").json()
+        assert [e["title"] for e in listed] == ["One", "Two", "Three"]
+
+    def test_reimport_updates_instead_of_duplicating(self, client):
+        """Re-importing refreshes the existing epic and appends only new issues"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        existing = client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "Manual", "original_size": "S", "current_size": "S", "source": "Template", "priority": 7
+        }).json()
+        first = [schemas.JiraIssue(key="TEST-1", summary="One", issue_type="Epic")]
+        second = [
+            schemas.JiraIssue(key="TEST-1", summary="One (renamed)", issue_type="Epic"),
+            schemas.JiraIssue(key="TEST-2", summary="Two", issue_type="Epic"),
+            schemas.JiraIssue(key="TEST-2", summary="Two again", issue_type="Epic"),
+        ]
+
+        with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True):
+            with patch.object(jira_service, "iter_issues", search_pages(first)):
+                imported = client.post(f"/api/teams/{team_id}/jira/import", json={"project_key": "TEST"}).json()
+            client.patch(f"/api/epics/{imported['epics'][0]['id']}", json={"current_size": "XL"})
+            with patch.object(jira_service, "iter_issues", search_pages(second, page_size=2)):
+                response = client.post(f"/api/teams/{team_id}/jira/import", json={"project_key": "TEST"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["imported_count"], data["created_count"], data["updated_count"]) == (2, 1, 1)
+        renamed, added = data["epics"]
+        assert renamed["id"] == imported["epics"][0]["id"]
+        assert (renamed["title"], renamed["current_size"]) == ("One (renamed)", "XL")
+        assert added["title"] == "Two"
+
+        listed = client.get(f"/api/teams/{team_id}/epics").json()
+        assert [e["title"] for e in listed] == ["Manual", "One (renamed)", "Two"]
+        assert existing["priority"] < renamed["priority"] < added["priority"]
+
+    def test_import_batches_large_backlogs(self, client, monkeypatch):
+        """Imports larger than one batch land in a single transaction, in order"""
+        monkeypatch.setattr(imports, "IMPORT_BATCH_SIZE", 7)
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        issues = [schemas.JiraIssue(key=f"BIG-{i}", summary=f"Issue {i}", issue_type="Epic") for i in range(30)]
+
+        with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(jira_service, "iter_issues", search_pages(issues, page_size=11)):
+            response = client.post(f"/api/teams/{team_id}/jira/import", json={"project_key": "BIG"})
+
+        assert response.json()["created_count"] == 30
+        assert [e["external_id"] for e in response.json()["epics"]] == [f"BIG-{i}" for i in range(30)]
+        listed = client.get(f"/api/teams/{team_id}/epics").json()
+        assert [e["external_id"] for e in listed] == [f"BIG-{i}" for i in range(30)]
+
+    def test_failed_search_page_rolls_back_the_import(self, client):
+        """A search page failing mid-import answers 502 and imports nothing"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+
+        async def failing_search(*args, **kwargs):
+            yield [schemas.JiraIssue(key="TEST-1", summary="One", issue_type="Epic")]
+            request = httpx.Request("GET", "https://jira.example.com/rest/api/2/search")
+            raise httpx.HTTPStatusError("rate limited", request=request, response=httpx.Response(429, request=request))
+
+        with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(jira_service, "iter_issues", failing_search):
+            response = client.post(f"/api/teams/{team_id}/jira/import", json={"project_key": "TEST"})
+
+        assert response.status_code == 502
+        assert client.get(f"/api/teams/{team_id}/epics").json() == []
+
     def test_get_jira_config_returns_integration_status(self, client):
         """GET /api/teams/{team_id}/jira/config returns Jira integration status"""
         team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
@@ -105,3 +213,91 @@ class TestJiraSizeMapping:
             json={"story_points": 5}
         )
         assert response.status_code in [200, 404]
+
+    def test_map_story_points_rounds_to_closest(self, client):
+        """Unmatched story points map to the nearest size, preferring the smaller on a tie"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+            {"size": "L", "points": 9, "confidence": 70, "anchor_description": "Large"}
+        ])
+
+        response = client.post(f"/api/teams/{team_id}/jira/map-points", json={"story_points": 6})
+        assert response.json() == {"size": "S", "points": 3, "matched": False}
+
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 6, "confidence": 80, "anchor_description": "Medium"}
+        ])
+        response = client.post(f"/api/teams/{team_id}/jira/map-points", json={"story_points": 6})
+        assert response.json() == {"size": "M", "points": 6, "matched": True}
+
+    def test_map_story_points_batch(self, client):
+        """POST /api/teams/{team_id}/jira/map-points/batch maps many values in one call"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+            {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+        ])
+
+        response = client.post(
+            f"/api/teams/{team_id}/jira/map-points/batch",
+            json={"story_points": [1, 3, 4, 5, 7, 40]}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "sizes": ["S", "S", "S", "M", "L", "L"],
+            "points": [3, 3, 3, 5, 8, 8],
+            "matched": [False, True, False, True, False, False]
+        }
+
+    def test_map_story_points_batch_without_mappings(self, client):
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[])
+
+        response = client.post(f"/api/teams/{team_id}/jira/map-points/batch", json={"story_points": [2, 13]})
+        assert response.json() == {"sizes": ["M", "M"], "points": [2, 13], "matched": [False, False]}
+
+    def test_map_story_points_sees_mappings_written_by_another_process(self, client, db_session):
+        """A write this process's cache never heard of is picked up through the team's data version"""
+        team_data = {"name": "Test Team", "avatar": "https://example.com/avatar.png"}
+        team_id = client.post("/api/teams", json=team_data).json()["id"]
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"}
+        ])
+        assert client.post(f"/api/teams/{team_id}/jira/map-points", json={"story_points": 6}).json()["size"] == "S"
+
+        db_session.add(models.SizeMapping(team_id=team_id, size="M", points=6, confidence=80, anchor_description="Medium"))
+        db_session.execute(versions.bump(team_id))
+        db_session.commit()
+
+        response = client.post(f"/api/teams/{team_id}/jira/map-points", json={"story_points": 6})
+        assert response.json() == {"size": "M", "points": 6, "matched": True}
+
+
+class TestSizeLookup:
+    MAPPINGS = [("XS", 1), ("S", 3), ("M", 5), ("L", 8), ("XL", 13), ("XXL", 21)]
+
+    def linear_closest(self, story_points):
+        closest, min_diff = None, float("inf")
+        for size, points in sorted(self.MAPPINGS, key=lambda m: m[1]):
+            diff = abs(points - story_points)
+            if diff < min_diff:
+                closest, min_diff = (size, points), diff
+        return closest
+
+    def test_matches_linear_scan(self):
+        lookup = SizeLookup(self.MAPPINGS)
+        values = list(range(-2, 40))
+        sizes, points, matched = lookup.match_many(values)
+        for value, size, point, match in zip(values, sizes, points, matched):
+            assert lookup.closest(value) == self.linear_closest(value) == (size, point)
+            assert match == (point == value)
+
+    def test_import_sizes_default_unestimated_issues(self):
+        lookup = SizeLookup(self.MAPPINGS)
+        assert lookup.sizes_for([None, 0, 2, 20]) == ["M", "M", "XS", "XXL"]
+        assert SizeLookup([]).sizes_for([5]) == ["M"]
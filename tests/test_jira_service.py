@@ -1,6 +1,12 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch
 import os
+import httpx
+
+
+def json_transport(payload):
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=payload))
 
 
 class TestJiraServiceConfiguration:
@@ -72,16 +78,11 @@ class TestJiraCloudAPI:
             from server_python.jira_service import JiraService
             service = JiraService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
+            service.http.transport = json_transport([
                 {"key": "PROJ1", "name": "Project One"},
                 {"key": "PROJ2", "name": "Project Two"}
-            ]
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                projects = await service.get_projects()
+            ])
+            projects = await service.get_projects()
             
             assert len(projects) == 2
             assert projects[0].key == "PROJ1"
@@ -98,9 +99,7 @@ class TestJiraCloudAPI:
             from server_python.jira_service import JiraService
             service = JiraService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {
+            service.http.transport = json_transport({
                 "issues": [
                     {
                         "key": "PROJ-1",
@@ -111,11 +110,8 @@ class TestJiraCloudAPI:
                         }
                     }
                 ]
-            }
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                issues = await service.get_issues("PROJ", jql="project = PROJ AND type = Epic")
+            })
+            issues = await service.get_issues("PROJ", jql="project = PROJ AND type = Epic")
             
             assert len(issues) == 1
             assert issues[0].key == "PROJ-1"
@@ -135,15 +131,10 @@ class TestJiraDataCenterAPI:
             from server_python.jira_service import JiraService
             service = JiraService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
+            service.http.transport = json_transport([
                 {"key": "DC1", "name": "Data Center Project"}
-            ]
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                projects = await service.get_projects()
+            ])
+            projects = await service.get_projects()
             
             assert len(projects) == 1
             assert projects[0].key == "DC1"
@@ -162,3 +153,92 @@ class TestJiraDataCenterAPI:
             headers = service.get_auth_headers()
             assert "Authorization" in headers
             assert headers["Authorization"] == "Bearer pat_token_123"
+
+
+def issue_json(n):
+    return {"key": f"P-{n}", "fields": {"summary": f"Issue {n}", "issuetype": {"name": "Epic"}}}
+
+
+class TestJiraPagination:
+    """Search results past the first page"""
+
+    @pytest.mark.asyncio
+    async def test_datacenter_fetches_remaining_pages_concurrently_in_order(self):
+        """Data Center pages by startAt, at most JIRA_SEARCH_CONCURRENCY requests at once"""
+        with patch.dict(os.environ, {
+            "JIRA_BASE_URL": "https://jira.mycompany.com",
+            "JIRA_PAT": "pat_token_123",
+            "JIRA_DEPLOYMENT_TYPE": "datacenter",
+            "JIRA_SEARCH_PAGE_SIZE": "10",
+            "JIRA_SEARCH_CONCURRENCY": "3"
+        }):
+            from server_python.jira_service import JiraService
+            service = JiraService()
+
+        total, in_flight, peak = 95, 0, 0
+
+        async def search(request):
+            nonlocal in_flight, peak
+            start = int(request.url.params["startAt"])
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Later pages answer first, so ordering comes from the service, not the transport.
+            await asyncio.sleep(0.001 * (total - start) / 10)
+            in_flight -= 1
+            issues = [issue_json(n) for n in range(start, min(start + 10, total))]
+            return httpx.Response(200, json={"startAt": start, "maxResults": 10, "total": total, "issues": issues})
+
+        service.http.transport = httpx.MockTransport(search)
+        pages = [page async for page in service.iter_issues("P")]
+
+        assert [len(page) for page in pages] == [10] * 9 + [5]
+        assert [issue.key for page in pages for issue in page] == [f"P-{n}" for n in range(total)]
+        assert 1 < peak <= 3
+
+    @pytest.mark.asyncio
+    async def test_cloud_follows_next_page_token(self):
+        """Cloud uses /search/jql and nextPageToken"""
+        with patch.dict(os.environ, {
+            "JIRA_BASE_URL": "https://mycompany.atlassian.net",
+            "JIRA_EMAIL": "user@example.com",
+            "JIRA_API_TOKEN": "token123",
+            "JIRA_DEPLOYMENT_TYPE": "cloud"
+        }):
+            from server_python.jira_service import JiraService
+            service = JiraService()
+
+        requests = []
+
+        def search(request):
+            requests.append(request)
+            page = int(request.url.params.get("nextPageToken", 0))
+            body = {"issues": [issue_json(page * 2), issue_json(page * 2 + 1)]}
+            if page < 2:
+                body["nextPageToken"] = str(page + 1)
+            return httpx.Response(200, json=body)
+
+        service.http.transport = httpx.MockTransport(search)
+        issues = await service.get_issues("P")
+
+        assert [issue.key for issue in issues] == [f"P-{n}" for n in range(6)]
+        assert {r.url.path for r in requests} == {"/rest/api/3/search/jql"}
+
+    @pytest.mark.asyncio
+    async def test_failed_later_page_raises(self):
+        """A page failing after the first must not truncate the import silently"""
+        with patch.dict(os.environ, {
+            "JIRA_BASE_URL": "https://jira.mycompany.com",
+            "JIRA_PAT": "pat_token_123",
+            "JIRA_DEPLOYMENT_TYPE": "datacenter"
+        }):
+            from server_python.jira_service import JiraService
+            service = JiraService()
+
+        def search(request):
+            if request.url.params["startAt"] != "0":
+                return httpx.Response(429)
+            return httpx.Response(200, json={"maxResults": 100, "total": 250, "issues": [issue_json(0)]})
+
+        service.http.transport = httpx.MockTransport(search)
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.get_issues("P")
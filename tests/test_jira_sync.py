@@ -0,0 +1,221 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from server_python import models
+from server_python import schemas
+from server_python.integration_sync import SyncScheduler, sync_enabled_team_ids, utcnow
+from server_python.jira_service import JiraService, jira_service
+from tests.conftest import TestingAsyncSessionLocal
+
+
+MAPPINGS = [
+    {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+    {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"},
+]
+
+
+def issue(key, summary, points=None):
+    return schemas.JiraIssue(key=key, summary=summary, issue_type="Epic", story_points=points)
+
+
+class FakeSearch:
+    """Stands in for JiraService.iter_issues, returning ``issues`` and recording each JQL."""
+
+    def __init__(self):
+        self.issues = []
+        self.queries = []
+
+    async def __call__(self, project_key, issue_type="Epic", jql=None, strict=False):
+        self.queries.append(jql)
+        for start in range(0, len(self.issues), 2):
+            yield self.issues[start:start + 2]
+
+
+@pytest.fixture
+def search():
+    fake = FakeSearch()
+    with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True), \
+            patch.object(jira_service, "iter_issues", fake):
+        yield fake
+
+
+def setup_team(client, sync_enabled=True):
+    team_id = client.post("/api/teams", json={"name": "Sync", "avatar": "https://example.com/a.png"}).json()["id"]
+    client.put(f"/api/teams/{team_id}/size-mappings", json=MAPPINGS)
+    client.put(f"/api/teams/{team_id}/jira/config", json={"project_key": "SYNC", "sync_enabled": sync_enabled})
+    return team_id
+
+
+def sync(client, team_id, **params):
+    return client.post(f"/api/teams/{team_id}/jira/sync", params=params)
+
+
+def listed(client, team_id):
+    return client.get(f"/api/teams/{team_id}/epics").json()
+
+
+def age_sync_state(db_session, team_id, **ages):
+    config = db_session.query(models.IntegrationConfig).filter_by(team_id=team_id, integration_type="jira").one()
+    state = dict(config.sync_state)
+    for key, age in ages.items():
+        state[key] = (utcnow() - age).isoformat()
+    config.sync_state = state
+    db_session.commit()
+
+
+class TestJiraSync:
+    def test_requires_enabled_sync(self, client, search):
+        team_id = setup_team(client, sync_enabled=False)
+        assert sync(client, team_id).status_code == 400
+        assert sync(client, 999).status_code == 404
+
+    def test_first_sync_is_full(self, client, search):
+        team_id = setup_team(client)
+        search.issues = [issue("SYNC-1", "One", 2), issue("SYNC-2", "Two", 13), issue("SYNC-3", "Three")]
+        body = sync(client, team_id).json()
+        assert (body["full"], body["fetched"], body["created"], body["deleted"]) == (True, 3, 3, 0)
+        assert search.queries == ["project = SYNC AND type = Epic"]
+        assert [(e["external_id"], e["current_size"]) for e in listed(client, team_id)] == [
+            ("SYNC-1", "S"), ("SYNC-2", "L"), ("SYNC-3", "M")
+        ]
+
+    def test_delta_sync_applies_changes(self, client, search, db_session):
+        team_id = setup_team(client)
+        search.issues = [issue("SYNC-1", "One", 2), issue("SYNC-2", "Two", 2)]
+        sync(client, team_id)
+        first, second = listed(client, team_id)
+        client.patch(f"/api/epics/{second['id']}", json={"current_size": "XL"})
+        age_sync_state(db_session, team_id, last_synced_at=timedelta(minutes=10))
+
+        search.issues = [issue("SYNC-1", "One (renamed)", 13), issue("SYNC-2", "Two", 13), issue("SYNC-4", "Four")]
+        body = sync(client, team_id).json()
+
+        assert (body["full"], body["created"], body["updated"], body["deleted"]) == (False, 1, 2, 0)
+        query = search.queries[-1]
+        assert query.startswith("project = SYNC AND type = Epic AND updated >= -")
+        assert 12 <= int(query.rsplit("-", 1)[1].rstrip("m")) <= 13
+        assert [(e["title"], e["original_size"], e["current_size"]) for e in listed(client, team_id)] == [
+            ("One (renamed)", "L", "L"), ("Two", "L", "XL"), ("Four", "M", "M")
+        ]
+
+    def test_full_sync_deletes_missing_issues(self, client, search):
+        team_id = setup_team(client)
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "Manual", "original_size": "M", "current_size": "M", "source": "Template"
+        })
+        search.issues = [issue("SYNC-1", "One"), issue("SYNC-2", "Two"), issue("SYNC-3", "Three")]
+        sync(client, team_id)
+
+        search.issues = [issue("SYNC-1", "One"), issue("SYNC-3", "Three")]
+        body = sync(client, team_id, full=True).json()
+        assert (body["full"], body["deleted"]) == (True, 1)
+        assert [e["title"] for e in listed(client, team_id)] == ["Manual", "One", "Three"]
+
+    def test_full_sync_keeps_other_projects(self, client, search):
+        team_id = setup_team(client)
+        for key in ("OTHER-1", "SYNCX-1"):
+            client.post(f"/api/teams/{team_id}/epics", json={
+                "title": key, "original_size": "M", "current_size": "M", "source": "Jira", "external_id": key
+            })
+        search.issues = [issue("SYNC-1", "One"), issue("SYNC-2", "Two")]
+        sync(client, team_id)
+
+        search.issues = [issue("SYNC-1", "One")]
+        assert sync(client, team_id, full=True).json()["deleted"] == 1
+        assert [e["external_id"] for e in listed(client, team_id)] == ["OTHER-1", "SYNCX-1", "SYNC-1"]
+
+    def test_full_sync_keeps_issues_imported_by_hand(self, client, search, db_session):
+        team_id = setup_team(client)
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "Imported", "original_size": "M", "current_size": "M", "source": "Jira", "external_id": "SYNC-9"
+        })
+        search.issues = [issue("SYNC-1", "One")]
+        sync(client, team_id)
+        age_sync_state(db_session, team_id, last_synced_at=timedelta(minutes=10))
+        search.issues = [issue("SYNC-1", "One"), issue("SYNC-2", "Two")]
+        sync(client, team_id)
+
+        search.issues = [issue("SYNC-1", "One")]
+        assert sync(client, team_id, full=True).json()["deleted"] == 1
+        assert [e["external_id"] for e in listed(client, team_id)] == ["SYNC-9", "SYNC-1"]
+
+    def test_delta_sync_never_deletes(self, client, search):
+        team_id = setup_team(client)
+        search.issues = [issue("SYNC-1", "One"), issue("SYNC-2", "Two")]
+        sync(client, team_id)
+        search.issues = []
+        body = sync(client, team_id).json()
+        assert (body["full"], body["deleted"]) == (False, 0)
+        assert len(listed(client, team_id)) == 2
+
+    def test_reconciles_after_the_interval(self, client, search, db_session):
+        team_id = setup_team(client)
+        sync(client, team_id)
+        age_sync_state(db_session, team_id, last_reconciled_at=timedelta(hours=2))
+        assert sync(client, team_id).json()["full"] is True
+        assert sync(client, team_id).json()["full"] is False
+
+    def test_changing_the_project_starts_over(self, client, search):
+        team_id = setup_team(client)
+        sync(client, team_id)
+        client.put(f"/api/teams/{team_id}/jira/config", json={"project_key": "SYNC", "sync_enabled": True})
+        assert sync(client, team_id).json()["full"] is False
+        client.put(f"/api/teams/{team_id}/jira/config", json={"project_key": "OTHER", "sync_enabled": True})
+        assert sync(client, team_id).json()["full"] is True
+        assert search.queries[-1] == "project = OTHER AND type = Epic"
+
+    def test_sync_changes_the_etag(self, client, search):
+        team_id = setup_team(client)
+        etag = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+        search.issues = [issue("SYNC-1", "One")]
+        sync(client, team_id)
+        response = client.get(f"/api/teams/{team_id}/epics", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_enabled_teams(self, client):
+        enabled = setup_team(client)
+        setup_team(client, sync_enabled=False)
+        async with TestingAsyncSessionLocal() as db:
+            assert await sync_enabled_team_ids(db, "jira", "project_key") == [enabled]
+
+
+class TestSyncScheduler:
+    @pytest.mark.asyncio
+    async def test_caps_concurrency_and_isolates_failures(self):
+        synced, running, peak = [], 0, 0
+
+        async def sync_team(team_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if team_id == 3:
+                raise RuntimeError("rate limited")
+            synced.append(team_id)
+
+        async def list_teams():
+            return list(range(1, 9))
+
+        scheduler = SyncScheduler("Test", list_teams, sync_team, interval=60, jitter=0.005, concurrency=2)
+        await scheduler.run_once()
+        assert sorted(synced) == [1, 2, 4, 5, 6, 7, 8]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self):
+        rounds = asyncio.Event()
+
+        async def list_teams():
+            rounds.set()
+            return []
+
+        scheduler = SyncScheduler("Test", list_teams, None, interval=60, jitter=0, concurrency=1)
+        scheduler.start()
+        await asyncio.wait_for(rounds.wait(), 1)
+        await scheduler.stop()
+        assert scheduler._task is None
@@ -0,0 +1,136 @@
+import asyncio
+from unittest.mock import PropertyMock, patch
+
+import httpx
+import pytest
+
+from server_python.jira_service import JiraService, jira_service
+from server_python.metadata_cache import MetadataCache, metadata_cache
+
+
+class Upstream:
+    """A fake conditional GET: serves ``payload`` with an ETag and answers 304 when it matches."""
+
+    def __init__(self, payload, etag='"v1"'):
+        self.payload = payload
+        self.etag = etag
+        self.sent = []
+        self.fail = False
+
+    async def __call__(self, headers):
+        self.sent.append(headers)
+        await asyncio.sleep(0)
+        request = httpx.Request("GET", "https://upstream.test/list")
+        if self.fail:
+            raise httpx.ConnectError("unreachable", request=request)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, request=request)
+        return httpx.Response(200, json=self.payload, headers={"ETag": self.etag} if self.etag else {}, request=request)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestMetadataCache:
+    @pytest.mark.asyncio
+    async def test_fresh_entries_skip_the_upstream(self):
+        cache = MetadataCache(ttl=60, stale=60, max_entries=10)
+        upstream = Upstream(["a"])
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+        upstream.payload = ["b"]
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+        assert len(upstream.sent) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_stale_entries_are_served_while_revalidating(self):
+        cache = MetadataCache(ttl=0, stale=60, max_entries=10)
+        upstream = Upstream(["a"])
+        await cache.get("k", upstream, list, default=[])
+
+        # Unchanged upstream: a conditional request and a 304.
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+        await settle()
+        assert upstream.sent[1] == {"If-None-Match": '"v1"'}
+        assert cache.not_modified == 1
+
+        upstream.payload, upstream.etag = ["b"], '"v2"'
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+        await settle()
+        assert await cache.get("k", upstream, list, default=[]) == ["b"]
+        assert cache.stale_hits == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_wait_for_the_upstream(self):
+        cache = MetadataCache(ttl=0, stale=0, max_entries=10)
+        upstream = Upstream(["a"], etag=None)
+        await cache.get("k", upstream, list, default=[])
+        upstream.payload = ["b"]
+        assert await cache.get("k", upstream, list, default=[]) == ["b"]
+        assert upstream.sent == [{}, {}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self):
+        cache = MetadataCache(ttl=60, stale=60, max_entries=10)
+        upstream = Upstream(["a"])
+        results = await asyncio.gather(*(cache.get("k", upstream, list, default=[]) for _ in range(5)))
+        assert results == [["a"]] * 5
+        assert len(upstream.sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_failures(self):
+        cache = MetadataCache(ttl=0, stale=60, max_entries=10)
+        upstream = Upstream(["a"])
+        upstream.fail = True
+        with pytest.raises(httpx.ConnectError):
+            await cache.get("k", upstream, list, default=[])
+
+        upstream.fail = False
+
+        async def server_error(headers):
+            return httpx.Response(500, request=httpx.Request("GET", "https://upstream.test/list"))
+
+        assert await cache.get("k", server_error, list, default=["default"]) == ["default"]
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+
+        # A failed background refresh keeps serving the old value.
+        upstream.fail = True
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+        await settle()
+        assert await cache.get("k", upstream, list, default=[]) == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        cache = MetadataCache(ttl=60, stale=60, max_entries=2)
+        upstream = Upstream(["a"])
+        for key in ("k1", "k2", "k1", "k3"):
+            await cache.get(key, upstream, list, default=[])
+        assert list(cache._entries) == ["k1", "k3"]
+
+
+class TestCachedEndpoints:
+    def test_projects_are_cached_per_team_and_credentials(self, client):
+        calls = []
+
+        def handle(request):
+            calls.append(request)
+            return httpx.Response(200, json=[{"key": "P", "name": "Project"}])
+
+        team_ids = [
+            client.post("/api/teams", json={"name": "T", "avatar": "https://example.com/a.png"}).json()["id"]
+            for _ in range(2)
+        ]
+        with patch.object(JiraService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(jira_service, "base_url", "https://jira.test"), \
+                patch.object(jira_service.http, "transport", httpx.MockTransport(handle)):
+            for _ in range(3):
+                assert client.get(f"/api/teams/{team_ids[0]}/jira/projects").json() == [{"key": "P", "name": "Project"}]
+            client.get(f"/api/teams/{team_ids[1]}/jira/projects")
+            assert len(calls) == 2
+
+            with patch.object(jira_service, "api_token", "rotated"):
+                client.get(f"/api/teams/{team_ids[0]}/jira/projects")
+            assert len(calls) == 3
+        assert metadata_cache.hits == 2
@@ -0,0 +1,75 @@
+import numpy as np
+
+from server_python.monte_carlo import simulate
+
+
+class TestSimulate:
+    def test_full_confidence_matches_deterministic_plan(self):
+        result = simulate(np.array([5, 5, 5, 5, 5]), np.zeros(5), 10, 2, trials=1000, seed=1)
+        for percentile in (50, 80, 95):
+            assert result.delivery_windows[percentile].tolist() == [0, 0, 1, 1, 2]
+        assert result.overflow_probability.tolist() == [0.0, 0.0]
+
+    def test_percentiles_are_ordered(self):
+        rng = np.random.default_rng(3)
+        points = rng.choice([2, 5, 8, 13, 21], size=300)
+        spreads = rng.choice([0.1, 0.25, 0.5], size=300)
+        result = simulate(points, spreads, 120, 4, trials=2000, seed=3)
+
+        p50, p80, p95 = (result.delivery_windows[p] for p in (50, 80, 95))
+        assert np.all(p50 <= p80)
+        assert np.all(p80 <= p95)
+        assert np.all(np.diff(p50) >= 0)
+
+    def test_low_confidence_raises_overflow_risk(self):
+        points = np.full(40, 8)
+        tight = simulate(points, np.full(40, 0.05), 100, 3, trials=4000, seed=5)
+        loose = simulate(points, np.full(40, 0.8), 100, 3, trials=4000, seed=5)
+        assert loose.overflow_probability[0] > tight.overflow_probability[0]
+        assert 0.0 <= loose.overflow_probability.min() <= loose.overflow_probability.max() <= 1.0
+
+    def test_seed_is_reproducible(self):
+        points = np.array([3, 8, 13, 5, 21, 8])
+        spreads = np.array([0.1, 0.3, 0.5, 0.2, 0.6, 0.3])
+        first = simulate(points, spreads, 20, 3, trials=1001, seed=42)
+        second = simulate(points, spreads, 20, 3, trials=1001, seed=42)
+        assert first.trials == 1001
+        assert first.overflow_probability.tolist() == second.overflow_probability.tolist()
+        assert first.delivery_windows[80].tolist() == second.delivery_windows[80].tolist()
+
+    def test_empty_backlog(self):
+        result = simulate(np.array([], dtype=np.int64), np.zeros(0), 10, 2, trials=1000)
+        assert result.delivery_windows[50].tolist() == []
+        assert result.overflow_probability.tolist() == [0.0, 0.0]
+
+
+class TestMonteCarloAPI:
+    def test_monte_carlo_forecast(self, client):
+        session = client.post("/api/demo/session").json()
+        team_id = session["team"]["id"]
+        headers = {"X-Demo-Session": session["session_token"]}
+
+        response = client.get(
+            f"/api/demo/teams/{team_id}/forecast/monte-carlo?windows=2&trials=2000&seed=7",
+            headers=headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["trials"] == 2000
+        assert len(data["epics"]) == 8
+        assert len(data["windows"]) == 2
+        assert all(e["p50_window"] <= e["p95_window"] for e in data["epics"])
+
+    def test_monte_carlo_requires_capacity(self, client):
+        team_id = client.post("/api/teams", json={
+            "name": "Idle", "avatar": "https://example.com/avatar.png", "engineer_count": 0
+        }).json()["id"]
+        response = client.get(f"/api/teams/{team_id}/forecast/monte-carlo")
+        assert response.status_code == 400
+
+    def test_monte_carlo_rejects_too_many_trials(self, client):
+        team_id = client.post("/api/teams", json={
+            "name": "Busy", "avatar": "https://example.com/avatar.png"
+        }).json()["id"]
+        response = client.get(f"/api/teams/{team_id}/forecast/monte-carlo?trials=500000")
+        assert response.status_code == 422
@@ -0,0 +1,88 @@
+import json
+
+from server_python import forecast
+from server_python import models
+from server_python import portfolio
+from tests.test_forecast import add_epics, create_team
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def setup_portfolio(client):
+    team_ids = [create_team(client, name=f"Team {i}") for i in range(3)]
+    for team_id in team_ids:
+        client.put(f"/api/teams/{team_id}/size-mappings", json=[
+            {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+            {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+        ])
+    add_epics(client, team_ids[0], ["L", "M", "M"])
+    add_epics(client, team_ids[1], ["M", "XL"])
+    return team_ids
+
+
+class TestPortfolioForecast:
+    def test_loads_each_team_as_contiguous_slice(self, client, db_session):
+        team_ids = setup_portfolio(client)
+        backlogs = portfolio.load_portfolio_backlogs(db_session, team_ids)
+
+        assert [b.team_id for b in backlogs] == team_ids
+        assert [b.points.tolist() for b in backlogs] == [[8, 5, 5], [5, 0], []]
+        assert all(b.capacity == 10 for b in backlogs)
+
+    def test_duplicate_size_mappings_match_the_team_forecast(self, client, db_session):
+        team_id = setup_portfolio(client)[0]
+        db_session.add_all([
+            models.SizeMapping(team_id=team_id, size=size, points=points, confidence=50, anchor_description="Again")
+            for size, points in (("M", 3), ("L", 13))
+        ])
+        db_session.commit()
+
+        backlog = portfolio.load_portfolio_backlogs(db_session, [team_id])[0]
+        size_points = forecast.size_points_lookup(db_session.query(models.SizeMapping).filter_by(team_id=team_id))
+        assert size_points == {"M": 5, "L": 13}
+        assert backlog.points.tolist() == forecast.build_points_vector(["L", "M", "M"], size_points).tolist()
+
+    def test_process_pool_matches_inline(self, client, db_session, monkeypatch):
+        monkeypatch.setattr(portfolio, "PORTFOLIO_WORKERS", 2)
+        monkeypatch.setattr(portfolio, "_executor", None)
+        team_ids = setup_portfolio(client)
+        backlogs = portfolio.load_portfolio_backlogs(db_session, team_ids)
+
+        inline = list(portfolio.forecast_portfolio(backlogs, 2, min_parallel_teams=len(backlogs) + 1))
+        pooled = list(portfolio.forecast_portfolio(backlogs, 2, min_parallel_teams=1))
+        assert portfolio._executor._mp_context.get_start_method() != "fork"
+        portfolio.shutdown_executor()
+        assert portfolio._executor is None
+        assert sorted(pooled, key=lambda f: f.team_id) == inline
+
+    def test_streams_teams_then_rollup(self, client):
+        team_ids = setup_portfolio(client)
+        params = "&".join(f"team_ids={t}" for t in team_ids)
+        response = client.get(f"/api/portfolio/forecast?windows=2&{params}")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = read_lines(response)
+        teams = {line["team_id"]: line for line in lines[:-1]}
+        assert all(line["type"] == "team" for line in lines[:-1])
+        assert teams[team_ids[0]]["used_points"] == [10, 8]
+        assert teams[team_ids[0]]["beyond_capacity"] is False
+        assert teams[team_ids[0]]["windows_needed"] == 2
+        assert teams[team_ids[2]]["epic_count"] == 0
+
+        rollup = lines[-1]
+        assert rollup["type"] == "rollup"
+        assert rollup["team_count"] == 3
+        assert rollup["capacity"] == 30
+        assert rollup["total_points"] == 23
+        assert rollup["used_points"] == [15, 8]
+
+    def test_unknown_teams_yield_empty_rollup(self, client):
+        response = client.get("/api/portfolio/forecast?team_ids=9999")
+        lines = read_lines(response)
+        assert lines == [{
+            "type": "rollup", "team_count": 0, "window_count": 3, "capacity": 0,
+            "used_points": [0, 0, 0], "total_points": 0, "total_capacity": 0, "teams_beyond_capacity": 0
+        }]
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from server_python import migrate
+from server_python import models
+from server_python.database import Base
+
+
+HOT_QUERIES = {
+    "epics by team in priority order": select(models.Epic).where(
+        models.Epic.team_id == 1
+    ).order_by(models.Epic.priority, models.Epic.id),
+    "epics page after a cursor": select(models.Epic.id, models.Epic.priority, models.Epic.title).where(
+        models.Epic.team_id == 1,
+        tuple_(models.Epic.priority, models.Epic.id) > (2048, 17)
+    ).order_by(models.Epic.priority, models.Epic.id).limit(101),
+    "size mappings by team": select(models.SizeMapping.size, models.SizeMapping.points).where(
+        models.SizeMapping.team_id == 1
+    ),
+    "integration config by team and type": select(models.IntegrationConfig).where(
+        models.IntegrationConfig.team_id == 1,
+        models.IntegrationConfig.integration_type == "jira"
+    ),
+    "expired demo sessions": select(models.DemoSession).where(
+        models.DemoSession.last_accessed < datetime(2024, 1, 1)
+    ),
+    "demo session by token": select(models.DemoSession).where(
+        models.DemoSession.session_token == "token"
+    ),
+    "imported epics by external id": select(models.Epic.external_id).where(
+        models.Epic.team_id == 1,
+        models.Epic.source == "Jira",
+        models.Epic.external_id.in_(["TEST-1", "TEST-2"])
+    ),
+    "snapshots by team newest first": select(models.PlanningSnapshot.id).where(
+        models.PlanningSnapshot.team_id == 1
+    ).order_by(models.PlanningSnapshot.created_at.desc(), models.PlanningSnapshot.id.desc()),
+}
+
+NEW_INDEXES = [
+    ("epics", "ix_epics_team_priority"),
+    ("epics", "uq_epics_team_source_external_id"),
+    ("size_mappings", "ix_size_mappings_team_size"),
+    ("integration_configs", "ix_integration_configs_team_type"),
+    ("demo_sessions", "ix_demo_sessions_last_accessed"),
+    ("planning_snapshots", "ix_planning_snapshots_team_created"),
+]
+
+
+@pytest.fixture
+def plan_engine(tmp_path):
+    target = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(bind=target)
+    yield target
+    target.dispose()
+
+
+def query_plan(target, query) -> list:
+    sql = str(query.compile(target, compile_kwargs={"literal_binds": True}))
+    with target.connect() as connection:
+        return [row.detail for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+class TestHotQueryPlans:
+    @pytest.mark.parametrize("name", list(HOT_QUERIES))
+    def test_hot_query_uses_an_index(self, plan_engine, name):
+        """Every hot lookup is an index SEARCH: no table scan, no sort step"""
+        plan = query_plan(plan_engine, HOT_QUERIES[name])
+        assert any(step.startswith("SEARCH") for step in plan), plan
+        assert not any(step.startswith("SCAN") for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+    def test_plan_check_catches_a_table_scan(self, plan_engine):
+        """Sanity check: an unindexed filter shows up as a SCAN"""
+        plan = query_plan(plan_engine, select(models.Epic).where(models.Epic.title == "x"))
+        assert any(step.startswith("SCAN") for step in plan)
+
+
+class TestIndexMigration:
+    def test_upgrade_adds_indexes_to_an_existing_database(self, plan_engine):
+        """A database created before the indexes gets them, minus duplicate external ids"""
+        with plan_engine.begin() as connection:
+            for _, name in NEW_INDEXES:
+                connection.execute(text(f"DROP INDEX {name}"))
+        with Session(plan_engine) as db:
+            team = models.Team(name="Team", avatar="")
+            db.add(team)
+            db.flush()
+            db.add_all([
+                models.Epic(id=epic_id, team_id=team.id, external_id="TEST-1", title="Epic",
+                            original_size="M", current_size="M", source="Jira", priority=epic_id)
+                for epic_id in (1, 2, 3)
+            ])
+            db.commit()
+        with plan_engine.begin() as connection:
+            connection.execute(text("ALTER TABLE teams DROP COLUMN data_version"))
+            connection.execute(text("ALTER TABLE integration_configs DROP COLUMN sync_state"))
+
+        assert query_plan(plan_engine, HOT_QUERIES["epics by team in priority order"])[0].startswith("SCAN")
+
+        migrate.upgrade(plan_engine)
+
+        inspector = inspect(plan_engine)
+        for table, name in NEW_INDEXES:
+            assert name in {index["name"] for index in inspector.get_indexes(table)}
+        assert "uq_epics_team_external_id" not in {index["name"] for index in inspector.get_indexes("epics")}
+        with plan_engine.connect() as connection:
+            linked = connection.execute(text("SELECT id, external_id FROM epics ORDER BY id")).all()
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        assert [tuple(row) for row in linked] == [(1, "TEST-1"), (2, None), (3, None)]
+        assert version == ScriptDirectory.from_config(migrate.alembic_config()).get_current_head()
+        assert "data_version" in {column["name"] for column in inspector.get_columns("teams")}
+        assert "sync_state" in {column["name"] for column in inspector.get_columns("integration_configs")}
+
+    def test_upgrade_is_a_no_op_on_a_current_database(self, plan_engine):
+        migrate.upgrade(plan_engine)
+        migrate.upgrade(plan_engine)
+        inspector = inspect(plan_engine)
+        assert {index["name"] for index in inspector.get_indexes("epics")} >= {
+            "ix_epics_team_priority", "uq_epics_team_source_external_id"
+        }
+
+    def test_migrate_builds_an_empty_database(self, tmp_path):
+        target = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+        migrate.migrate(target)
+        inspector = inspect(target)
+        assert "ix_epics_team_priority" in {index["name"] for index in inspector.get_indexes("epics")}
+        with target.connect() as connection:
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        assert version == ScriptDirectory.from_config(migrate.alembic_config()).get_current_head()
+        target.dispose()
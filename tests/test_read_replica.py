@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from server_python import database
+from server_python.database import (
+    PRIMARY_COOKIE, PRIMARY_HEADER, Base, ReadRouter, build_async_engine, build_engine, engine_options,
+    get_async_read_db, get_read_db
+)
+from server_python.main import app
+from tests.conftest import SQLITE_PATH, TestingAsyncSessionLocal, TestingSessionLocal
+
+
+TEAM = {"name": "Replica Team", "avatar": "https://example.com/a.png"}
+REPLICA_PATH = os.path.join(os.path.dirname(SQLITE_PATH), "replica.db")
+
+
+@pytest.fixture
+def replica(client, monkeypatch):
+    """A second, never-synced database standing in for a lagging replica."""
+    writable = build_engine(f"sqlite:///{REPLICA_PATH}", {})
+    Base.metadata.create_all(bind=writable)
+    writable.dispose()
+
+    read_engine = build_engine(f"sqlite:///{REPLICA_PATH}", {}, read_only=True,
+                               connect_args={"check_same_thread": False})
+    async_read_engine = build_async_engine(f"sqlite+aiosqlite:///{REPLICA_PATH}", {}, read_only=True,
+                                           poolclass=NullPool)
+    router = ReadRouter(
+        TestingSessionLocal, sessionmaker(bind=read_engine),
+        TestingAsyncSessionLocal, async_sessionmaker(async_read_engine, expire_on_commit=False),
+        window_seconds=30
+    )
+    monkeypatch.setattr(database, "read_router", router)
+    app.dependency_overrides.pop(get_read_db)
+    app.dependency_overrides.pop(get_async_read_db)
+    yield router
+    read_engine.dispose()
+    os.remove(REPLICA_PATH)
+
+
+class TestReadRouting:
+    def test_reads_go_to_the_replica(self, client, replica):
+        client.post("/api/teams", json=TEAM)
+        client.cookies.clear()
+        assert client.get("/api/teams").json() == []
+
+    def test_reads_follow_the_clients_own_writes(self, client, replica):
+        team_id = client.post("/api/teams", json=TEAM).json()["id"]
+        assert PRIMARY_COOKIE in client.cookies
+        assert client.get(f"/api/teams/{team_id}").status_code == 200
+        assert [t["id"] for t in client.get("/api/teams").json()] == [team_id]
+        assert client.get(f"/api/teams/{team_id}/forecast").status_code == 200
+
+    def test_clients_without_cookies_echo_the_header(self, client, replica):
+        response = client.post("/api/teams", json=TEAM)
+        team_id = response.json()["id"]
+        client.cookies.clear()
+        assert client.get(f"/api/teams/{team_id}").status_code == 404
+        headers = {PRIMARY_HEADER: response.headers[PRIMARY_HEADER]}
+        assert client.get(f"/api/teams/{team_id}", headers=headers).status_code == 200
+
+    def test_stickiness_expires(self, client, replica):
+        team_id = client.post("/api/teams", json=TEAM).json()["id"]
+        client.cookies.set(PRIMARY_COOKIE, f"{time.time() - 1:.3f}")
+        assert client.get(f"/api/teams/{team_id}").status_code == 404
+
+    def test_failed_writes_do_not_pin(self, client, replica):
+        assert client.patch("/api/teams/999", json={"name": "x"}).status_code == 404
+        assert PRIMARY_COOKIE not in client.cookies
+
+    def test_replica_engine_is_read_only(self, client, replica):
+        with replica.replica() as db:
+            with pytest.raises(exc.OperationalError):
+                db.execute(text("DELETE FROM teams"))
+
+
+class TestReadOnlyOptions:
+    def test_postgres_sessions_default_to_read_only(self):
+        options = engine_options("postgresql://u:p@replica/app", {"DB_STATEMENT_TIMEOUT_MS": "500"}, read_only=True)
+        assert options["connect_args"] == {
+            "options": "-c statement_timeout=500 -c default_transaction_read_only=on"
+        }
+        options = engine_options("postgresql+asyncpg://u:p@replica/app", {}, read_only=True)
+        assert options["connect_args"] == {"server_settings": {"default_transaction_read_only": "on"}}
+
+    def test_router_without_replica_is_disabled(self):
+        router = ReadRouter(TestingSessionLocal, TestingSessionLocal, TestingAsyncSessionLocal, TestingAsyncSessionLocal)
+        assert not router.enabled
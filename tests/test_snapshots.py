@@ -0,0 +1,114 @@
+from server_python import ranking
+from tests.test_forecast import add_epics, create_team
+
+
+def setup_team(client):
+    team_id = create_team(client)
+    client.put(f"/api/teams/{team_id}/size-mappings", json=[
+        {"size": "S", "points": 3, "confidence": 90, "anchor_description": "Small"},
+        {"size": "M", "points": 5, "confidence": 80, "anchor_description": "Medium"},
+        {"size": "L", "points": 8, "confidence": 70, "anchor_description": "Large"}
+    ])
+    return team_id
+
+
+def create_snapshot(client, team_id, name, window_count=2):
+    response = client.post(f"/api/teams/{team_id}/snapshots", json={
+        "name": name, "planning_increment": "Q3 2026", "window_count": window_count
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestSnapshots:
+    def test_snapshot_is_columnar(self, client):
+        team_id = setup_team(client)
+        ids = add_epics(client, team_id, ["L", "M", "S", "L"])
+
+        snapshot = create_snapshot(client, team_id, "Draft")
+        data = snapshot["snapshot_data"]
+        assert data["epic_ids"] == ids
+        assert data["sizes"] == ["L", "M", "S", "L"]
+        assert data["priorities"] == [0, 1, 2, 3]
+        assert data["points"] == [8, 5, 3, 8]
+        assert data["windows"] == [0, 0, 1, 1]
+        assert data["used_points"] == [10, 14]
+        assert data["cut_line_epic_id"] == ids[2]
+
+        fetched = client.get(f"/api/teams/{team_id}/snapshots/{snapshot['id']}").json()
+        assert fetched["snapshot_data"] == data
+
+    def test_list_returns_metadata_only(self, client):
+        team_id = setup_team(client)
+        add_epics(client, team_id, ["M"])
+        first = create_snapshot(client, team_id, "First")
+        second = create_snapshot(client, team_id, "Second")
+
+        response = client.get(f"/api/teams/{team_id}/snapshots")
+        assert response.status_code == 200
+        listed = response.json()
+        assert [s["id"] for s in listed] == [second["id"], first["id"]]
+        assert all("snapshot_data" not in s for s in listed)
+
+    def test_snapshot_not_found(self, client):
+        team_id = setup_team(client)
+        other_team_id = setup_team(client)
+        snapshot = create_snapshot(client, other_team_id, "Other")
+        assert client.get(f"/api/teams/{team_id}/snapshots/{snapshot['id']}").status_code == 404
+        assert client.post("/api/teams/9999/snapshots", json={
+            "name": "x", "planning_increment": "Q1"
+        }).status_code == 404
+
+    def test_diff_reports_changes_and_cut_line_shift(self, client):
+        team_id = setup_team(client)
+        ids = add_epics(client, team_id, ["L", "M", "S", "L", "M"])
+        base = create_snapshot(client, team_id, "Before")
+
+        client.patch(f"/api/epics/{ids[0]}", json={"current_size": "S"})
+        client.delete(f"/api/epics/{ids[1]}")
+        client.put(f"/api/teams/{team_id}/epics/reorder", json={"epic_ids": [ids[4], ids[0], ids[2], ids[3]]})
+        new_id = client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "New", "original_size": "L", "current_size": "L", "source": "Template", "priority": 10 * ranking.RANK_GAP
+        }).json()["id"]
+        head = create_snapshot(client, team_id, "After")
+
+        response = client.get(f"/api/teams/{team_id}/snapshots/diff?base_id={base['id']}&head_id={head['id']}")
+        assert response.status_code == 200
+        diff = response.json()
+        assert diff["added"] == [new_id]
+        assert diff["removed"] == [ids[1]]
+        assert diff["resized"] == [{"epic_id": ids[0], "from_size": "L", "to_size": "S"}]
+        moved = {m["epic_id"]: m for m in diff["moved"]}
+        assert moved[ids[4]] == {
+            "epic_id": ids[4], "from_priority": 4, "to_priority": 0, "from_window": 1, "to_window": 0
+        }
+        assert diff["base_cut_line_epic_id"] == ids[2]
+        assert diff["head_cut_line_epic_id"] == ids[3]
+        assert diff["cut_line_shift"] == 1
+        assert diff["entered_above_line"] == [ids[4], ids[3]]
+        assert diff["dropped_below_line"] == [ids[1]]
+
+    def test_diff_ignores_rank_changes_that_keep_the_order(self, client, db_session):
+        team_id = setup_team(client)
+        ids = add_epics(client, team_id, ["S", "S", "S", "S", "S", "S"])
+        a = create_snapshot(client, team_id, "A", window_count=1)
+        ranking.rebalance(db_session, team_id)
+        db_session.commit()
+        b = create_snapshot(client, team_id, "B", window_count=1)
+        assert b["snapshot_data"]["priorities"] != a["snapshot_data"]["priorities"]
+        diff = client.get(f"/api/teams/{team_id}/snapshots/diff?base_id={a['id']}&head_id={b['id']}").json()
+        assert diff["moved"] == []
+
+        client.post(f"/api/teams/{team_id}/epics/{ids[-1]}/move", json={"before_epic_id": ids[0]})
+        c = create_snapshot(client, team_id, "C", window_count=1)
+        diff = client.get(f"/api/teams/{team_id}/snapshots/diff?base_id={b['id']}&head_id={c['id']}").json()
+        assert [m["epic_id"] for m in diff["moved"]] == [ids[-1]]
+
+    def test_diff_identical_snapshots(self, client):
+        team_id = setup_team(client)
+        add_epics(client, team_id, ["M", "L"])
+        a = create_snapshot(client, team_id, "A")
+        b = create_snapshot(client, team_id, "B")
+        diff = client.get(f"/api/teams/{team_id}/snapshots/diff?base_id={a['id']}&head_id={b['id']}").json()
+        assert diff["added"] == diff["removed"] == diff["moved"] == diff["resized"] == []
+        assert diff["cut_line_shift"] == 0
@@ -1,6 +1,11 @@
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch
 import os
+import httpx
+
+
+def json_transport(payload):
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=payload))
 
 
 class TestTrelloServiceConfiguration:
@@ -40,16 +45,11 @@ class TestTrelloAPI:
             from server_python.trello_service import TrelloService
             service = TrelloService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
+            service.http.transport = json_transport([
                 {"id": "board1", "name": "Product Backlog"},
                 {"id": "board2", "name": "Sprint Board"}
-            ]
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                boards = await service.get_boards()
+            ])
+            boards = await service.get_boards()
             
             assert len(boards) == 2
             assert boards[0].name == "Product Backlog"
@@ -64,9 +64,7 @@ class TestTrelloAPI:
             from server_python.trello_service import TrelloService
             service = TrelloService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
+            service.http.transport = json_transport([
                 {
                     "id": "card1",
                     "name": "Implement feature X",
@@ -79,11 +77,8 @@ class TestTrelloAPI:
                     "desc": "Bug description",
                     "labels": [{"name": "S"}]
                 }
-            ]
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                cards = await service.get_cards("board1")
+            ])
+            cards = await service.get_cards("board1")
             
             assert len(cards) == 2
             assert cards[0].name == "Implement feature X"
@@ -98,17 +93,12 @@ class TestTrelloAPI:
             from server_python.trello_service import TrelloService
             service = TrelloService()
             
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
+            service.http.transport = json_transport([
                 {"id": "list1", "name": "Backlog"},
                 {"id": "list2", "name": "In Progress"},
                 {"id": "list3", "name": "Done"}
-            ]
-            
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-                lists = await service.get_lists("board1")
+            ])
+            lists = await service.get_lists("board1")
             
             assert len(lists) == 3
 
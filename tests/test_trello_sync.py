@@ -0,0 +1,185 @@
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
+
+import httpx
+import pytest
+
+from server_python import models
+from server_python.integration_sync import utcnow
+from server_python.trello_service import TrelloService, trello_service
+
+
+def stamp(minutes_ago):
+    return (utcnow() - timedelta(minutes=minutes_ago)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeBoard:
+    """A Trello board served over a mock transport, recording which board requests were made."""
+
+    def __init__(self):
+        self.labels = ["Epic", "Size: S", "Size: L", "M"]
+        self.cards = {}
+        self.activity = stamp(60)
+        self.requests = []
+
+    def card(self, card_id, name, labels, minutes_ago=60):
+        self.cards[card_id] = {
+            "id": card_id, "name": name, "desc": "", "idList": "l1",
+            "labels": [{"name": label} for label in labels], "dateLastActivity": stamp(minutes_ago),
+        }
+        self.activity = max(self.activity, stamp(minutes_ago))
+
+    def handle(self, request):
+        assert request.url.path == "/1/boards/b1"
+        if "cards" not in request.url.params:
+            self.requests.append("activity")
+            return httpx.Response(200, json={"id": "b1", "dateLastActivity": self.activity})
+        self.requests.append("snapshot")
+        assert request.url.params["cards"] == "open"
+        return httpx.Response(200, json={
+            "id": "b1", "name": "Board", "dateLastActivity": self.activity,
+            "lists": [{"id": "l1", "name": "Backlog"}],
+            "labels": [{"id": f"lb{i}", "name": name} for i, name in enumerate(self.labels)],
+            "cards": list(self.cards.values()),
+        })
+
+
+@pytest.fixture
+def board():
+    fake = FakeBoard()
+    with patch.object(TrelloService, "is_configured", new_callable=PropertyMock, return_value=True), \
+            patch.object(trello_service.http, "transport", httpx.MockTransport(fake.handle)):
+        yield fake
+
+
+def setup_team(client, sync_enabled=True, **config):
+    team_id = client.post("/api/teams", json={"name": "Sync", "avatar": "https://example.com/a.png"}).json()["id"]
+    client.put(f"/api/teams/{team_id}/trello/config", json={
+        "board_id": "b1", "epic_label": "Epic", "size_label_prefix": "Size:", "sync_enabled": sync_enabled, **config
+    })
+    return team_id
+
+
+def sync(client, team_id, **params):
+    return client.post(f"/api/teams/{team_id}/trello/sync", params=params)
+
+
+def listed(client, team_id):
+    return [(e["external_id"], e["title"], e["current_size"]) for e in client.get(f"/api/teams/{team_id}/epics").json()]
+
+
+class TestTrelloSync:
+    def test_requires_enabled_sync(self, client, board):
+        team_id = setup_team(client, sync_enabled=False)
+        assert sync(client, team_id).status_code == 400
+        assert board.requests == []
+
+    def test_first_sync_uses_one_nested_request(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic", "Size: L"])
+        board.card("c2", "Two", ["Epic", "M"])
+        board.card("c3", "Not an epic", ["Size: S"])
+        body = sync(client, team_id).json()
+        assert (body["full"], body["fetched"], body["created"]) == (True, 2, 2)
+        assert board.requests == ["snapshot"]
+        # Only prefixed labels count as sizes.
+        assert listed(client, team_id) == [("c1", "One", "L"), ("c2", "Two", "M")]
+
+    def test_unchanged_board_costs_one_small_request(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic"])
+        sync(client, team_id)
+        etag = client.get(f"/api/teams/{team_id}/epics").headers["ETag"]
+
+        body = sync(client, team_id).json()
+        assert (body["full"], body["fetched"], body["deleted"]) == (False, 0, 0)
+        assert board.requests == ["snapshot", "activity"]
+        assert client.get(f"/api/teams/{team_id}/epics", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_delta_applies_only_active_cards(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic", "Size: S"])
+        board.card("c2", "Two", ["Epic", "Size: S"])
+        board.card("c3", "Three", ["Epic"])
+        sync(client, team_id)
+
+        board.card("c2", "Two (renamed)", ["Epic", "Size: L"], minutes_ago=1)
+        board.card("c4", "Four", ["Epic"], minutes_ago=1)
+        board.cards["c1"]["name"] = "Edited without activity"
+        del board.cards["c3"]
+        body = sync(client, team_id).json()
+
+        assert (body["full"], body["fetched"], body["created"], body["updated"], body["deleted"]) == (False, 2, 1, 1, 1)
+        assert board.requests == ["snapshot", "activity", "snapshot"]
+        assert listed(client, team_id) == [("c1", "One", "S"), ("c2", "Two (renamed)", "L"), ("c4", "Four", "M")]
+
+    def test_keeps_cards_from_other_boards(self, client, board):
+        team_id = setup_team(client)
+        client.post(f"/api/teams/{team_id}/epics", json={
+            "title": "Other board", "original_size": "M", "current_size": "M", "source": "Trello", "external_id": "x1"
+        })
+        board.card("c1", "One", ["Epic"])
+        board.card("c2", "Two", ["Epic"])
+        sync(client, team_id)
+
+        del board.cards["c2"]
+        board.activity = stamp(0)
+        assert sync(client, team_id, full=True).json()["deleted"] == 1
+        assert listed(client, team_id) == [("x1", "Other board", "M"), ("c1", "One", "M")]
+
+    def test_removing_the_epic_label_deletes_the_epic(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic"])
+        board.card("c2", "Two", ["Epic"])
+        sync(client, team_id)
+        board.card("c2", "Two", [], minutes_ago=1)
+        assert sync(client, team_id).json()["deleted"] == 1
+        assert listed(client, team_id) == [("c1", "One", "M")]
+
+    def test_label_changes_reprocess_every_card(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic", "Size: S"])
+        sync(client, team_id)
+
+        board.labels.append("Size: XL")
+        board.card("c2", "Two", ["Epic"], minutes_ago=1)
+        board.cards["c1"]["name"] = "One (edited)"
+        body = sync(client, team_id).json()
+        assert (body["full"], body["fetched"]) == (True, 2)
+        assert listed(client, team_id)[0] == ("c1", "One (edited)", "S")
+
+    def test_reconciles_after_the_interval(self, client, board, db_session):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic"])
+        sync(client, team_id)
+        config = db_session.query(models.IntegrationConfig).filter_by(team_id=team_id, integration_type="trello").one()
+        config.sync_state = {**config.sync_state, "last_reconciled_at": (utcnow() - timedelta(hours=2)).isoformat()}
+        db_session.commit()
+
+        assert sync(client, team_id).json()["full"] is True
+        assert sync(client, team_id).json()["full"] is False
+        assert sync(client, team_id, full=True).json()["fetched"] == 1
+
+    def test_changing_the_board_config_starts_over(self, client, board):
+        team_id = setup_team(client)
+        board.card("c1", "One", ["Epic"])
+        sync(client, team_id)
+        setup_config = {"board_id": "b1", "epic_label": "", "size_label_prefix": "Size:", "sync_enabled": True}
+        client.put(f"/api/teams/{team_id}/trello/config", json=setup_config)
+        body = sync(client, team_id).json()
+        assert body["full"] is True
+        assert board.requests == ["snapshot", "snapshot"]
+
+    def test_upstream_errors_roll_back(self, client):
+        team_id = setup_team(client)
+        with patch.object(TrelloService, "is_configured", new_callable=PropertyMock, return_value=True), \
+                patch.object(trello_service.http, "transport", httpx.MockTransport(lambda request: httpx.Response(429))):
+            assert sync(client, team_id).status_code == 502
+        assert listed(client, team_id) == []
+
+
+class TestTrelloSizeLabels:
+    def test_prefix_is_required_when_set(self):
+        assert trello_service._extract_size_label(["Size: xl", "L"], "Size:") == "XL"
+        assert trello_service._extract_size_label(["L"], "Size:") is None
+        assert trello_service._extract_size_label(["Epic", "l"]) == "L"